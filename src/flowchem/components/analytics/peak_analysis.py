@@ -0,0 +1,184 @@
+"""Peak integration and steady-state detection on the spectra acquired by an analytical device."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+from pydantic import BaseModel
+
+from flowchem.components.flowchem_component import FlowchemComponent
+
+if TYPE_CHECKING:
+    from flowchem.devices.flowchem_device import FlowchemDevice
+
+
+class IntegrationWindow(BaseModel):
+    """A named range of the spectrum axis to integrate, limits in the same unit as the axis (e.g. cm-1 or ppm)."""
+
+    name: str
+    start: float
+    end: float
+
+
+class SteadyStateCriterion(BaseModel):
+    """The peak areas are stable when they change less than `tolerance` over the last `consecutive` spectra.
+
+    With `normalized`, the fraction of each area on the sum of all the areas is compared instead of the area.
+    Only the windows in `peaks` are considered, all of them if None.
+    """
+
+    tolerance: float = 0.002
+    consecutive: int = 2
+    normalized: bool = True
+    peaks: list[str] | None = None
+
+
+class PeakAreas(BaseModel):
+    """Areas of the integration windows in a spectrum."""
+
+    sample: int
+    areas: dict[str, float]
+    fractions: dict[str, float]  # area / sum of all the areas
+    stable: bool
+
+
+class PeakIntegrator:
+    """Integrate all the windows in a single vectorized pass (trapezoidal rule).
+
+    The window membership of the axis points is a (windows x points) boolean matrix, cached as long as the axis and the
+    windows do not change, so each spectrum only costs one matrix-vector product.
+    """
+
+    def __init__(self, windows: list[IntegrationWindow] | None = None) -> None:
+        self.windows = windows or []
+        self._axis: np.ndarray | None = None
+        self._segment_masks: np.ndarray | None = None
+
+    @property
+    def windows(self) -> list[IntegrationWindow]:
+        return self._windows
+
+    @windows.setter
+    def windows(self, windows: list[IntegrationWindow]):
+        self._windows = windows
+        self._starts = np.array([min(w.start, w.end) for w in windows], dtype=np.float64)
+        self._ends = np.array([max(w.start, w.end) for w in windows], dtype=np.float64)
+        self._axis = self._segment_masks = None
+
+    def _masks_for(self, axis: np.ndarray) -> np.ndarray:
+        if self._axis is None or not np.array_equal(axis, self._axis):
+            in_window = (axis >= self._starts[:, None]) & (axis <= self._ends[:, None])
+            # A trapezoid is counted if both its points are in the window
+            self._segment_masks = (in_window[:, :-1] & in_window[:, 1:]).astype(np.float64)
+            self._axis = axis
+        return self._segment_masks
+
+    def integrate(self, axis, intensity) -> dict[str, float]:
+        """Return the area of each window in the spectrum. The axis can be in increasing or decreasing order."""
+        if not self.windows:
+            return {}
+        axis = np.asarray(axis, dtype=np.float64)
+        intensity = np.asarray(intensity, dtype=np.float64)
+        trapezoids = np.abs(np.diff(axis)) * (intensity[:-1] + intensity[1:]) / 2
+        areas = self._masks_for(axis) @ trapezoids
+        return {window.name: float(area) for window, area in zip(self.windows, areas)}
+
+
+def _fractions(areas: dict[str, float]) -> dict[str, float]:
+    total = sum(areas.values())
+    return {name: (area / total if total else 0.0) for name, area in areas.items()}
+
+
+class PeakAnalysis(FlowchemComponent):
+    """Integrate named windows of each new spectrum and detect when the peak areas reach a steady state.
+
+    The device feeds the spectra to `add_spectrum()`, so clients only get the areas instead of the whole spectra.
+    """
+
+    def __init__(self, name: str, hw_device: FlowchemDevice, history: int = 100) -> None:
+        super().__init__(name, hw_device)
+        self.integrator = PeakIntegrator()
+        self.criterion = SteadyStateCriterion()
+        self._results: deque[PeakAreas] = deque(maxlen=history)
+        self._spectra_received = 0
+        self._new_result = asyncio.Condition()
+
+        self.add_api_route("/integration-windows", self.get_windows, methods=["GET"])
+        self.add_api_route("/integration-windows", self.set_windows, methods=["PUT"])
+        self.add_api_route("/steady-state-criterion", self.get_criterion, methods=["GET"])
+        self.add_api_route("/steady-state-criterion", self.set_criterion, methods=["PUT"])
+        self.add_api_route("/peak-areas", self.get_peak_areas, methods=["GET"])
+        self.add_api_route("/wait-until-stable", self.wait_until_stable, methods=["GET"])
+
+        self.component_info.type = "Peak Analysis"
+
+    async def get_windows(self) -> list[IntegrationWindow]:
+        """Return the integration windows."""
+        return self.integrator.windows
+
+    async def set_windows(self, windows: list[IntegrationWindow]):
+        """Set the integration windows. The areas computed so far are discarded."""
+        self.integrator.windows = windows
+        self._results.clear()
+
+    async def get_criterion(self) -> SteadyStateCriterion:
+        """Return the steady-state criterion."""
+        return self.criterion
+
+    async def set_criterion(self, criterion: SteadyStateCriterion):
+        """Set the steady-state criterion."""
+        self.criterion = criterion
+
+    def _is_stable(self) -> bool:
+        consecutive = max(self.criterion.consecutive, 2)
+        if len(self._results) < consecutive:
+            return False
+        recent = list(self._results)[-consecutive:]
+        peaks = self.criterion.peaks or list(recent[-1].areas)
+        key = "fractions" if self.criterion.normalized else "areas"
+        try:
+            values = np.array([[getattr(result, key)[peak] for peak in peaks] for result in recent])
+        except KeyError:  # Peak not in the integration windows
+            return False
+        return bool(np.all(np.ptp(values, axis=0) <= self.criterion.tolerance))
+
+    async def add_spectrum(self, sample: int, axis, intensity):
+        """Integrate a new spectrum and update the steady-state detection."""
+        areas = self.integrator.integrate(axis, intensity)
+        if not areas:
+            return
+        async with self._new_result:
+            self._results.append(PeakAreas(sample=sample, areas=areas, fractions=_fractions(areas), stable=False))
+            self._results[-1].stable = self._is_stable()
+            self._spectra_received += 1
+            self._new_result.notify_all()
+
+    async def get_peak_areas(self) -> PeakAreas | None:
+        """Return the areas of the integration windows in the last spectrum. None if no spectrum was integrated."""
+        return self._results[-1] if self._results else None
+
+    async def wait_until_stable(self, timeout: float = 600) -> PeakAreas | None:
+        """Wait until the steady-state criterion is met by spectra acquired after this call, up to `timeout` seconds.
+
+        Return the peak areas of the first spectrum meeting the criterion, or the last ones if it was not met in time.
+        """
+        async with self._new_result:
+            received_before = self._spectra_received
+            min_spectra = max(self.criterion.consecutive, 2)
+            stable_result: PeakAreas | None = None
+
+            def stable_after_call() -> bool:
+                # Several spectra may be integrated before this task resumes: the first one meeting the criterion counts
+                nonlocal stable_result
+                new_spectra = min(self._spectra_received - received_before, len(self._results))
+                new_results = list(self._results)[len(self._results) - new_spectra:]
+                stable_result = next((result for result in new_results[min_spectra - 1:] if result.stable), None)
+                return stable_result is not None
+
+            try:
+                await asyncio.wait_for(self._new_result.wait_for(stable_after_call), timeout)
+            except asyncio.TimeoutError:
+                return await self.get_peak_areas()
+        return stable_result
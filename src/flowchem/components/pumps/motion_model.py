@@ -0,0 +1,182 @@
+"""Dead-reckoning model of pump movements, to answer status requests without querying the hardware."""
+from __future__ import annotations
+
+import time
+
+from pydantic import BaseModel
+
+
+class PumpMotionState(BaseModel):
+    """Estimated pump state, as predicted from the commanded movements."""
+
+    is_pumping: bool
+    rate: float  # ml/min
+    moved_volume: float  # ml, displaced by the current movement
+    syringe_volume: float | None  # ml, estimated syringe content (None if unknown or not a syringe pump)
+    remaining_time: float | None  # seconds to the end of the movement (None if running until stopped)
+    age: float | None  # seconds since the state was last confirmed by the hardware
+    stale: bool  # True if the estimate should not be trusted without a hardware readback
+
+
+class PumpMotionModel:
+    """Estimate the state of a pump from the last commanded movement.
+
+    Movements are described by a rate and, optionally, the volume to displace. Hardware readbacks (e.g. syringe
+    position or busy status) correct the estimate. The estimate is considered stale after `max_age` seconds without
+    hardware confirmation, or close to the predicted end of a movement.
+    """
+
+    def __init__(self, max_age: float = 30.0, end_margin: float = 1.0) -> None:
+        self.max_age = max_age
+        self.end_margin = end_margin
+
+        self._running = False
+        self._rate = 0.0  # ml/min
+        self._move_volume: float | None = None  # ml to displace, None for movements lasting until stopped
+        self._withdrawing = False
+        self._start_time = time.monotonic()
+        self._content_at_start: float | None = None  # ml in the syringe at the start of the movement
+        self._last_confirmed: float | None = None
+
+    def start(
+        self,
+        rate: float,
+        volume: float | None = None,
+        withdrawing: bool = False,
+        syringe_volume: float | None = None,
+    ):
+        """Record the start of a movement at `rate` ml/min, displacing `volume` ml (or until stopped if None).
+
+        The current syringe content can be provided, otherwise the previous estimate (if any) is carried over.
+        """
+        now = time.monotonic()
+        self._content_at_start = syringe_volume if syringe_volume is not None else self.syringe_volume(now)
+        self._running = rate > 0
+        self._rate = rate
+        self._move_volume = volume
+        self._withdrawing = withdrawing
+        self._start_time = now
+        self._last_confirmed = now
+
+    def stop(self, syringe_volume: float | None = None):
+        """Record the pump being stopped before the end of the movement.
+
+        Where the syringe stopped is only known from a readback (`syringe_volume`), otherwise the syringe content is
+        unknown and the estimate stale until the next hardware confirmation.
+        """
+        now = time.monotonic()
+        self._content_at_start = syringe_volume
+        self._running = False
+        self._rate = 0.0
+        self._move_volume = None
+        self._start_time = now
+        self._last_confirmed = now if syringe_volume is not None else None
+
+    def _finish(self, now: float):
+        """Record the movement as completed: a bounded movement ends exactly at its target content."""
+        if self._move_volume is not None and self._content_at_start is not None:
+            sign = 1 if self._withdrawing else -1
+            self._content_at_start = max(self._content_at_start + sign * self._move_volume, 0.0)
+        else:
+            # A movement lasting until stopped has no known end point
+            self._content_at_start = None
+        self._running = False
+        self._rate = 0.0
+        self._move_volume = None
+        self._start_time = now
+
+    def invalidate(self):
+        """Mark the estimate as unreliable, e.g. after a command with unknown effect on the movement."""
+        self._last_confirmed = None
+
+    def correct(self, is_pumping: bool | None = None, syringe_volume: float | None = None):
+        """Correct the estimate with values read back from the hardware.
+
+        A pump reported idle is considered at the end of its movement, explicit stops go through `stop()`.
+        """
+        now = time.monotonic()
+        unexpected_movement = False
+        if is_pumping is not None:
+            if not is_pumping and self._running:
+                self._finish(now)
+            elif is_pumping and not self.is_pumping(now):
+                # Movement not commanded via this model, nothing can be predicted.
+                unexpected_movement = True
+
+        if syringe_volume is not None:
+            if self._running and self._move_volume is not None:
+                if self._content_at_start is not None:
+                    # The target syringe content is known: the volume left is the distance from it
+                    sign = 1 if self._withdrawing else -1
+                    target = self._content_at_start + sign * self._move_volume
+                    self._move_volume = max(sign * (target - syringe_volume), 0)
+                else:
+                    self._move_volume = max(self._move_volume - self.moved_volume(now), 0)
+            self._start_time = now
+            self._content_at_start = syringe_volume
+
+        self._last_confirmed = None if unexpected_movement else now
+
+    def moved_volume(self, now: float | None = None) -> float:
+        """Volume displaced by the current movement, in ml."""
+        if not self._running:
+            return 0.0
+        now = now if now is not None else time.monotonic()
+        moved = self._rate * (now - self._start_time) / 60
+        if self._move_volume is not None:
+            moved = min(moved, self._move_volume)
+        return moved
+
+    def syringe_volume(self, now: float | None = None) -> float | None:
+        """Estimated syringe content, in ml. None if unknown."""
+        if self._content_at_start is None:
+            return None
+        moved = self.moved_volume(now)
+        content = self._content_at_start + moved if self._withdrawing else self._content_at_start - moved
+        return max(content, 0.0)
+
+    def is_pumping(self, now: float | None = None) -> bool:
+        """Whether the pump is expected to be moving."""
+        if not self._running:
+            return False
+        return self._move_volume is None or self.moved_volume(now) < self._move_volume
+
+    def remaining_time(self, now: float | None = None) -> float | None:
+        """Seconds to the predicted end of the movement, None if the pump runs until stopped."""
+        if not self.is_pumping(now):
+            return 0.0
+        if self._move_volume is None:
+            return None
+        return 60 * (self._move_volume - self.moved_volume(now)) / self._rate
+
+    def age(self, now: float | None = None) -> float | None:
+        """Seconds since the state was last confirmed by the hardware (or by an acknowledged command)."""
+        if self._last_confirmed is None:
+            return None
+        now = now if now is not None else time.monotonic()
+        return now - self._last_confirmed
+
+    def is_stale(self, now: float | None = None) -> bool:
+        """Whether a hardware readback is needed to trust the estimate."""
+        now = now if now is not None else time.monotonic()
+        age = self.age(now)
+        if age is None or age > self.max_age:
+            return True
+        # Close to the predicted end of a movement the actual state is uncertain.
+        if self._running and self._move_volume is not None:
+            predicted_end = self._start_time + 60 * self._move_volume / self._rate
+            return abs(predicted_end - now) < self.end_margin
+        return False
+
+    def state(self) -> PumpMotionState:
+        """Return the estimated state."""
+        now = time.monotonic()
+        return PumpMotionState(
+            is_pumping=self.is_pumping(now),
+            rate=self._rate if self.is_pumping(now) else 0.0,
+            moved_volume=self.moved_volume(now),
+            syringe_volume=self.syringe_volume(now),
+            remaining_time=self.remaining_time(now),
+            age=self.age(now),
+            stale=self.is_stale(now),
+        )
@@ -0,0 +1,215 @@
+"""Route liquid across several valves, from the positions of each valve and the tubing connecting their ports."""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter
+from loguru import logger
+from pydantic import BaseModel
+
+from flowchem.components.valves.valve import Valve, ValveInfo
+from flowchem.utils.exceptions import DeviceError, InvalidConfigurationError
+
+if TYPE_CHECKING:
+    from flowchem.devices.flowchem_device import FlowchemDevice
+
+Port = tuple[str, int]  # (valve, port number), e.g. ("r2/InjectionValve_A", 3)
+
+
+class Route(BaseModel):
+    """Valve positions connecting `source` to `sink`, and the ports the liquid goes through."""
+
+    source: str
+    sink: str
+    path: list[str]
+    positions: dict[str, int]  # Position of each valve on the path, as in ValveInfo.positions
+    connections: dict[str, list[tuple]]  # Ports connected by each valve in that position
+
+
+class FluidicGraphInfo(BaseModel):
+    """Valves of the network and tubing between their ports."""
+
+    valves: dict[str, ValveInfo]
+    tubing: list[tuple[str, str]]
+
+
+def parse_port(name: str) -> Port:
+    """Split a port name such as "my-device/valve:3" in valve ("my-device/valve") and port number (3)."""
+    valve, separator, port = name.strip().rpartition(":")
+    if not separator or not valve or not port.isdigit():
+        raise InvalidConfigurationError(f"Invalid port `{name}`: expected e.g. `device/component:1`")
+    return valve, int(port)
+
+
+def port_name(port: Port) -> str:
+    return f"{port[0]}:{port[1]}"
+
+
+class FluidicGraph:
+    """Ports of the valves (nodes) connected by the tubing and, depending on the valve positions, inside the valves.
+
+    Finding a route is a breadth-first search over the ports reachable from the source, where crossing a valve fixes
+    its position: a valve is never required in two positions at once, and the shortest route is returned.
+    """
+
+    def __init__(self, positions: Mapping[str, Mapping[int, tuple]], tubing: Iterable[tuple[Port, Port]]) -> None:
+        self.positions = positions
+        # For each port, the positions in which it is connected to other ports and those ports
+        self._inside: dict[Port, list[tuple[int, tuple[int, ...]]]] = {}
+        for valve, valve_positions in positions.items():
+            for position, connections in valve_positions.items():
+                for group in connections:
+                    ports = [port for port in group if port is not None]
+                    for port in ports:
+                        others = tuple(other for other in ports if other != port)
+                        self._inside.setdefault((valve, port), [])
+                        if others:
+                            self._inside[(valve, port)].append((position, others))
+
+        self.tubing: list[tuple[Port, Port]] = []
+        self._tubes: dict[Port, list[Port]] = {}
+        for end_a, end_b in tubing:
+            for end in (end_a, end_b):
+                if end not in self._inside:
+                    raise InvalidConfigurationError(f"Tubing to unknown valve port `{port_name(end)}`")
+            self.tubing.append((end_a, end_b))
+            self._tubes.setdefault(end_a, []).append(end_b)
+            self._tubes.setdefault(end_b, []).append(end_a)
+
+    def _next_ports(self, port: Port, assignment: dict[str, int]):
+        """Ports reachable from `port` in one step, with the valve positions needed."""
+        for other in self._tubes.get(port, ()):
+            yield other, assignment
+        valve = port[0]
+        for position, others in self._inside[port]:
+            if assignment.get(valve, position) != position:
+                continue
+            next_assignment = assignment if valve in assignment else {**assignment, valve: position}
+            for other in others:
+                yield (valve, other), next_assignment
+
+    def _connected(self, source: Port, assignment: dict[str, int]) -> set[Port]:
+        """All the ports connected to `source` with the valves of `assignment` in their positions.
+
+        The other valves are not moved, so the ports beyond them are not considered.
+        """
+        connected = {source}
+        queue = deque([source])
+        while queue:
+            port = queue.popleft()
+            neighbours = list(self._tubes.get(port, ()))
+            if port[0] in assignment:
+                for position, others in self._inside[port]:
+                    if position == assignment[port[0]]:
+                        neighbours.extend((port[0], other) for other in others)
+            for neighbour in neighbours:
+                if neighbour not in connected:
+                    connected.add(neighbour)
+                    queue.append(neighbour)
+        return connected
+
+    def route(self, source: Port, sink: Port, avoid: Iterable[Port] = ()) -> Route:
+        """Find the valve positions connecting `source` to `sink`, none of the `avoid` ports being connected to them.
+
+        Raise DeviceError if there is none.
+        """
+        avoid = set(avoid)
+        for port in (source, sink, *avoid):
+            if port not in self._inside:
+                raise DeviceError(f"Unknown valve port `{port_name(port)}`")
+        if source in avoid or sink in avoid:
+            raise DeviceError("The source and the sink cannot be avoided")
+
+        queue: deque[tuple[Port, dict[str, int], list[Port]]] = deque([(source, {}, [source])])
+        seen = {(source, frozenset())}
+        while queue:
+            port, assignment, path = queue.popleft()
+            if port == sink:
+                if avoid.isdisjoint(self._connected(source, assignment)):
+                    return Route(
+                        source=port_name(source),
+                        sink=port_name(sink),
+                        path=[port_name(port) for port in path],
+                        positions=assignment,
+                        connections={valve: list(self.positions[valve][pos]) for valve, pos in assignment.items()},
+                    )
+                continue
+            for next_port, next_assignment in self._next_ports(port, assignment):
+                state = (next_port, frozenset(next_assignment.items()))
+                if next_port in avoid or next_port in path or state in seen:
+                    continue
+                seen.add(state)
+                queue.append((next_port, next_assignment, [*path, next_port]))
+
+        reason = f" without connecting {', '.join(sorted(map(port_name, avoid)))}" if avoid else ""
+        raise DeviceError(f"No route from {port_name(source)} to {port_name(sink)}{reason}")
+
+
+class FluidicNetwork:
+    """The valves of all the devices and the tubing between their ports, configured in the `[fluidics]` section.
+
+    Connecting a source to a sink sets all the valves needed at once, instead of one `set_position` per valve.
+    """
+
+    def __init__(self, valves: dict[str, Valve], tubing: Iterable[Iterable[str]] = ()) -> None:
+        self.valves = valves
+        tubes = []
+        for tube in tubing:
+            ends = list(tube)
+            if len(ends) != 2:
+                raise InvalidConfigurationError(f"Tubing {ends} must connect exactly two ports")
+            tubes.append((parse_port(ends[0]), parse_port(ends[1])))
+        self.graph = FluidicGraph({name: valve._positions for name, valve in valves.items()}, tubes)
+
+        self.router = APIRouter(prefix="/fluidics", tags=["fluidics"])
+        self.router.add_api_route("/", self.info, methods=["GET"], response_model=FluidicGraphInfo)
+        self.router.add_api_route("/route", self.find_route, methods=["GET"], response_model=Route)
+        self.router.add_api_route("/route", self.connect, methods=["PUT"], response_model=Route)
+
+    @classmethod
+    def from_devices(cls, devices: Iterable[FlowchemDevice], tubing: Iterable[Iterable[str]] = ()) -> FluidicNetwork:
+        """Create the network of the valve components of `devices`, named as their URL path (`device/component`)."""
+        valves = {
+            f"{device.name}/{component.name}": component
+            for device in devices
+            for component in device.components
+            if isinstance(component, Valve)
+        }
+        return cls(valves, tubing)
+
+    def info(self) -> FluidicGraphInfo:
+        """Get the valves and the tubing of the network."""
+        return FluidicGraphInfo(
+            valves={name: valve.connections() for name, valve in self.valves.items()},
+            tubing=[(port_name(end_a), port_name(end_b)) for end_a, end_b in self.graph.tubing],
+        )
+
+    async def find_route(self, source: str, sink: str, avoid: str = "") -> Route:
+        """Compute the valve positions connecting source to sink (e.g. `pump/valve:1`), without moving the valves.
+
+        The ports in `avoid` (comma separated) must not be connected to the route.
+        """
+        avoided = [parse_port(port) for port in avoid.split(",") if port.strip()]
+        return self.graph.route(parse_port(source), parse_port(sink), avoided)
+
+    async def connect(self, source: str, sink: str, avoid: str = "") -> Route:
+        """Connect source to sink, setting the positions of all the valves on the route concurrently."""
+        route = await self.find_route(source, sink, avoid)
+        results = await asyncio.gather(
+            *[
+                self.valves[name].set_position(connect=json.dumps(route.connections[name]), ambiguous_switching=True)
+                for name in route.positions
+            ],
+            return_exceptions=True,
+        )
+        failed = [
+            f"{name}: {error}" for name, error in zip(route.positions, results) if isinstance(error, BaseException)
+        ]
+        if failed:
+            raise DeviceError(f"Could not set the valves connecting {source} to {sink} ({'; '.join(failed)})")
+        logger.info(f"Connected {source} to {sink} via {' -> '.join(route.path)}")
+        return route
@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 from pydantic import BaseModel
+import functools
 import json
-from typing import Tuple
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Tuple
 
 from flowchem.components.flowchem_component import FlowchemComponent
-from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.utils.exceptions import InvalidConfigurationError, DeviceError
 
+if TYPE_CHECKING:
+    from flowchem.devices.flowchem_device import FlowchemDevice
+
 
 def return_tuple_from_input(str_or_tuple):
     # in case no input is given, required, simply return None, will be dealt with by consumer
@@ -51,32 +56,99 @@ class ValveInfo(BaseModel):
     positions: dict[int, Tuple[Tuple[None | int, ...], ...]]
 
 
-# mypy: ignore-errors
-def all_tuples_in_nested_tuple(tuple_in: Tuple[Tuple[int, int], ...],
-                               tuple_contains: Tuple[Tuple[int, int, ...], ...]) -> bool:
-    """Check if all requested tuples are in a tuple of tuples"""
-    all_contained = []
-    for subtuple in tuple_in:
-        for supertuple in tuple_contains:
-            if set(subtuple) <= set(supertuple):
-                all_contained.append(True)
-                break
-    if len(all_contained) == len(tuple_in):
-        return True
-    else:
-        return False
-
+def _create_connections(stator_ports, rotor_ports) -> dict[int, tuple]:
+    """
+    Create possible switching states from a stator and rotor representation. Position names are integers. Going to
+    the next position in clockwise direction increases position name by one
+    """
+    connections = {}
+    if len(rotor_ports) != len(stator_ports):
+        raise InvalidConfigurationError
+    if len(rotor_ports) == 1:
+        # in case there is no 0 port, for data uniformity, internally add it. strictly, the stator and rotor
+        # should reflect physical properties, so if stator has a hole in middle it should have 0, but only rotor
+        # None. Since this does not impact functionality, thoroughness will be left to the user
+        rotor_ports = (*rotor_ports, (None,))
+        stator_ports = (*stator_ports, (None,))
+    # it is rather simple: we just move the rotor by one and thereby create a dictionary
+    for _ in range(len(rotor_ports[0])):
+        rotor_curr = rotor_ports[0][-_:] + rotor_ports[0][:-_]
+        _connections_per_position = {}
+        for rotor_position, stator_position in zip(rotor_curr + rotor_ports[1], stator_ports[0] + stator_ports[1]):
+            # rotor positions act as dictionary keys, take into account the [1] position for connecting the 0
+            # if dict key exists, instead of overwriting, simply append
+            # if rotor is none, means there is no connection, so do not add
+            if rotor_position is not None:
+                try:
+                    _connections_per_position[rotor_position] += (stator_position,)
+                except KeyError:
+                    _connections_per_position[rotor_position] = (stator_position,)
+                    # get rid of the keys, values are the connected ports in each position
+        connections[_] = tuple(_connections_per_position.values())
+    # lastly, trim the positions whose connections already exist, keeping the first one
+    unique_connections = {}
+    for position, connection in connections.items():
+        unique_connections.setdefault(connection, position)
+    return {position: connection for connection, position in unique_connections.items()}
+
+
+class PortIndex:
+    """Immutable lookup table of the positions of a valve geometry, shared by all the valves with that geometry.
+
+    Each position is a bit of an integer mask: for every group of ports (any single port or pair of ports) the mask
+    of the positions connecting them is precomputed, so resolving a set of connections to a position is a few bitwise
+    operations instead of a scan of all the positions. Use `PortIndex.for_geometry()` to get the shared instance.
+    """
 
-# mypy: ignore-errors
-def no_tuple_in_nested_tuple(tuple_in: Tuple[Tuple[int, int], ...],
-                             tuple_contains: Tuple[Tuple[int, int, ...], ...]) -> bool:
-    """Check if none of requested tuples are in a tuple of tuples"""
-    contains_tuple = False
-    for subtuple in tuple_in:
-        for supertuple in tuple_contains:
-            if set(subtuple) <= set(supertuple):
-                contains_tuple = True
-    return not contains_tuple
+    def __init__(self, positions: dict[int, tuple]) -> None:
+        self.positions: Mapping[int, tuple] = MappingProxyType(positions)
+        self.all_positions = 0
+        masks: dict[frozenset, int] = {}
+        for position, connections in positions.items():
+            bit = 1 << position
+            self.all_positions |= bit
+            for group in connections:
+                for port in group:
+                    masks[frozenset((port,))] = masks.get(frozenset((port,)), 0) | bit
+                    for other in group:
+                        if other != port:
+                            masks[frozenset((port, other))] = masks.get(frozenset((port, other)), 0) | bit
+        self._masks: Mapping[frozenset, int] = MappingProxyType(masks)
+
+    @classmethod
+    def for_geometry(cls, stator_ports, rotor_ports) -> PortIndex:
+        """Return the index of a stator/rotor geometry (see `Valve`), compiling it on first use."""
+        return cls._compile(
+            tuple(tuple(ports) for ports in stator_ports),
+            tuple(tuple(ports) for ports in rotor_ports),
+        )
+
+    @classmethod
+    @functools.cache
+    def _compile(cls, stator_ports: tuple[tuple, ...], rotor_ports: tuple[tuple, ...]) -> PortIndex:
+        return cls(_create_connections(stator_ports, rotor_ports))
+
+    def connecting(self, ports: tuple) -> int:
+        """Mask of the positions in which all the `ports` are connected together."""
+        first, *others = ports
+        mask = self._masks.get(frozenset((first,)), 0)
+        for port in others:
+            if port != first:
+                mask &= self._masks.get(frozenset((first, port)), 0)
+        return mask
+
+    def resolve(
+        self,
+        positions_to_connect: Tuple[Tuple[int, int], ...] | None,
+        positions_not_to_connect: Tuple[Tuple[int, int], ...] | None = None,
+    ) -> int:
+        """Mask of the positions making all the connections requested and none of the excluded ones."""
+        mask = self.all_positions
+        for ports in positions_to_connect or ():
+            mask &= self.connecting(ports)
+        for ports in positions_not_to_connect or ():
+            mask &= ~self.connecting(ports)
+        return mask
 
 
 class Valve(FlowchemComponent):
@@ -148,7 +220,9 @@ class Valve(FlowchemComponent):
         # Open/closed valves, need not be treated here but could be simulated by a [1,2,None] and rotor [3,3,None]
         self._rotor_ports = rotor_ports
         self._stator_ports = stator_ports
-        self._positions = self._create_connections(self._stator_ports, self._rotor_ports)
+        # valves of the same model share one (immutable) index
+        self._index = PortIndex.for_geometry(self._stator_ports, self._rotor_ports)
+        self._positions = self._index.positions
 
         # bwe can infer
         super().__init__(name, hw_device)
@@ -157,52 +231,6 @@ class Valve(FlowchemComponent):
         self.add_api_route("/position", self.set_position, methods=["PUT"])
         self.add_api_route("/connections", self.connections, methods=["GET"])
 
-    @staticmethod
-    def _create_connections(stator_ports, rotor_ports):
-        """
-        Create possible switching states from a stator and rotor representation. Position names are integers. Going to
-        the next position in clockwise direction increases position name by one
-        """
-        connections = {}
-        if len(rotor_ports) != len(stator_ports):
-            raise InvalidConfigurationError
-        if len(rotor_ports) == 1:
-            # in case there is no 0 port, for data uniformity, internally add it. strictly, the stator and rotor
-            # should reflect physical properties, so if stator has a hole in middle it should have 0, but only rotor
-            # None. Since this does not impact functionality, thoroughness will be left to the user
-            rotor_ports.append([None])
-            stator_ports.append([None])
-        # it is rather simple: we just move the rotor by one and thereby create a dictionary
-        for _ in range(len(rotor_ports[0])):
-            rotor_curr = rotor_ports[0][-_:] + rotor_ports[0][:-_]
-            _connections_per_position = {}
-            for rotor_position, stator_position in zip(rotor_curr + rotor_ports[1], stator_ports[0] + stator_ports[1]):
-                # rotor positions act as dictionary keys, take into account the [1] position for connecting the 0
-                # if dict key exists, instead of overwriting, simply append
-                # if rotor is none, means there is no connection, so do not add
-                if rotor_position is not None:
-                    try:
-                        _connections_per_position[rotor_position] += (stator_position,)
-                    except KeyError:
-                        _connections_per_position[rotor_position] = (stator_position,)
-                        # get rid of the keys, values are the connected ports in each position
-            connections[_] = tuple(_connections_per_position.values())
-        # lastly, trim the lists of connections that already exist
-        # trim returned connections
-        unique_connections = set(connections.values())
-        to_delete = []
-        for connection in unique_connections:
-            counter = 0
-            for key, value in connections.items():
-                if connection == value:
-                    if counter > 0:
-                        to_delete.append(key)
-                    counter += 1
-        for _ in to_delete:
-            del connections[_]
-
-        return connections
-
     def _change_connections(self, raw_position: int | str, reverse: bool = False):
         # abstract valve mapping needs to be translated to device-specific position naming. This can be e.g.
         # addition/subtraction of one, multiplication with some angle or mapping to letters. Needs to be implemented on
@@ -217,27 +245,16 @@ class Valve(FlowchemComponent):
         This is the heart of valve switching logic: select the suitable position (so actually the key in
         self._positions) to create desired connections
         """
-        possible_positions = []
-        # check if this is possible given the mapping
-        for key, values in self._positions.items():
-            if positions_not_to_connect:
-                if all_tuples_in_nested_tuple(positions_to_connect, values) and no_tuple_in_nested_tuple(
-                        positions_not_to_connect, values):
-                    possible_positions.append(key)
-            elif all_tuples_in_nested_tuple(positions_to_connect, values):
-                possible_positions.append(key)
-        if len(possible_positions) > 1:
-            if not arbitrary_switching:
-                raise DeviceError("There are multiple positions for the valve to connect your specified ports. "
-                                  "Either allow arbitrary switching, or specify which connections not to connect")
-            elif arbitrary_switching:
-                return possible_positions[0]
-            else:
-                raise DeviceError
-        elif len(possible_positions) == 1:
-            return possible_positions[0]
+        possible_positions = self._index.resolve(positions_to_connect, positions_not_to_connect)
+        if possible_positions & (possible_positions - 1) and not arbitrary_switching:
+            # more than one bit set
+            raise DeviceError("There are multiple positions for the valve to connect your specified ports. "
+                              "Either allow arbitrary switching, or specify which connections not to connect")
+        elif possible_positions:
+            # lowest position matching
+            return (possible_positions & -possible_positions).bit_length() - 1
         else:
-            # this means length == 0, no connection possible
+            # no connection possible
             raise DeviceError("Connection is not possible. The valve you selected can not connect selected ports."
                               "This can be due to exclusion of certain connections by setting positions_not_to_connect")
 
@@ -271,7 +288,7 @@ class Valve(FlowchemComponent):
         """Get the list of all available positions for this valve.
         This mainly has informative purpose
         """
-        return ValveInfo(ports=self._stator_ports, positions=self._positions)
+        return ValveInfo(ports=self._stator_ports, positions=dict(self._positions))
 
     # Philosophy: explicitly specify which ports to connect
     # In case of a simple multi-position valve, it always connects the always open central port to the requested port.
@@ -0,0 +1,143 @@
+"""FLOW-BUS master shared by all the Bronkhorst instruments connected to a serial port."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import ClassVar
+
+import propar
+from loguru import logger
+
+from flowchem.utils.bus_executor import BusExecutor
+from flowchem.utils.exceptions import DeviceError
+
+# FlowDDE parameter numbers
+IDENTIFICATION = 1
+MEASURE = 8  # 0-32000 = 0-100%
+SETPOINT = 9  # 0-32000 = 0-100%
+FMEASURE = 205  # float, in capacity unit
+POLLED = (MEASURE, SETPOINT, FMEASURE)
+# Processes numbered per channel, for multi-channel instruments (as in propar.instrument)
+CHANNEL_PROCESSES = (1, 33, 65, 97, 104)
+
+
+@dataclass
+class NodeReading:
+    """Measure, setpoint and fmeasure of an instrument, from one chained read."""
+
+    timestamp: float  # time.monotonic() at acquisition
+    measure: int
+    setpoint: int
+    fmeasure: float | None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+class ProparBus:
+    """One propar master per port, polling all the registered instruments at once.
+
+    Measure, setpoint and fmeasure of each instrument are read with a single chained request, and the requests to all
+    the instruments are sent back to back before waiting for the replies, so polling the whole bus costs one cycle.
+    The readings are cached for `max_age` seconds. Blocking propar calls run in the BusExecutor of the port.
+    """
+
+    _buses: ClassVar[dict[str, ProparBus]] = {}
+
+    def __init__(self, port: str, baudrate: int = 38400, max_age: float = 0.5) -> None:
+        self.port = port
+        self.max_age = max_age
+        # One bus per port in `_buses`, so all the instruments on the port share this master
+        self.master = propar.master(port, baudrate)
+        self.executor = BusExecutor.for_bus(port)
+        self._nodes: list[tuple[int, int]] = []  # (address, channel)
+        self._cache: dict[tuple[int, int], NodeReading] = {}
+        self._poll_lock = asyncio.Lock()
+
+    @classmethod
+    def for_port(cls, port: str, baudrate: int = 38400) -> ProparBus:
+        """Return the bus of `port`, opening it on first use."""
+        if port not in cls._buses:
+            cls._buses[port] = cls(port, baudrate)
+        return cls._buses[port]
+
+    def register(self, address: int, channel: int = 1):
+        """Add an instrument to the ones polled."""
+        if (address, channel) not in self._nodes:
+            self._nodes.append((address, channel))
+
+    def _parameters(self, dde_numbers, address: int, channel: int) -> list[dict]:
+        parameters = []
+        for parameter in self.master.db.get_parameters(list(dde_numbers)):
+            parameter = dict(parameter, node=address)
+            if 1 <= channel <= 16 and parameter["proc_nr"] in CHANNEL_PROCESSES:
+                parameter["proc_nr"] += channel - 1
+            parameters.append(parameter)
+        return parameters
+
+    def identification(self, address: int, channel: int = 1) -> str | None:
+        """Read the identification string of an instrument. Blocking."""
+        reply = self.master.read_parameters(self._parameters([IDENTIFICATION], address, channel))
+        return reply[0]["data"] if reply else None
+
+    def _read_nodes(self, nodes: list[tuple[int, int]]) -> dict[tuple[int, int], list[dict]]:
+        """Send the chained read requests to all the nodes, then collect the replies. Blocking."""
+        replies: dict[tuple[int, int], list[dict]] = {}
+        received: dict[tuple[int, int], threading.Event] = {}
+        for node in nodes:
+            received[node] = threading.Event()
+
+            def on_reply(parameters, node=node):
+                replies[node] = parameters
+                received[node].set()
+
+            self.master.read_parameters(self._parameters(POLLED, *node), callback=on_reply)
+
+        deadline = time.monotonic() + self.master.response_timeout
+        for event in received.values():
+            event.wait(max(deadline - time.monotonic(), 0))
+        return replies
+
+    async def poll(
+        self,
+        max_age: float | None = None,
+        nodes: list[tuple[int, int]] | None = None,
+    ) -> dict[tuple[int, int], NodeReading]:
+        """Return the readings of all the instruments, polling all of them if any of `nodes` (default all) has no
+        reading younger than `max_age` seconds.
+
+        Concurrent requests share the same poll.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        async with self._poll_lock:
+            stale = [n for n in nodes or self._nodes if n not in self._cache or self._cache[n].age > max_age]
+            if stale:
+                replies = await self.executor.run(self._read_nodes, self._nodes)
+                timestamp = time.monotonic()
+                for node in self._nodes:
+                    values = [parameter.get("data") for parameter in replies.get(node, [])]
+                    if len(values) != len(POLLED) or values[0] is None or values[1] is None:
+                        logger.warning(f"No valid reply from Bronkhorst instrument {node} on {self.port}")
+                        self._cache.pop(node, None)
+                        continue
+                    self._cache[node] = NodeReading(timestamp, *values)
+            return dict(self._cache)
+
+    async def reading(self, address: int, channel: int = 1, max_age: float | None = None) -> NodeReading:
+        """Return the reading of an instrument, from the cache if recent enough."""
+        self.register(address, channel)
+        readings = await self.poll(max_age, nodes=[(address, channel)])
+        if (address, channel) not in readings:
+            raise DeviceError(f"Cannot read Bronkhorst instrument {address} on {self.port}")
+        return readings[(address, channel)]
+
+    async def write_setpoint(self, address: int, channel: int, setpoint: int) -> bool:
+        """Write the setpoint of an instrument (0-32000 = 0-100%). Return True if acknowledged."""
+        parameters = self._parameters([SETPOINT], address, channel)
+        parameters[0]["data"] = setpoint
+        status = await self.executor.run(self.master.write_parameters, parameters)
+        self._cache.pop((address, channel), None)
+        return status == propar.PP_STATUS_OK
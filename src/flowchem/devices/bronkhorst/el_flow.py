@@ -6,6 +6,7 @@ import propar
 from loguru import logger
 
 from flowchem import ureg
+from flowchem.devices.bronkhorst._propar_bus import ProparBus
 from flowchem.devices.bronkhorst.el_flow_component import EPCComponent, MFCComponent
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.utils.people import wei_hsin
@@ -88,14 +89,14 @@ class EPC(FlowchemDevice):
         self.device_info.authors = [wei_hsin]
         self.device_info.manufacturer = "Bronkhorst"
 
+        # All the instruments on the port share the same propar master, polled at once
         try:
-            self.el_press = propar.instrument(
-                self.port, address=self.address, channel=self.channel
-            )
+            self.bus = ProparBus.for_port(self.port)
         except OSError as e:
             raise ConnectionError(f"Error connecting to {self.port} -- {e}") from e
+        self.bus.register(self.address, self.channel)
 
-        self.id = self.el_press.id
+        self.id = self.bus.identification(self.address, self.channel)
         logger.debug(f"Connected {self.id} to {self.port}")
 
     async def initialize(self):
@@ -118,12 +119,12 @@ class EPC(FlowchemDevice):
         set_p = ureg.Quantity(pressure)
         set_n = round(set_p.m_as("bar") * 32000 / self.max_pressure)
         if set_n > 32000:
-            self.el_press.setpoint = 32000
+            await self.bus.write_setpoint(self.address, self.channel, 32000)
             logger.debug(
                 "setting higher than maximum flow rate! set the flow rate to 100%",
             )
         else:
-            self.el_press.setpoint = set_n
+            await self.bus.write_setpoint(self.address, self.channel, set_n)
             logger.debug(f"set the pressure to {set_n / 320}%")
 
     async def get_pressure(self) -> float:
@@ -135,7 +136,7 @@ class EPC(FlowchemDevice):
         float
             The current pressure in bar.
         """
-        m_num = float(self.el_press.measure)
+        m_num = float((await self.bus.reading(self.address, self.channel)).measure)
         return m_num / 32000 * self.max_pressure
 
     async def get_pressure_percentage(self) -> float:
@@ -147,7 +148,7 @@ class EPC(FlowchemDevice):
         float
             The current pressure as a percentage of the maximum pressure.
         """
-        m_num = float(self.el_press.measure)
+        m_num = float((await self.bus.reading(self.address, self.channel)).measure)
         return m_num / 320
 
 
@@ -217,13 +218,13 @@ class MFC(FlowchemDevice):
         # Metadata
         self.device_info.model = "EL-FLOW"
 
+        # All the instruments on the port share the same propar master, polled at once
         try:
-            self.el_flow = propar.instrument(
-                self.port, address=self.address, channel=self.channel
-            )
+            self.bus = ProparBus.for_port(self.port)
         except OSError as e:
             raise ConnectionError(f"Error connecting to {self.port} -- {e}") from e
-        self.id = self.el_flow.id
+        self.bus.register(self.address, self.channel)
+        self.id = self.bus.identification(self.address, self.channel)
         logger.debug(f"Connected {self.id} to {self.port}")
 
     async def initialize(self):
@@ -251,12 +252,12 @@ class MFC(FlowchemDevice):
         set_f = ureg.Quantity(flowrate)
         set_n = round(set_f.m_as("ml/min") * 32000 / self.max_flow)
         if set_n > 32000:
-            self.el_flow.setpoint = 32000
+            await self.bus.write_setpoint(self.address, self.channel, 32000)
             logger.debug(
                 "setting higher than maximum flow rate! set the flow rate to 100%",
             )
         else:
-            self.el_flow.setpoint = set_n
+            await self.bus.write_setpoint(self.address, self.channel, set_n)
             logger.debug(f"set the flow rate to {set_n / 320}%")
 
     async def get_flow_setpoint(self) -> float:
@@ -268,7 +269,7 @@ class MFC(FlowchemDevice):
         float
             The current flow rate in ml/min.
         """
-        m_num = float(self.el_flow.measure)
+        m_num = float((await self.bus.reading(self.address, self.channel)).measure)
         return m_num / 32000 * self.max_flow
 
     async def get_flow_percentage(self) -> float:
@@ -280,7 +281,7 @@ class MFC(FlowchemDevice):
         float
             The current flow rate as a percentage of the maximum flow rate.
         """
-        m_num = float(self.el_flow.measure)
+        m_num = float((await self.bus.reading(self.address, self.channel)).measure)
         return m_num / 320
 
 
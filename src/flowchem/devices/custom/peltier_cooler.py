@@ -19,6 +19,7 @@ from flowchem.devices.custom.peltier_cooler_component import (
 )
 from flowchem.utils.exceptions import InvalidConfigurationError
 from flowchem.utils.people import jakob, miguel
+from flowchem.utils.rate_limit import RateLimiter
 
 
 class PeltierException(Exception):
@@ -116,6 +117,8 @@ class PeltierIO:
         "stopbits": aioserial.STOPBITS_ONE,
         "bytesize": aioserial.EIGHTBITS,
     }
+    # Conservative limit for the controller firmware, which answers each command with a prompt
+    RATE_LIMIT = {"rate": 10, "burst": 3}
 
     # noinspection PyPep8
     def __init__(self, aio_port: aioserial.Serial):
@@ -127,6 +130,7 @@ class PeltierIO:
         """
         self.lock = Lock()
         self._serial = aio_port
+        self.rate_limiter = RateLimiter(**self.RATE_LIMIT, name=f"Peltier {getattr(aio_port, 'port', '')}")
 
     @classmethod
     def from_config(cls, port, **serial_kwargs):
@@ -217,6 +221,7 @@ class PeltierIO:
     ) -> str:
         """ Main PeltierIO method. Sends a command to the peltier, read the replies and returns it, optionally parsed """
         async with self.lock:
+            await self.rate_limiter.acquire()
             self.reset_buffer()
             await self._write(command)
             response = await self._read_reply(command)
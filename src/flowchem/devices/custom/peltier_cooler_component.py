@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 from flowchem.components.technical.temperature import TemperatureControl, TempRange
+from flowchem.utils.rate_limit import RateLimitStats
 
 
 if TYPE_CHECKING:
@@ -18,6 +19,7 @@ class PeltierCoolerTemperatureControl(TemperatureControl):
     ) -> None:
         """Create a TemperatureControl object."""
         super().__init__(name, hw_device, temp_limits)
+        self.add_api_route("/rate-limit-stats", self.get_rate_limit_stats, methods=["GET"])
 
     async def set_temperature(self, temperature: str):
         """Set the target temperature to the given string in "magnitude and unit" format."""
@@ -50,3 +52,7 @@ class PeltierCoolerTemperatureControl(TemperatureControl):
     async def temperature_limits(self) -> TempRange:
         """Return a dict with `min` and `max` temperature in Celsius."""
         return self._limits
+
+    async def get_rate_limit_stats(self) -> RateLimitStats:
+        """Get the commands sent to the cooler and how many of them were delayed by the rate limit."""
+        return self.hw_device.peltier_io.rate_limiter.stats
@@ -0,0 +1,113 @@
+"""Serialized execution of the commands of a CLI tool, e.g. claritychrom.exe."""
+from __future__ import annotations
+
+import asyncio
+import shlex
+import time
+from collections import deque
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+class CommandResult(BaseModel):
+    """Outcome of a command: exit status (None if not completed within its timeout) and timing in seconds."""
+
+    command: str
+    returncode: int | None
+    queued: float  # Time waited for the previous commands to complete
+    duration: float
+
+    @property
+    def completed(self) -> bool:
+        return self.returncode is not None
+
+
+def split_arguments(command: str) -> list[str]:
+    """Split a command line into arguments as a shell would, keeping backslashes (Windows paths) as they are."""
+    lexer = shlex.shlex(command, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ""
+    return list(lexer)
+
+
+class CommandRunner:
+    """Run the commands of an executable one at a time, in order of submission, without a shell.
+
+    A command still running after its timeout is killed, unless started with `kill_on_timeout=False` (e.g. the command
+    starting the application itself): that one is left running but no longer delays the next ones. The results of the
+    last `history` commands are kept.
+    """
+
+    def __init__(self, executable: str, timeout: float, history: int = 100) -> None:
+        self.executable = executable
+        self.timeout = timeout
+        self.history: deque[CommandResult] = deque(maxlen=history)
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        # Processes left running after their timeout, awaited in the background so that they are reaped on exit
+        self._detached: set[asyncio.Task] = set()
+
+    async def run(
+        self,
+        arguments: list[str],
+        timeout: float | None = None,
+        kill_on_timeout: bool = True,
+    ) -> CommandResult:
+        """Queue a command and wait for its result."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._process_queue())
+        result = asyncio.get_running_loop().create_future()
+        await self._queue.put((arguments, timeout or self.timeout, kill_on_timeout, time.monotonic(), result))
+        return await result
+
+    async def _process_queue(self):
+        while True:
+            arguments, timeout, kill_on_timeout, submitted, result = await self._queue.get()
+            try:
+                outcome = await self._execute(arguments, timeout, kill_on_timeout, submitted)
+            except Exception as error:  # e.g. executable not found
+                if not result.done():
+                    result.set_exception(error)
+            else:
+                self.history.append(outcome)
+                if not result.done():
+                    result.set_result(outcome)
+
+    async def _execute(
+        self,
+        arguments: list[str],
+        timeout: float,
+        kill_on_timeout: bool,
+        submitted: float,
+    ) -> CommandResult:
+        command = " ".join(arguments)
+        start = time.monotonic()
+        process = await asyncio.create_subprocess_exec(self.executable, *arguments)
+        try:
+            returncode = await asyncio.wait_for(process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            returncode = None
+            if kill_on_timeout:
+                logger.error(f"Command `{command}` still running after {timeout} s, killed")
+                process.kill()
+                await process.wait()
+            else:
+                logger.debug(f"Command `{command}` still running after {timeout} s, left running")
+                task = asyncio.create_task(process.wait())
+                self._detached.add(task)
+                task.add_done_callback(self._detached.discard)
+        outcome = CommandResult(
+            command=command,
+            returncode=returncode,
+            queued=start - submitted,
+            duration=time.monotonic() - start,
+        )
+        logger.debug(f"Command `{command}` returned {returncode} in {outcome.duration:.2f} s")
+        return outcome
+
+    def stop(self):
+        """Stop processing the queue."""
+        if self._worker is not None:
+            self._worker.cancel()
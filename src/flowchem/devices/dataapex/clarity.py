@@ -9,6 +9,7 @@ from loguru import logger
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.utils.people import jakob, wei_hsin
 
+from ._command_runner import CommandResult, CommandRunner, split_arguments
 from .clarity_hplc_control import ClarityComponent
 
 
@@ -23,11 +24,11 @@ class Clarity(FlowchemDevice):
     Attributes:
     -----------
     executable : str
-        Path to the ClarityChrom executable. Automatically quoted if spaces are detected.
+        Path to the ClarityChrom executable.
     instrument_number : int
         Target instrument number for multi-instrument setups (default: 1).
     startup_time : float
-        Time (seconds) allowed for software initialization before operation.
+        Time (seconds) allowed for software initialization before operation, if not already running.
     cmd_timeout : float
         Maximum duration (seconds) allowed for individual command execution.
     _init_command : str
@@ -65,7 +66,7 @@ class Clarity(FlowchemDevice):
         instrument_number : int, optional
             The instrument number to control (default is 1).
         startup_time : float, optional
-            The time to wait for ClarityChrom to start up and become responsive (default is 20 seconds).
+            The time to wait for ClarityChrom to start up, if not already running (default is 20 seconds).
         startup_method : str, optional
             The startup method to use (default is an empty string).
         cmd_timeout : float, optional
@@ -84,17 +85,15 @@ class Clarity(FlowchemDevice):
         self.device_info.model = "Clarity Chromatography"
 
         # Validate executable
-        if which(executable):
-            self.executable = executable
-        else:
-            assert '"' not in executable
-            self.executable = f'"{executable}"'
         assert which(executable) or Path(executable).is_file(), "Valid executable found"
+        self.executable = executable
 
         # Save instance variables
         self.instrument = instrument_number
         self.startup_time = startup_time
         self.cmd_timeout = cmd_timeout
+        # Commands are executed one at a time, in order, without shell
+        self._runner = CommandRunner(executable, timeout=cmd_timeout)
 
         # Pre-form initialization command to avoid passing tons of vars to initialize()
         self._init_command = ""
@@ -104,10 +103,17 @@ class Clarity(FlowchemDevice):
         self._init_command += f' "{startup_method}"'
 
     async def initialize(self):
-        """Start ClarityChrom and wait for it to be responsive."""
-        await self.execute_command(self._init_command)
-        logger.info(f"Clarity startup: waiting {self.startup_time} seconds")
-        await asyncio.sleep(self.startup_time)
+        """Start ClarityChrom, waiting for its startup only if it was not running yet."""
+        # If ClarityChrom is running, the parameters are passed to it and the command completes. Otherwise, the command
+        # is the new ClarityChrom instance, so it is left running.
+        arguments = [f"i={self.instrument}", *split_arguments(self._init_command)]
+        result = await self._runner.run(arguments, kill_on_timeout=False)
+        if result.completed:
+            logger.info("ClarityChrom already running")
+        else:
+            startup_left = max(self.startup_time - result.duration, 0)
+            logger.info(f"Clarity startup: waiting {startup_left:.0f} seconds")
+            await asyncio.sleep(startup_left)
         self.components.append(ClarityComponent(name="clarity", hw_device=self))
 
     async def execute_command(self, command: str, without_instrument_num: bool = False):
@@ -117,6 +123,7 @@ class Clarity(FlowchemDevice):
         Commands in string format that are accepted by the device.
         There is a list of the command available.
         (See more detail in the documentation and/or the manual reference)
+        Commands are queued and executed one at a time, in order.
 
         Parameters:
         -----------
@@ -130,16 +137,16 @@ class Clarity(FlowchemDevice):
         bool
             True if command completed successfully, False on timeout.
         """
-        if without_instrument_num:
-            cmd_string = self.executable + f" {command}"
-        else:
-            cmd_string = self.executable + f" i={self.instrument} {command}"
+        arguments = split_arguments(command)
+        if not without_instrument_num:
+            arguments.insert(0, f"i={self.instrument}")
 
         logger.debug(f"Executing Clarity command `{command}`")
-        process = await asyncio.create_subprocess_shell(cmd_string)
-        try:
-            await asyncio.wait_for(process.wait(), timeout=self.cmd_timeout)
-            return True
-        except TimeoutError:
-            logger.error(f"Subprocess timeout expired (timeout = {self.cmd_timeout} s)")
-            return False
+        result = await self._runner.run(arguments)
+        if result.returncode:
+            logger.warning(f"Clarity command `{command}` returned exit status {result.returncode}")
+        return result.completed
+
+    async def command_history(self) -> list[CommandResult]:
+        """Exit status and timing of the last commands executed."""
+        return list(self._runner.history)
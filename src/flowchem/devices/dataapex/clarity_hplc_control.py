@@ -6,6 +6,8 @@ from fastapi import Query
 
 from flowchem.components.analytics.hplc import HPLCControl
 
+from ._command_runner import CommandResult
+
 if TYPE_CHECKING:
     from flowchem.devices import Clarity
 
@@ -47,6 +49,18 @@ class ClarityComponent(HPLCControl):
         super().__init__(name, hw_device)
         # Clarity-specific command
         self.add_api_route("/exit", self.exit, methods=["PUT"])
+        self.add_api_route("/command-history", self.command_history, methods=["GET"])
+
+    async def command_history(self) -> list[CommandResult]:
+        """
+        Exit status and timing (seconds queued and running) of the last CLI commands executed.
+
+        Returns:
+        --------
+        list[CommandResult]
+            The last commands, oldest first.
+        """
+        return await self.hw_device.command_history()
 
     async def exit(self) -> bool:
         """
@@ -4,7 +4,7 @@ from __future__ import annotations
 import asyncio
 import string
 import warnings
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING
 
@@ -13,11 +13,13 @@ from loguru import logger
 
 from flowchem import ureg
 from flowchem.components.device_info import DeviceInfo
+from flowchem.components.pumps.motion_model import PumpMotionModel
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.devices.hamilton.ml600_pump import ML600Pump
 from flowchem.devices.hamilton.ml600_valve import ML600LeftValve, ML600RightValve
 from flowchem.utils.exceptions import InvalidConfigurationError, DeviceError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.wait import wait_until
 
 if TYPE_CHECKING:
     import pint
@@ -40,18 +42,45 @@ class Protocol1Command:
     parameter_value: str = ""
     execution_command: str = "R"  # Execute
 
-    def compile(self) -> str:
-        """Create actual command byte by prepending pump address to command and appending executing command."""
-        compiled_command = (
-            f"{PUMP_ADDRESS[self.target_pump_num]}"
-            f"{self.target_component}"
-            f"{self.command}{self.command_value}"
-        )
+    def compile_body(self) -> str:
+        """Create the command string without pump address and executing command."""
+        compiled_command = f"{self.target_component}{self.command}{self.command_value}"
 
         if self.parameter_value:
             compiled_command += f"{self.optional_parameter}{self.parameter_value}"
 
-        return compiled_command + self.execution_command
+        return compiled_command
+
+    def compile(self) -> str:
+        """Create actual command byte by prepending pump address to command and appending executing command."""
+        return f"{PUMP_ADDRESS[self.target_pump_num]}{self.compile_body()}{self.execution_command}"
+
+
+@dataclass
+class Protocol1CommandBatch:
+    """Several pump commands concatenated and executed together with a single transmission.
+
+    Only commands that are buffered until execution (e.g. valve moves, syringe moves w/ speed) can be combined, as
+    queries are answered immediately. The pump acknowledges the whole batch with a single reply.
+    """
+
+    commands: list[Protocol1Command] = field(default_factory=list)
+    target_pump_num: int = 1
+    execution_command: str = "R"  # Execute
+
+    def add(self, command: Protocol1Command) -> Protocol1CommandBatch:
+        """Append a command to the batch. Returns the batch itself, so that calls can be chained."""
+        if command.execution_command != "R":
+            raise ValueError(f"Command {command.command!r} cannot be batched, it is not a buffered command!")
+        self.commands.append(command)
+        return self
+
+    def compile(self) -> str:
+        """Create the compound command string: pump address, all the command bodies and the executing command."""
+        if not self.commands:
+            raise ValueError("Cannot compile an empty command batch!")
+        body = "".join(command.compile_body() for command in self.commands)
+        return f"{PUMP_ADDRESS[self.target_pump_num]}{body}{self.execution_command}"
 
 
 class HamiltonPumpIO:
@@ -73,6 +102,8 @@ class HamiltonPumpIO:
         self.num_pump_connected: int | None = (
             None  # Set by `HamiltonPumpIO.initialize()`
         )
+        # ML600 instances sharing this connection, see `ML600.execute_loaded_moves()`
+        self.devices: list[ML600] = []
 
     @classmethod
     def from_config(cls, config):
@@ -88,12 +119,48 @@ class HamiltonPumpIO:
 
         return cls(serial_object)
 
-    async def initialize(self, hw_initialization: bool = True):
-        """Ensure connection with pump and initialize it (if hw_initialization is True)."""
+    async def initialize(self, hw_initialization: bool = True, ready_timeout: float = 30):
+        """Ensure connection with pump and initialize it (if hw_initialization is True).
+
+        With hw_initialization, returns once all the pumps in the chain report to be done homing, or after
+        `ready_timeout` seconds.
+        """
         self.num_pump_connected = await self._assign_pump_address()
         if hw_initialization:
             await self.all_hw_init()  # initialization take more than 8.5 sec for one instrument
-            await asyncio.sleep(8)  # this might be necessary due to checking request_done sometime fail with "" return
+            await self.wait_until_ready(ready_timeout)
+
+    async def _is_pump_ready(self, pump_num: int) -> bool:
+        """Query the pump with the request-done command.
+
+        Replies are often empty or garbled while the pump is homing, those are considered as busy.
+        """
+        command = Protocol1Command(command=ML600Commands.REQUEST_DONE.value, target_pump_num=pump_num,
+                                   execution_command="")
+        self._serial.reset_input_buffer()
+        await self._write_async(f"{command.compile()}\r".encode("ascii"))
+        try:
+            response = await self._read_reply_async()
+        except UnicodeDecodeError:
+            return False
+        return response[:1] == self.ACKNOWLEDGE and response[1:].rstrip() == "Y"
+
+    async def wait_until_ready(self, timeout: float = 30) -> bool:
+        """Wait until all the pumps in the chain are done with their commands (e.g. homing)."""
+        pending = set(range(1, (self.num_pump_connected or 0) + 1))
+
+        async def all_ready() -> bool:
+            for pump_num in sorted(pending):
+                if await self._is_pump_ready(pump_num):
+                    pending.discard(pump_num)
+            return not pending
+
+        try:
+            await wait_until(all_ready, timeout=timeout, min_interval=0.1, max_interval=0.5)
+        except TimeoutError:
+            logger.warning(f"Pumps {sorted(pending)} on {self._serial.port} not ready after {timeout} s!")
+            return False
+        return True
 
     async def _assign_pump_address(self) -> int:
         """Auto assign pump addresses.
@@ -132,6 +199,10 @@ class HamiltonPumpIO:
         await self._write_async(b":XR\r")  # Broadcast: initialize + execute
         # Note: no need to consume reply here because there is none (since we are using broadcast)
 
+    async def broadcast_execute(self):
+        """Execute the commands loaded in the buffer of all the pumps at once."""
+        await self._write_async(b":R\r")  # Broadcast commands have no reply
+
     async def _write_async(self, command: bytes):
         """Write a command to the pump."""
         await self._serial.write_async(command)
@@ -165,8 +236,8 @@ class HamiltonPumpIO:
         # [binary_list.append(format(byte, '08b')[::-1]) for byte in reply.encode('ascii')]
         # all_status = binary_list[0]
 
-    async def write_and_read_reply_async(self, command: Protocol1Command) -> str:
-        """Send a command to the pump, read the replies and returns it, optionally parsed."""
+    async def _write_and_read_raw_reply_async(self, command: Protocol1Command | Protocol1CommandBatch) -> str:
+        """Send a command to the pump and return the unparsed reply."""
         self._serial.reset_input_buffer()
         await self._write_async(f"{command.compile()}\r".encode("ascii"))
         response = await self._read_reply_async()
@@ -176,9 +247,19 @@ class HamiltonPumpIO:
                 f"No response received from pump! "
                 f"Maybe wrong pump address? (Set to {command.target_pump_num})"
             )
+        return response
 
+    async def write_and_read_reply_async(self, command: Protocol1Command) -> str:
+        """Send a command to the pump, read the replies and returns it, optionally parsed."""
+        response = await self._write_and_read_raw_reply_async(command)
         return self._parse_response(response)
 
+    async def write_and_check_acknowledge_async(self, command: Protocol1Command | Protocol1CommandBatch) -> bool:
+        """Send a command (or a batch of commands) to the pump, return True if the pump acknowledged it."""
+        response = await self._write_and_read_raw_reply_async(command)
+        self._parse_response(response)
+        return response[:1] == self.ACKNOWLEDGE
+
 
 class ML600Commands(Enum):
     """ Just a collection of commands. Grouped here to ease future, unlikely, changes. """
@@ -316,6 +397,7 @@ class ML600(FlowchemDevice):
         # HamiltonPumpIO
         self.pump_io = pump_io
         ML600._io_instances.add(self.pump_io)  # See above for details.
+        self.pump_io.devices.append(self)
 
         # Pump address is the pump sequence number if in chain. Count starts at 1, default.
         self.address = int(address)
@@ -346,6 +428,10 @@ class ML600(FlowchemDevice):
         # This enables to configure on per-pump basis uncommon parameters
         self.config = ML600.DEFAULT_CONFIG | config
         self.dual_syringe = False
+        # Estimated state of each syringe from the commanded moves, used to reduce status polling.
+        self._motion_models: dict[str, PumpMotionModel] = {}
+        # Moves loaded but not executed yet, as PumpMotionModel.start() kwargs.
+        self._loaded_moves: dict[str, dict] = {}
 
     @classmethod
     def from_config(cls, **config):
@@ -498,6 +584,13 @@ class ML600(FlowchemDevice):
         steps = volume * self._steps_per_ml
         return round(steps.m_as("steps"))
 
+    def motion_model(self, pump: str = "") -> PumpMotionModel:
+        """Return the model estimating the state of the syringe from the commanded moves."""
+        pump = "B" if not pump else pump
+        if pump not in self._motion_models:
+            self._motion_models[pump] = PumpMotionModel()
+        return self._motion_models[pump]
+
     async def get_current_volume(self, pump: str) -> pint.Quantity:
         """Return current syringe position in ml."""
         syringe_pos = await self.send_command_and_read_reply(
@@ -506,23 +599,77 @@ class ML600(FlowchemDevice):
         )
 
         current_steps = int(syringe_pos) * ureg.step
-        return current_steps / self._steps_per_ml
+        current_volume = current_steps / self._steps_per_ml
+        self.motion_model(pump).correct(syringe_volume=current_volume.m_as("ml"))
+        return current_volume
 
-    async def set_to_volume(self, target_volume: pint.Quantity, rate: pint.Quantity, pump: str):
-        """Absolute move to target volume provided by set step position and speed."""
+    async def set_to_volume(
+        self,
+        target_volume: pint.Quantity,
+        rate: pint.Quantity,
+        pump: str,
+        current_volume: pint.Quantity | None = None,
+        execute: bool = True,
+        valve_angle: int | None = None,
+    ) -> bool:
+        """Absolute move to target volume provided by set step position and speed.
+
+        The current volume, if provided or reliably estimated, is used to predict the movement (see `motion_model()`).
+        If execute is False, the move is only loaded in the pump buffer, see `execute_loaded_moves()`.
+        If a valve angle is provided, the valve is switched (clockwise) before the syringe move, within the same
+        transmission.
+        Returns True if the pump acknowledged the command.
+        """
         speed = self._flowrate_to_seconds_per_stroke(rate)  # in seconds/stroke
         set_speed = self._validate_speed(speed)
         position = self._volume_to_step_position(target_volume)
         logger.debug(f"Pump {self.name} set to volume {target_volume} at speed {set_speed}")
 
-        abs_move_cmd = Protocol1Command(
+        batch = Protocol1CommandBatch(target_pump_num=self.address, execution_command="R" if execute else "")
+        if valve_angle is not None:
+            batch.add(Protocol1Command(command=ML600Commands.VALVE_BY_ANGLE_CW.value, command_value=str(valve_angle),
+                                       target_component=pump if self.dual_syringe else ""))
+        batch.add(Protocol1Command(
             command=ML600Commands.ABSOLUTE_MOVE.value,
             optional_parameter=ML600Commands.OPTIONAL_PARAMETER.value,
             command_value=str(position),
             parameter_value=set_speed,
-            target_component=pump
-        )
-        return await self.send_command_and_read_reply(abs_move_cmd)
+            target_component=pump,
+        ))
+        acknowledged = await self.pump_io.write_and_check_acknowledge_async(batch)
+        if not acknowledged:
+            return False
+
+        model = self.motion_model(pump)
+        estimated_volume = model.syringe_volume()
+        if current_volume is None and estimated_volume is not None and not model.is_stale():
+            current_volume = ureg.Quantity(estimated_volume, "ml")
+        if current_volume is None:
+            model.invalidate()
+            return True
+
+        # The actual rate differs from the requested one if the speed was out of bounds
+        actual_rate = self._seconds_per_stroke_to_flowrate(ureg.Quantity(f"{set_speed} sec/stroke"))
+        move = {
+            "rate": actual_rate.m_as("ml/min"),
+            "volume": abs(target_volume - current_volume).m_as("ml"),
+            "withdrawing": target_volume > current_volume,
+            "syringe_volume": current_volume.m_as("ml"),
+        }
+        if execute:
+            model.start(**move)
+        else:
+            self._loaded_moves[pump] = move
+        return True
+
+    async def execute_loaded_moves(self):
+        """Start the moves loaded on all the pumps of the daisy chain with a single broadcast execute command."""
+        await self.pump_io.broadcast_execute()
+        for device in self.pump_io.devices:
+            for pump, move in device._loaded_moves.items():
+                device.motion_model(pump).start(**move)
+            device._loaded_moves.clear()
+        logger.debug(f"Loaded moves started on {self.pump_io._serial.port}")
 
     async def pause(self, pump: str):
         """Pause any running command."""
@@ -536,9 +683,11 @@ class ML600(FlowchemDevice):
 
     async def stop(self, pump: str) -> bool:
         """Stop and abort any running command."""
+        self._loaded_moves.pop(pump, None)
         await self.pause(pump)
         await self.send_command_and_read_reply(
             Protocol1Command(command="", target_component=pump, execution_command="V"),)
+        self.motion_model(pump).stop()
         return True  # Todo: need?
 
     async def get_pump_status(self, pump: str = "") -> bool:
@@ -546,6 +695,7 @@ class ML600(FlowchemDevice):
         checking_mapping = {"B": 1, "C": 3}
         pump = "B" if not pump else pump
         status = await self.get_component_status(checking_mapping[pump])
+        self.motion_model(pump).correct(is_pumping=status)
         logger.info(f"pump {pump} is busy: {status}")
         return status
 
@@ -610,12 +760,32 @@ class ML600(FlowchemDevice):
                 ))
         return status
 
-    async def wait_until_system_idle(self):
-        """Return when no more commands are present in the pump buffer."""
+    async def wait_until_system_idle(
+        self,
+        timeout: float | None = None,
+        cancel_event: asyncio.Event | None = None,
+    ) -> bool:
+        """Return when no more commands are present in the pump buffer.
+
+        If the end of the running moves is known, the pump is not polled until shortly before it. Polling then
+        happens with exponential back-off. Returns False if the wait was cancelled via `cancel_event`.
+        """
         logger.debug(f"ML600 {self.name} wait until idle...")
-        while not await self.is_system_idle():
-            await asyncio.sleep(0.1)
+        remaining_times = [model.remaining_time() for model in self._motion_models.values() if model.is_pumping()]
+        expected_duration = None
+        if remaining_times and None not in remaining_times:
+            expected_duration = max(remaining_times)
+        if not await wait_until(
+            self.is_system_idle,
+            expected_duration=expected_duration,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        ):
+            return False
+        for model in self._motion_models.values():
+            model.correct(is_pumping=False)
         logger.debug(f"...ML600 {self.name} idle now!")
+        return True
 
     async def is_system_idle(self) -> bool:
         """Check if the pump is idle (actually check if the last command has ended)."""
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 from loguru import logger
 
 from flowchem import ureg
+from flowchem.components.pumps.motion_model import PumpMotionState
 from flowchem.components.pumps.syringe_pump import SyringePump
 from flowchem.utils.exceptions import DeviceError
 
@@ -31,12 +32,20 @@ class ML600Pump(SyringePump):
         Check if the pump supports withdrawal operations.
     is_pumping() -> bool:
         Check if the pump is currently moving.
+    get_estimated_state() -> PumpMotionState:
+        Return the pump state estimated from the commanded moves, without querying the pump.
     stop() -> bool:
         Stop the pump's operation.
-    infuse(rate: str = "", volume: str = "") -> bool:
+    infuse(rate: str = "", volume: str = "", valve_angle: int | None = None) -> bool:
         Start an infusion with specified rate and volume.
-    withdraw(rate: str = "1 ml/min", volume: str | None = None) -> bool:
+    withdraw(rate: str = "1 ml/min", volume: str | None = None, valve_angle: int | None = None) -> bool:
         Start a withdrawal with specified rate and volume.
+    load_infuse(rate: str = "", volume: str = "", valve_angle: int | None = None) -> bool:
+        Load an infusion without executing it.
+    load_withdraw(rate: str = "1 ml/min", volume: str | None = None, valve_angle: int | None = None) -> bool:
+        Load a withdrawal without executing it.
+    start_loaded() -> bool:
+        Start the loaded movements of all the pumps in the daisy chain at once.
     """
     pump_code: str
     hw_device: ML600  # for typing's sake
@@ -58,6 +67,10 @@ class ML600Pump(SyringePump):
         super().__init__(name, hw_device)
         self.pump_code = pump_code
         # self.add_api_route("/pump", self.get_monitor_position, methods=["GET"])
+        self.add_api_route("/load-infuse", self.load_infuse, methods=["PUT"])
+        self.add_api_route("/load-withdraw", self.load_withdraw, methods=["PUT"])
+        self.add_api_route("/start-loaded", self.start_loaded, methods=["PUT"])
+        self.add_api_route("/estimated-state", self.get_estimated_state, methods=["GET"])
 
     @staticmethod
     def is_withdrawing_capable() -> bool:
@@ -75,14 +88,30 @@ class ML600Pump(SyringePump):
         """
         Check if the pump is currently moving.
 
+        The answer is estimated from the commanded moves when reliable, otherwise the pump is queried.
+
         Returns:
         --------
         bool
             True if the pump is moving or has commands in buffer, False if it's idle.
         """
+        model = self.hw_device.motion_model(self.pump_code)
+        if not model.is_stale():
+            return model.is_pumping()
         # true might mean pump is moving, buffer still contain command or both
         return await self.hw_device.get_pump_status(self.pump_code)
 
+    async def get_estimated_state(self) -> PumpMotionState:
+        """
+        Return the pump state estimated from the commanded moves, without querying the pump.
+
+        Returns:
+        --------
+        PumpMotionState
+            Estimated syringe volume, remaining time and pumping status, with the age of the last hardware readback.
+        """
+        return self.hw_device.motion_model(self.pump_code).state()
+
     async def stop(self) -> bool:
         """
         Stop the pump's operation.
@@ -102,7 +131,51 @@ class ML600Pump(SyringePump):
             await asyncio.sleep(1)
             return not await self.hw_device.get_pump_status(self.pump_code)
 
-    async def infuse(self, rate: str = "", volume: str = "") -> bool:
+    async def _infuse_target(self, rate: str, volume: str):
+        """Return target volume, current volume (if queried) and rate for an infusion. See `infuse()`."""
+        if not rate:
+            rate = self.hw_device.config.get("default_infuse_rate")  # type: ignore
+            logger.warning(f"the flow rate is not provided. set to the default {rate}")
+        current_volume = None
+        if not volume:
+            target_vol = ureg.Quantity("0 ml")
+            logger.warning("the volume to infuse is not provided. set to 0 ml")
+        else:
+            current_volume = await self.hw_device.get_current_volume(self.pump_code)
+            target_vol = current_volume - ureg.Quantity(volume)
+            if target_vol < 0:
+                logger.error(
+                    f"Cannot infuse target volume {volume}! "
+                    f"Only {current_volume} in the syringe!",
+                )
+                raise DeviceError(f"Cannot infuse target volume {volume}! "
+                                  f"Only {current_volume} in the syringe!")
+                # return False
+        return target_vol, current_volume, rate
+
+    async def _withdraw_target(self, rate: str, volume: str | None):
+        """Return target volume, current volume (if queried) and rate for a withdrawal. See `withdraw()`."""
+        if not rate:
+            rate = self.hw_device.config["default_withdraw_rate"]
+            logger.warning(f"the flow rate is not provided. set to the default {rate}")
+        current_volume = None
+        if volume is None:
+            target_vol = self.hw_device.syringe_volume
+            logger.warning(f"the volume to withdraw is not provided. set to {self.hw_device.syringe_volume}")
+        else:
+            current_volume = await self.hw_device.get_current_volume(self.pump_code)
+            target_vol = current_volume + ureg.Quantity(volume)
+            if target_vol > self.hw_device.syringe_volume:
+                logger.error(
+                    f"Cannot withdraw target volume {volume}! "
+                    f"Max volume left is {self.hw_device.syringe_volume - current_volume}!",
+                )
+                raise DeviceError(f"Cannot withdraw target volume {volume}! "
+                                  f"Max volume left is {self.hw_device.syringe_volume - current_volume}!")
+                # return False
+        return target_vol, current_volume, rate
+
+    async def infuse(self, rate: str = "", volume: str = "", valve_angle: int | None = None) -> bool:
         """
         Start an infusion with the given rate and volume.
 
@@ -116,6 +189,8 @@ class ML600Pump(SyringePump):
             The infusion rate (default is the device's configured default).
         volume : str, optional
             The volume to infuse (default is the maximum possible volume).
+        valve_angle : int, optional
+            Angle (in degrees) the valve is switched to before the move, sent in the same transmission as the move.
 
         Returns:
         --------
@@ -129,29 +204,14 @@ class ML600Pump(SyringePump):
         """
         if await self.is_pumping():
             await self.stop()
-        if not rate:
-            rate = self.hw_device.config.get("default_infuse_rate")  # type: ignore
-            logger.warning(f"the flow rate is not provided. set to the default {rate}")
-        if not volume:
-            target_vol = ureg.Quantity("0 ml")
-            logger.warning("the volume to infuse is not provided. set to 0 ml")
-        else:
-            current_volume = await self.hw_device.get_current_volume(self.pump_code)
-            target_vol = current_volume - ureg.Quantity(volume)
-            if target_vol < 0:
-                logger.error(
-                    f"Cannot infuse target volume {volume}! "
-                    f"Only {current_volume} in the syringe!",
-                )
-                raise DeviceError(f"Cannot infuse target volume {volume}! "
-                                  f"Only {current_volume} in the syringe!")
-                # return False
-
-        await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code)
+        target_vol, current_volume, rate = await self._infuse_target(rate, volume)
+        await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code, current_volume,
+                                           valve_angle=valve_angle)
         logger.info(f"infusing is run. it will take {ureg.Quantity(volume) / ureg.Quantity(rate)} to finish.")
-        return await self.hw_device.get_pump_status(self.pump_code)
+        # Answered by the motion model of the acknowledged move, the pump is only queried if that is not reliable
+        return await self.is_pumping()
 
-    async def withdraw(self, rate: str = "1 ml/min", volume: str | None = None) -> bool:
+    async def withdraw(self, rate: str = "1 ml/min", volume: str | None = None, valve_angle: int | None = None) -> bool:
         """
         Start a withdrawal with the given rate and volume.
 
@@ -163,6 +223,8 @@ class ML600Pump(SyringePump):
             The withdrawal rate (default is "1 ml/min").
         volume : str, optional
             The volume to withdraw (default is the maximum possible volume).
+        valve_angle : int, optional
+            Angle (in degrees) the valve is switched to before the move, sent in the same transmission as the move.
 
         Returns:
         --------
@@ -176,24 +238,62 @@ class ML600Pump(SyringePump):
         """
         if await self.is_pumping():
             await self.stop()
-        if not rate:
-            rate = self.hw_device.config["default_withdraw_rate"]
-            logger.warning(f"the flow rate is not provided. set to the default {rate}")
-        if volume is None:
-            target_vol = self.hw_device.syringe_volume
-            logger.warning(f"the volume to withdraw is not provided. set to {self.hw_device.syringe_volume}")
-        else:
-            current_volume = await self.hw_device.get_current_volume(self.pump_code)
-            target_vol = current_volume + ureg.Quantity(volume)
-            if target_vol > self.hw_device.syringe_volume:
-                logger.error(
-                    f"Cannot withdraw target volume {volume}! "
-                    f"Max volume left is {self.hw_device.syringe_volume - current_volume}!",
-                )
-                raise DeviceError(f"Cannot withdraw target volume {volume}! "
-                                  f"Max volume left is {self.hw_device.syringe_volume - current_volume}!")
-                # return False
-
-        await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code)
+        target_vol, current_volume, rate = await self._withdraw_target(rate, volume)
+        await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code, current_volume,
+                                           valve_angle=valve_angle)
         logger.info(f"withdrawing is run. it will take {ureg.Quantity(volume) / ureg.Quantity(rate)} to finish.")
-        return await self.hw_device.get_pump_status(self.pump_code)
+        # Answered by the motion model of the acknowledged move, the pump is only queried if that is not reliable
+        return await self.is_pumping()
+
+    async def load_infuse(self, rate: str = "", volume: str = "", valve_angle: int | None = None) -> bool:
+        """
+        Load an infusion in the pump buffer without executing it. See `infuse()` for the parameters.
+
+        The loaded movements of all the pumps in the daisy chain are started together with `start_loaded()`.
+
+        Returns:
+        --------
+        bool
+            True if the movement was loaded.
+        """
+        if await self.is_pumping():
+            await self.stop()
+        target_vol, current_volume, rate = await self._infuse_target(rate, volume)
+        return await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code, current_volume,
+                                                  execute=False, valve_angle=valve_angle)
+
+    async def load_withdraw(
+        self,
+        rate: str = "1 ml/min",
+        volume: str | None = None,
+        valve_angle: int | None = None,
+    ) -> bool:
+        """
+        Load a withdrawal in the pump buffer without executing it. See `withdraw()` for the parameters.
+
+        The loaded movements of all the pumps in the daisy chain are started together with `start_loaded()`.
+
+        Returns:
+        --------
+        bool
+            True if the movement was loaded.
+        """
+        if await self.is_pumping():
+            await self.stop()
+        target_vol, current_volume, rate = await self._withdraw_target(rate, volume)
+        return await self.hw_device.set_to_volume(target_vol, ureg.Quantity(rate), self.pump_code, current_volume,
+                                                  execute=False, valve_angle=valve_angle)
+
+    async def start_loaded(self) -> bool:
+        """
+        Start at once the movements loaded on all the pumps of the daisy chain.
+
+        A single broadcast execute command is sent, so all the pumps start in the same serial frame.
+
+        Returns:
+        --------
+        bool
+            True once the execute command has been sent.
+        """
+        await self.hw_device.execute_loaded_moves()
+        return True
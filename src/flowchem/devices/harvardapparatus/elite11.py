@@ -10,6 +10,7 @@ from pydantic import BaseModel
 
 from flowchem import ureg
 from flowchem.components.device_info import DeviceInfo
+from flowchem.components.pumps.motion_model import PumpMotionModel
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.devices.harvardapparatus._pumpio import (
     HarvardApparatusPumpIO,
@@ -22,6 +23,7 @@ from flowchem.devices.harvardapparatus.elite11_pump import (
 )
 from flowchem.utils.exceptions import InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.wait import wait_until
 
 
 class PumpInfo(BaseModel):
@@ -100,6 +102,13 @@ class Elite11(FlowchemDevice):
         self.address = address
         self._infuse_only = False  # Actual value set in initialize
 
+        # Last commanded rates (ml/min) and target volume (ml), used to predict the end of movements
+        self._infuse_rate: float | None = None
+        self._withdraw_rate: float | None = None
+        self._target_volume: float | None = None
+        # Estimated state from the commanded movements, used to reduce status polling
+        self.motion_model = PumpMotionModel()
+
         # syringe diameter and volume, and force will be set in initialize()
         self._force = force
         if syringe_diameter:
@@ -320,29 +329,67 @@ class Elite11(FlowchemDevice):
         """Evaluate prompt for current status, i.e. moving or not."""
         status = await self._send_command_and_read_reply(" ", parse=False)
         prompt = PumpStatus(status[2:3])
-        return prompt in (PumpStatus.INFUSING, PumpStatus.WITHDRAWING)
+        moving = prompt in (PumpStatus.INFUSING, PumpStatus.WITHDRAWING)
+        self.motion_model.correct(is_pumping=moving)
+        return moving
+
+    async def _record_move_start(self, rate: float | None, withdrawing: bool = False):
+        """Record the movement just started in the motion model, only possible if the rate is known.
+
+        The target volume is compared by the pump with the volume counter of the direction (infused or withdrawn
+        volume, cleared when the target is set), so the volume left to move is the target minus that counter.
+        """
+        if not rate:
+            self.motion_model.invalidate()
+            return
+        volume = None
+        if self._target_volume is not None:
+            counter = await self._send_command_and_read_reply("wvolume" if withdrawing else "ivolume")
+            volume = max(self._target_volume - ureg.Quantity(counter).m_as("ml"), 0.0)
+        self.motion_model.start(rate, volume=volume, withdrawing=withdrawing)
 
     async def infuse(self):
         """Run pump in infuse mode."""
         await self._send_command_and_read_reply("irun")
+        await self._record_move_start(self._infuse_rate)
         logger.info("Pump infusion started!")
         return True
 
     async def withdraw(self):
         """Activate pump to run in withdraw mode."""
         await self._send_command_and_read_reply("wrun")
+        await self._record_move_start(self._withdraw_rate, withdrawing=True)
         logger.info("Pump withdraw started!")
         return True
 
     async def stop(self):
         """Stop pump."""
         await self._send_command_and_read_reply("stp")
+        self.motion_model.stop()
         logger.info("Pump stopped")
 
-    async def wait_until_idle(self):
-        """Wait until the pump is not moving."""
-        while await self.is_moving():
-            await asyncio.sleep(0.05)
+    async def _is_idle(self) -> bool:
+        return not await self.is_moving()
+
+    async def wait_until_idle(
+        self,
+        timeout: float | None = None,
+        cancel_event: asyncio.Event | None = None,
+    ) -> bool:
+        """Wait until the pump is not moving.
+
+        If the end of the movement is predictable (target volume and rate set), no polling happens until shortly
+        before it. Returns False if the wait was cancelled via `cancel_event`.
+        """
+        expected_duration = None
+        if not self.motion_model.is_stale():
+            expected_duration = self.motion_model.remaining_time()
+        return await wait_until(
+            self._is_idle,
+            expected_duration=expected_duration,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
 
     async def get_flow_rate(self) -> float:
         """Return the infusion rate as str w/ units."""
@@ -358,6 +405,7 @@ class Elite11(FlowchemDevice):
             "irate",
             parameter=f"{set_rate:.10f} m/m",
         )
+        self._infuse_rate = set_rate
 
     async def get_withdrawing_flow_rate(self) -> float:
         """Return the withdrawing flow rate as ml/min."""
@@ -370,6 +418,7 @@ class Elite11(FlowchemDevice):
         """Set the infusion rate."""
         set_rate = await self._bound_rate_to_pump_limits(rate=rate)
         await self._send_command_and_read_reply("wrate", parameter=f"{set_rate} m/m")
+        self._withdraw_rate = set_rate
 
     async def set_target_volume(self, volume: str):
         """Set target volume in ml. If the volume is set to 0, the target is cleared."""
@@ -378,6 +427,7 @@ class Elite11(FlowchemDevice):
         target_volume = ureg.Quantity(volume)
         if target_volume.magnitude == 0:
             await self._send_command_and_read_reply("ctvolume")
+            self._target_volume = None
         else:
             set_vol = await self._send_command_and_read_reply(
                 "tvolume",
@@ -389,6 +439,8 @@ class Elite11(FlowchemDevice):
                     f"{self.get_syringe_volume()} syringe!",
                     stacklevel=2,
                 )
+            else:
+                self._target_volume = target_volume.m_as("ml")
 
     async def pump_info(self) -> PumpInfo:
         """Return pump info."""
@@ -7,6 +7,7 @@ from loguru import logger
 
 if TYPE_CHECKING:
     from .elite11 import Elite11
+from flowchem.components.pumps.motion_model import PumpMotionState
 from flowchem.components.pumps.syringe_pump import SyringePump
 
 
@@ -19,6 +20,10 @@ class Elite11PumpOnly(SyringePump):
     """
     hw_device: Elite11  # for typing's sake
 
+    def __init__(self, name: str, hw_device: Elite11) -> None:
+        super().__init__(name, hw_device)
+        self.add_api_route("/estimated-state", self.get_estimated_state, methods=["GET"])
+
     @staticmethod
     def is_withdrawing_capable():
         """
@@ -33,11 +38,24 @@ class Elite11PumpOnly(SyringePump):
         """
         Check if the pump is currently moving.
 
+        The answer is estimated from the commanded movements when reliable, otherwise the pump is queried.
+
         Returns:
             bool: True if the pump is moving, False otherwise.
         """
+        if not self.hw_device.motion_model.is_stale():
+            return self.hw_device.motion_model.is_pumping()
         return await self.hw_device.is_moving()
 
+    async def get_estimated_state(self) -> PumpMotionState:
+        """
+        Return the pump state estimated from the commanded movements, without querying the pump.
+
+        Returns:
+            PumpMotionState: Estimated pumping status and remaining time, with the age of the last hardware readback.
+        """
+        return self.hw_device.motion_model.state()
+
     async def stop(self):
         """Stop pump."""
         await self.hw_device.stop()
@@ -13,6 +13,7 @@ from flowchem.devices.huber.huber_temperature_control import HuberTemperatureCon
 from flowchem.devices.huber.pb_command import PBCommand
 from flowchem.utils.exceptions import InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.rate_limit import RateLimiter
 
 
 class HuberChiller(FlowchemDevice):
@@ -25,6 +26,8 @@ class HuberChiller(FlowchemDevice):
         "stopbits": aioserial.STOPBITS_ONE,
         "bytesize": aioserial.EIGHTBITS,
     }
+    # Conservative limit for PB commands at 9600 baud, the chiller replying to each command in turn
+    RATE_LIMIT = {"rate": 5, "burst": 2}
 
     def __init__(
         self,
@@ -37,6 +40,7 @@ class HuberChiller(FlowchemDevice):
         self._serial = aio
         self._min_t: float = min_temp
         self._max_t: float = max_temp
+        self.rate_limiter = RateLimiter(**self.RATE_LIMIT, name=f"Huber {name}")
 
         self.device_info = DeviceInfo(
             authors=[dario, jakob, wei_hsin],
@@ -110,6 +114,7 @@ class HuberChiller(FlowchemDevice):
         """
         # Send command. Using PBCommand ensure command validation, see PBCommand.to_chiller()
         pb_command = PBCommand(command.upper())
+        await self.rate_limiter.acquire()
         await self._serial.write_async(pb_command.to_chiller())
         logger.debug(f"Command {command[0:8]} sent!")
 
@@ -7,7 +7,8 @@ if TYPE_CHECKING:
     from .chiller import HuberChiller
 
 
-from flowchem.components.technical.temperature import TemperatureControl
+from flowchem.components.technical.temperature import TemperatureControl, TempRange
+from flowchem.utils.rate_limit import RateLimitStats
 
 
 class HuberTemperatureControl(TemperatureControl):
@@ -19,6 +20,11 @@ class HuberTemperatureControl(TemperatureControl):
     """
     hw_device: HuberChiller  # for typing's sake
 
+    def __init__(self, name: str, hw_device: HuberChiller, temp_limits: TempRange) -> None:
+        """Create a TemperatureControl object."""
+        super().__init__(name, hw_device, temp_limits)
+        self.add_api_route("/rate-limit-stats", self.get_rate_limit_stats, methods=["GET"])
+
     async def set_temperature(self, temp: str):
         """
         Set the target temperature to the given value.
@@ -67,3 +73,12 @@ class HuberTemperatureControl(TemperatureControl):
             bool: True if the command was successfully sent, False otherwise.
         """
         return await self.hw_device._send_command_and_read_reply("{M140000")
+
+    async def get_rate_limit_stats(self) -> RateLimitStats:
+        """
+        Get the commands sent to the chiller and how many of them were delayed by the rate limit.
+
+        Returns:
+            RateLimitStats: Commands sent, commands delayed and total delay in seconds.
+        """
+        return self.hw_device.rate_limiter.stats
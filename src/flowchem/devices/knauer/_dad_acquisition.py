@@ -0,0 +1,56 @@
+"""Buffer of the signals acquired by the Knauer DAD acquisition loop."""
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import numpy as np
+from pydantic import BaseModel
+
+
+class SignalHistory(BaseModel):
+    """Signal values of a channel with their acquisition time (POSIX timestamp)."""
+
+    timestamp: list[float]
+    signal: list[float]
+
+
+def parse_signal_reply(reply: str) -> tuple[int, float] | None:
+    """Parse a reply like `SIG1:113545` into channel and signal (in mAU). None for other replies (e.g. `SIG1:OK`)."""
+    header, _, value = reply.partition(":")
+    if not header.startswith("SIG") or not header[3:].isdigit():
+        return None
+    try:
+        return int(header[3:]), float(value.rstrip(",")) / 10000
+    except ValueError:
+        return None
+
+
+class ChannelBuffer:
+    """Timestamped values of each DAD channel, the oldest values being dropped once `size` is reached."""
+
+    def __init__(self, size: int = 3600) -> None:
+        self._size = size
+        self._values: dict[int, deque[tuple[float, float]]] = {}
+
+    def add(self, channel: int, value: float, timestamp: float | None = None):
+        """Store a value of the channel, acquired at `timestamp` (now if None)."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        self._values.setdefault(channel, deque(maxlen=self._size)).append((timestamp, value))
+
+    def latest(self, channel: int, max_age: float | None = None) -> float | None:
+        """Return the last value of the channel, None if none or older than `max_age` seconds."""
+        values = self._values.get(channel)
+        if not values:
+            return None
+        timestamp, value = values[-1]
+        if max_age is not None and time.time() - timestamp > max_age:
+            return None
+        return value
+
+    def history(self, channel: int, seconds: float | None = None) -> SignalHistory:
+        """Return the values of the channel acquired in the last `seconds` (all values if None)."""
+        values = np.array(self._values.get(channel, ()), dtype=np.float64).reshape(-1, 2)
+        if seconds is not None:
+            values = values[values[:, 0] >= time.time() - seconds]
+        return SignalHistory(timestamp=values[:, 0].tolist(), signal=values[:, 1].tolist())
@@ -1,5 +1,6 @@
 """Control module for the Knauer DAD."""
 import asyncio
+import time
 from typing import TYPE_CHECKING
 
 from loguru import logger
@@ -8,12 +9,14 @@ from flowchem.devices.flowchem_device import RepeatedTaskInfo
 from flowchem.components.device_info import DeviceInfo
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.devices.knauer._common import KnauerEthernetDevice
+from flowchem.devices.knauer._dad_acquisition import ChannelBuffer, parse_signal_reply
 from flowchem.devices.knauer.dad_component import (
     DADChannelControl,
     KnauerDADLampControl,
 )
-from flowchem.utils.exceptions import InvalidConfigurationError
+from flowchem.utils.exceptions import DeviceError, InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.retry import RetryError, RetryPolicy, RetryStats
 
 if TYPE_CHECKING:
     pass
@@ -29,6 +32,8 @@ except ImportError:
 class KnauerDAD(KnauerEthernetDevice, FlowchemDevice):
     """DAD control class."""
 
+    KEEPALIVE_INTERVAL = 45
+
     def __init__(
             self,
             ip_address: object = None,
@@ -37,6 +42,11 @@ class KnauerDAD(KnauerEthernetDevice, FlowchemDevice):
             turn_on_d2: bool = False,
             turn_on_halogen: bool = False,
             display_control: bool = True,
+            acquisition_interval: float = 0,
+            acquisition_channels: list[int] | None = None,
+            history_size: int = 3600,
+            max_retries: int = 3,
+            reply_timeout: float = 1.0,
     ) -> None:
         super().__init__(ip_address, mac_address, name=name)
         self.eol = b"\n\r"
@@ -46,6 +56,20 @@ class KnauerDAD(KnauerEthernetDevice, FlowchemDevice):
         self._state_hal = False
         self._control = display_control  # True for Local
 
+        # All the acquisition channels are read every `acquisition_interval` seconds (0, default, to disable).
+        # The signal requests then replace the keepalive, so they cannot be further apart than it.
+        if not 0 <= acquisition_interval <= self.KEEPALIVE_INTERVAL:
+            raise InvalidConfigurationError(
+                f"The DAD acquisition_interval must be between 0 and {self.KEEPALIVE_INTERVAL} s"
+            )
+        self.acquisition_interval = acquisition_interval
+        self.acquisition_channels = acquisition_channels or [1, 2, 3, 4]
+        self.signals = ChannelBuffer(history_size)
+        self.max_retries = max_retries
+        self._retry = RetryPolicy(max_attempts=max_retries + 1, initial_delay=0.05, max_delay=0.5, retry_on=())
+        self.retry_stats = RetryStats()
+        self.reply_timeout = reply_timeout
+
         if not HAS_DAD_COMMANDS:
             raise InvalidConfigurationError(
                 "You tried to use a Knauer DAD device but the relevant commands are missing!\n"
@@ -185,26 +209,89 @@ class KnauerDAD(KnauerEthernetDevice, FlowchemDevice):
         cmd = self.cmd.SIGNAL.format(channel=channel, signal=signal)
         return await self._send_and_receive(cmd)
 
+    async def _resync(self):
+        """Discard any reply left in the stream, e.g. late replies to a previous request."""
+        while True:
+            try:
+                stale = await asyncio.wait_for(self._reader.read(self.BUFFER_SIZE), 0.05)
+            except asyncio.TimeoutError:
+                return
+            if not stale:
+                return
+            logger.debug(f"Discarded stale DAD reply: {stale!r}")
+
+    async def _query_signals(self, channels: list[int]) -> dict[int, float]:
+        """Send the signal requests for all the channels at once, then collect the replies.
+
+        Replies not to a signal request (e.g. `OK`) or to a channel not requested are skipped.
+        """
+        signals: dict[int, float] = {}
+        async with self._lock:
+            request = b"".join(
+                self.cmd.SIGNAL.format(channel=channel, signal="?").encode("ascii") + self.eol
+                for channel in channels
+            )
+            self._writer.write(request)
+            await self._writer.drain()
+            logger.debug(f"WRITE >>> {request!r}")
+            try:
+                # At most one reply per request is expected, stop as soon as all the channels are there
+                for _ in channels:
+                    reply = await asyncio.wait_for(self._reader.readuntil(separator=b"\r"), self.reply_timeout)
+                    parsed = parse_signal_reply(reply.decode("ascii").strip())
+                    if parsed is not None and parsed[0] in channels:
+                        signals[parsed[0]] = parsed[1]
+                    else:
+                        logger.debug(f"Unexpected reply to signal request: {reply!r}")
+                    if len(signals) == len(channels):
+                        break
+            except asyncio.TimeoutError:
+                logger.debug(f"Missing replies to signal request for channels {set(channels) - set(signals)}")
+            if len(signals) < len(channels):
+                await self._resync()
+        return signals
+
+    async def read_signals(self, channels: list[int]) -> dict[int, float]:
+        """Read the signal of several channels with one request, retrying up to `max_retries` for missing replies.
+
+        The values read are stored in `signals`. Raises DeviceError if some channel cannot be read.
+        """
+        signals: dict[int, float] = {}
+
+        async def read_missing() -> list[int]:
+            signals.update(await self._query_signals([c for c in channels if c not in signals]))
+            return [channel for channel in channels if channel not in signals]
+
+        try:
+            await self._retry.run(read_missing, retry_if=bool, name="DAD signal request", stats=self.retry_stats)
+        except RetryError as error:
+            raise DeviceError(f"Cannot read the signal of DAD channel(s) {error.last_result}!") from error
+
+        timestamp = time.time()
+        for channel, value in signals.items():
+            self.signals.add(channel, value, timestamp)
+        return signals
+
     async def read_signal(self, channel: int) -> float:
         """Read signal
         -9999999 to +9999999 (μAU, SIG_SRC = 0); 0 to 1000000 (INT, SIG_SRC = 1).
         """
-        cmd = self.cmd.SIGNAL.format(channel=channel, signal="?")
-        response = await self._send_and_receive(cmd)
-        logger.info(f"signal: {response}")  # SIG1:113545,
-        parsed_response = response.split(":")
-        if parsed_response[1] == "OK":
-            logger.warning(
-                f"ValueError[channel{channel}]:the reply of 'get signal' command is OK.."
-            )
-            return await self.read_signal(channel)
-        elif parsed_response[0] == f"SIG{channel}":
-            return float(parsed_response[1]) / 10000
-        else:
-            logger.warning(
-                f"ValueError[channel{channel}]: receive the reply not for channel{channel}!"
-            )
-            return await self.read_signal(channel)
+        return (await self.read_signals([channel]))[channel]
+
+    async def latest_signal(self, channel: int) -> float:
+        """Return the last signal acquired by the periodic acquisition, if enabled and recent, otherwise read it."""
+        if self.acquisition_interval > 0:
+            value = self.signals.latest(channel, max_age=2 * self.acquisition_interval + self.reply_timeout)
+            if value is not None:
+                return value
+        return await self.read_signal(channel)
+
+    async def _acquire(self):
+        """Read all the acquisition channels, run every `acquisition_interval` seconds."""
+        try:
+            await self.read_signals(self.acquisition_channels)
+        except DeviceError as error:
+            logger.error(f"DAD acquisition cycle failed: {error}")
 
     async def integration_time(self, integ_time: int | str = "?") -> str | int:
         """Set and read the integration time in 10 - 2000 ms."""
@@ -228,10 +315,14 @@ class KnauerDAD(KnauerEthernetDevice, FlowchemDevice):
             return int(response)
 
     def repeated_task(self):
+        # With the acquisition enabled, the signal requests keep the session alive
+        if self.acquisition_interval > 0:
+            return RepeatedTaskInfo(seconds_every=self.acquisition_interval, task=self._acquire)
+
         async def keepalive():
             await self.status()
 
-        return RepeatedTaskInfo(seconds_every=45, task=keepalive)
+        return RepeatedTaskInfo(seconds_every=self.KEEPALIVE_INTERVAL, task=keepalive)
 
 
 async def main(dad):
@@ -4,6 +4,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from flowchem.components.sensors.photo_sensor import PhotoSensor
+from flowchem.devices.knauer._dad_acquisition import SignalHistory
+from flowchem.utils.retry import RetryStats
 
 if TYPE_CHECKING:
     from flowchem.devices.knauer.dad import KnauerDAD
@@ -119,6 +121,8 @@ class DADChannelControl(PhotoSensor):
             methods=["PUT"],
         )
         self.add_api_route("/set-bandwidth", self.set_bandwidth, methods=["PUT"])
+        self.add_api_route("/history", self.get_history, methods=["GET"])
+        self.add_api_route("/retry-stats", self.get_retry_stats, methods=["GET"])
 
         # Ontology: diode array detector
         self.component_info.owl_subclass_of.append(
@@ -129,10 +133,33 @@ class DADChannelControl(PhotoSensor):
         """
         Acquire a signal from the sensor.
 
+        The last value read by the acquisition loop is returned if recent, otherwise the channel is read.
+
         Returns:
             float: The acquired signal.
         """
-        return await self.hw_device.read_signal(self.channel)
+        return await self.hw_device.latest_signal(self.channel)
+
+    async def get_history(self, seconds: float | None = None) -> SignalHistory:
+        """
+        Get the signal values acquired by the acquisition loop.
+
+        Args:
+            seconds (float | None): Only return the values acquired in the last `seconds`, all of them if None.
+
+        Returns:
+            SignalHistory: Acquisition timestamps and signal values.
+        """
+        return self.hw_device.signals.history(self.channel, seconds)
+
+    async def get_retry_stats(self) -> RetryStats:
+        """
+        Get the signal requests made to the DAD (for all the channels), and how many of them were retried.
+
+        Returns:
+            RetryStats: Attempts made, retries and failures per request type.
+        """
+        return self.hw_device.retry_stats
 
     async def set_wavelength(self, wavelength: int):
         """
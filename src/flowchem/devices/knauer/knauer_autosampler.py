@@ -37,13 +37,13 @@ import aioserial
 import asyncio
 from typing import Type
 import functools
-import time
 import pint
 from flowchem import ureg
 
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.components.device_info import DeviceInfo
 from flowchem.utils.people import jakob, samuel_saraiva, miguel
+from flowchem.utils.retry import RetryPolicy
 from flowchem.devices.knauer.knauer_autosampler_component import (
     AutosamplerGantry3D,
     AutosamplerPump,
@@ -124,21 +124,22 @@ class CommandModus(Enum):
 
 
 def send_until_acknowledged(max_reaction_time=15):
+    """Retry the decorated command while the autosampler replies it is busy, for up to `max_reaction_time` seconds."""
+    policy = RetryPolicy(
+        max_attempts=None,
+        deadline=max_reaction_time,
+        initial_delay=0.1,
+        max_delay=1.0,
+        retry_on=(ASBusyError,),
+    )
+
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            remaining_time = max_reaction_time
-            start_time = time.time()
-            while remaining_time > 0:
-                try:
-                    # Await the decorated async function
-                    result = await func(*args, **kwargs)
-                    return result
-                except ASBusyError:
-                    # If the device is busy, wait and retry
-                    elapsed_time = time.time() - start_time
-                    remaining_time = 10 - elapsed_time
-            raise ASError("Maximum reaction time exceeded")
+            try:
+                return await policy.run(lambda: func(*args, **kwargs), name=func.__qualname__)
+            except ASBusyError as error:
+                raise ASError("Maximum reaction time exceeded") from error
         return wrapper
     return decorator
 
@@ -0,0 +1,61 @@
+"""Match the replies received from Spinsolve to the corresponding pending requests."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from loguru import logger
+from lxml import etree
+
+
+@dataclass
+class PendingRequest:
+    """A request waiting for its reply.
+
+    The reply is identified by its type (e.g. `GetResponse`) and, optionally, by a tag it must contain (e.g. `Solvent`
+    for the reply to a `GetRequest` for the solvent).
+    """
+
+    response_tag: str
+    content_tag: str | None
+    future: asyncio.Future
+
+    def matches(self, reply: etree._Element) -> bool:
+        """Return True if the reply is the one expected by this request."""
+        if reply[0].tag != self.response_tag:
+            return False
+        return self.content_tag is None or reply.find(f".//{self.content_tag}") is not None
+
+
+class ReplyCorrelator:
+    """Dispatch each reply to the oldest pending request it matches.
+
+    Replies without a matching request (e.g. arriving after their request timed out) are logged and dropped, so that
+    they cannot be mistaken for the reply to a later request.
+    """
+
+    def __init__(self) -> None:
+        self._pending: list[PendingRequest] = []
+        self.orphaned_replies = 0
+
+    def expect(self, response_tag: str, content_tag: str | None = None) -> asyncio.Future:
+        """Register a request and return the future that will hold its reply."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(PendingRequest(response_tag, content_tag, future))
+        return future
+
+    def discard(self, future: asyncio.Future):
+        """Remove a request, e.g. after its timeout expired."""
+        self._pending = [pending for pending in self._pending if pending.future is not future]
+
+    def resolve(self, reply: etree._Element) -> bool:
+        """Set the reply as result of the matching request. Return False if no request matched."""
+        for pending in self._pending:
+            if not pending.future.done() and pending.matches(reply):
+                pending.future.set_result(reply)
+                self._pending.remove(pending)
+                return True
+
+        self.orphaned_replies += 1
+        logger.warning(f"Dropped {reply[0].tag} received with no matching request pending!")
+        return False
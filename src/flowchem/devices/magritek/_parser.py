@@ -2,6 +2,7 @@
 import warnings
 from enum import Enum
 
+from loguru import logger
 from lxml import etree
 
 
@@ -41,3 +42,68 @@ def parse_status_notification(xml_message: etree._Element):
             status = StatusNotification.UNKNOWN
 
     return status, status_notification[0].get("dataFolder")
+
+
+class MessageStreamParser:
+    """Incremental parser for the stream of <Message> documents sent by Spinsolve.
+
+    Data is fed to a pull parser as it arrives, so no message is parsed in one go. On parse errors, the rest of the
+    faulty message is discarded and parsing resumes from the next one.
+    """
+
+    DELIMITER = b"</Message>"
+
+    def __init__(self) -> None:
+        self._buffer = b""
+        self._message_chunks: list[bytes] = []
+        self._parser: etree.XMLPullParser | None = None
+        self._skipping = False  # True while discarding the rest of an invalid message
+
+    def _feed_parser(self, data: bytes):
+        if not data or self._skipping:
+            return
+        if self._parser is None:
+            # Messages are separated by line breaks, but the XML declaration must be at the document start
+            data = data.lstrip()
+            if not data:
+                return
+            self._parser = etree.XMLPullParser()
+        self._message_chunks.append(data)
+        try:
+            self._parser.feed(data)
+        except etree.XMLSyntaxError as syntax_error:
+            self._discard(syntax_error)
+
+    def _discard(self, error: Exception):
+        warnings.warn(f"Cannot parse response XML {b''.join(self._message_chunks)!r} [{error}]")
+        logger.debug("Skipping to the next message")
+        self._parser = None
+        self._message_chunks = []
+        self._skipping = True
+
+    def feed(self, data: bytes) -> list[tuple[bytes, etree._Element]]:
+        """Feed data received, return the complete messages found as (raw bytes, parsed element) tuples."""
+        messages = []
+        self._buffer += data
+        while (end := self._buffer.find(self.DELIMITER)) != -1:
+            end += len(self.DELIMITER)
+            self._feed_parser(self._buffer[:end])
+            self._buffer = self._buffer[end:]
+
+            if self._parser is not None:
+                try:
+                    root = self._parser.close()
+                except etree.XMLSyntaxError as syntax_error:
+                    self._discard(syntax_error)
+                else:
+                    messages.append((b"".join(self._message_chunks), root))
+            self._parser = None
+            self._message_chunks = []
+            self._skipping = False
+
+        # Keep enough bytes to recognize a delimiter split between two chunks, feed the rest to the parser
+        keep = len(self.DELIMITER) - 1
+        if len(self._buffer) > keep:
+            self._feed_parser(self._buffer[:-keep])
+            self._buffer = self._buffer[-keep:]
+        return messages
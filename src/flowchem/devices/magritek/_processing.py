@@ -0,0 +1,104 @@
+"""Load and process the FIDs saved by Spinsolve."""
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Binary .1d files start with a 32-bytes header: owner, format, version, data type and 4 x int32 dimensions.
+HEADER_SIZE = 32
+FID_FILE = "data.1d"
+ACQUISITION_PARAMETERS_FILE = "acqu.par"
+
+
+@dataclass(frozen=True)
+class ProcessingParameters:
+    """Parameters for the processing of a FID into a spectrum."""
+
+    line_broadening: float = 0.5  # Hz, exponential apodization
+    zero_filling: int = 2  # The FID is zero-filled to the next power of two of `zero_filling` times its length
+    phase0: float | None = None  # deg, None to phase on the first point of the FID
+    phase1: float = 0.0  # deg, linear phase across the spectral width
+
+
+@dataclass
+class ProcessedSpectrum:
+    """A processed spectrum, with its axis in ppm (or in Hz if the spectrometer frequency is unknown)."""
+
+    axis: np.ndarray
+    spectrum: np.ndarray  # complex
+    axis_unit: str
+
+    def to_bytes(self) -> bytes:
+        """Serialize as a .npy array with rows axis, real part and imaginary part."""
+        buffer = io.BytesIO()
+        np.save(buffer, np.vstack((self.axis, self.spectrum.real, self.spectrum.imag)).astype(np.float32))
+        return buffer.getvalue()
+
+
+def read_acquisition_parameters(folder: Path) -> dict[str, str]:
+    """Parse `acqu.par` (`key = value` lines) into a dict."""
+    parameters = {}
+    for line in (folder / ACQUISITION_PARAMETERS_FILE).read_text(errors="replace").splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            parameters[key.strip()] = value.strip().strip('"')
+    return parameters
+
+
+def map_1d_file(path: Path) -> tuple[np.memmap, np.memmap]:
+    """Memory-map the axis and the complex data of a Spinsolve .1d file, without reading them."""
+    x_dim = int(np.memmap(path, dtype="<i4", mode="r", offset=16, shape=(1,))[0])
+    axis = np.memmap(path, dtype="<f4", mode="r", offset=HEADER_SIZE, shape=(x_dim,))
+    data = np.memmap(path, dtype="<c8", mode="r", offset=HEADER_SIZE + 4 * x_dim, shape=(x_dim,))
+    return axis, data
+
+
+def process_fid(fid: np.ndarray, dwell_time: float, parameters: ProcessingParameters) -> np.ndarray:
+    """Apodize, zero-fill, Fourier transform and phase a FID. Return the spectrum in order of increasing frequency."""
+    time = np.arange(fid.size) * dwell_time
+    apodized = fid * np.exp(-np.pi * parameters.line_broadening * time)
+
+    size = 1 << int(np.ceil(np.log2(fid.size * max(parameters.zero_filling, 1))))
+    spectrum = np.fft.fftshift(np.fft.fft(apodized, n=size))
+
+    # The sum of the spectrum is proportional to the first FID point: zeroing its phase makes the integral absorptive
+    phase0 = -np.angle(fid[0]) if parameters.phase0 is None else np.deg2rad(parameters.phase0)
+    phase = phase0 + np.deg2rad(parameters.phase1) * np.linspace(-0.5, 0.5, size)
+    return spectrum * np.exp(1j * phase)
+
+
+def frequency_axis(size: int, dwell_time: float, acquisition_parameters: dict[str, str]) -> tuple[np.ndarray, str]:
+    """Return the axis of a spectrum processed with `process_fid`, in ppm if the parameters allow it, else in Hz."""
+    offsets = np.fft.fftshift(np.fft.fftfreq(size, d=dwell_time))
+    try:
+        bandwidth = float(acquisition_parameters["bandwidth"]) * 1000  # kHz in acqu.par
+        carrier = float(acquisition_parameters["lowestFrequency"]) + bandwidth / 2
+        spectrometer_frequency = float(acquisition_parameters["b1Freq"])  # MHz
+    except (KeyError, ValueError):
+        return offsets, "Hz"
+    return (offsets + carrier) / spectrometer_frequency, "ppm"
+
+
+def _dwell_time(acquisition_parameters: dict[str, str]) -> float:
+    """Dwell time in s, from `dwellTime` (ms) or, if missing, from `bandwidth` (kHz)."""
+    if "dwellTime" in acquisition_parameters:
+        return float(acquisition_parameters["dwellTime"]) / 1000
+    return 1 / (float(acquisition_parameters["bandwidth"]) * 1000)
+
+
+def load_spectrum(folder: Path, parameters: ProcessingParameters) -> ProcessedSpectrum:
+    """Process the FID saved in a Spinsolve result folder. Blocking, to be run in a worker thread."""
+    acquisition_parameters = read_acquisition_parameters(folder)
+    dwell_time = _dwell_time(acquisition_parameters)
+    time_axis, fid = map_1d_file(folder / FID_FILE)
+
+    spectrum = process_fid(fid, dwell_time, parameters)
+    axis, unit = frequency_axis(spectrum.size, dwell_time, acquisition_parameters)
+    # Release the mapping (the file would otherwise stay locked on Windows)
+    del time_axis, fid
+
+    # NMR convention: frequency decreasing from left to right
+    return ProcessedSpectrum(axis=axis[::-1].copy(), spectrum=spectrum[::-1].copy(), axis_unit=unit)
@@ -2,15 +2,19 @@
 import asyncio
 import pprint as pp
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from fastapi import BackgroundTasks
 from loguru import logger
 from lxml import etree
 from packaging import version
+from pydantic import BaseModel
 
+from flowchem.components.analytics.peak_analysis import PeakAnalysis
 from flowchem.components.device_info import DeviceInfo
 from flowchem.devices.flowchem_device import FlowchemDevice
+from flowchem.devices.magritek._correlator import ReplyCorrelator
 from flowchem.devices.magritek._msg_maker import (
     create_message,
     create_protocol_message,
@@ -19,16 +23,39 @@ from flowchem.devices.magritek._msg_maker import (
     set_data_folder,
 )
 from flowchem.devices.magritek._parser import (
+    MessageStreamParser,
     StatusNotification,
     parse_status_notification,
 )
+from flowchem.devices.magritek._processing import (
+    FID_FILE,
+    ProcessedSpectrum,
+    ProcessingParameters,
+    load_spectrum,
+)
 from flowchem.devices.magritek.spinsolve_control import SpinsolveControl
 from flowchem.devices.magritek.utils import create_folder_mapper, get_my_docs_path
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.wait import wait_until
 
 __all__ = ["Spinsolve"]
 
 
+class ProtocolRequest(BaseModel):
+    """A protocol to be run, with its options and the name of the sample (current one if None)."""
+
+    protocol: str
+    options: dict | None = None
+    sample_name: str | None = None
+
+
+class QueuedProtocol(ProtocolRequest):
+    """A protocol in the queue, with its status and the ID of its result (see `get_result_folder`)."""
+
+    status: str = "queued"  # queued, running, completed, failed or cancelled
+    result_id: int | None = None
+
+
 class Spinsolve(FlowchemDevice):
     """Spinsolve class, gives access to the spectrometer remote control API"""
 
@@ -42,6 +69,11 @@ class Spinsolve(FlowchemDevice):
         solvent: str | None = "Chloroform-d1",
         sample_name: str | None = "Unnamed automated experiment",
         remote_to_local_mapping: list[str] | None = None,
+        reply_timeout: float = 30,
+        schema_validation_interval: int = 1,
+        line_broadening: float = 0.5,
+        zero_filling: int = 2,
+        ingestion_timeout: float = 60,
     ) -> None:
         """Control a Spinsolve instance via HTTP XML API."""
         super().__init__(name)
@@ -54,14 +86,10 @@ class Spinsolve(FlowchemDevice):
 
         self.host, self.port = host, port
 
-        # The Qs must exist before the response is received to be awaited
-        # Could be generated programmatically from RemoteControl.xsd, but it's not worth it
-        self._replies_by_type: dict[str, asyncio.Queue] = {
-            "HardwareResponse": asyncio.Queue(),
-            "AvailableProtocolOptionsResponse": asyncio.Queue(),
-            "GetResponse": asyncio.Queue(),
-            "StatusNotification": asyncio.Queue(),
-        }
+        # Replies to requests are matched to the pending request, while notifications are queued.
+        self._correlator = ReplyCorrelator()
+        self._notifications: asyncio.Queue = asyncio.Queue()
+        self.reply_timeout = reply_timeout
 
         # Set experimental variable
         self._data_folder = data_folder
@@ -95,6 +123,11 @@ class Spinsolve(FlowchemDevice):
                 ) from et
         else:
             self.schema = xml_schema
+        # Validate one message every `schema_validation_interval` (0 to disable). Validation happens in a worker
+        # thread, and only results in warnings, so it never delays the dispatch of the messages received.
+        self._schema_validation_interval = schema_validation_interval
+        self._messages_received = 0
+        self._validation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spinsolve-xsd")
 
         # IOs (these are set upon initialization w/ initialize)
         self._io_reader: asyncio.StreamReader = None  # type: ignore
@@ -102,6 +135,17 @@ class Spinsolve(FlowchemDevice):
         self.reader: asyncio.Task = None  # type: ignore
         # Each protocol adds a new Path to the list, run_protocol returns the ID of the next protocol
         self._result_folders: list[Path] = []
+        # Spectra processed from the FIDs of the results, by result ID
+        self._processing = ProcessingParameters(line_broadening=line_broadening, zero_filling=zero_filling)
+        self._spectra: dict[int, ProcessedSpectrum] = {}
+        self._ingestion_timeout = ingestion_timeout
+        self._ingestion_tasks: set[asyncio.Task] = set()
+        self.peak_analysis: PeakAnalysis | None = None  # Set upon initialization
+        self._protocol_running = False
+
+        # Protocols queued are run back-to-back by a worker task
+        self._queue: list[QueuedProtocol] = []
+        self._queue_worker: asyncio.Task | None = None
 
     async def initialize(self):
         """Initiate connection with a running Spinsolve instance."""
@@ -147,39 +191,74 @@ class Spinsolve(FlowchemDevice):
 
         await self.set_data_folder(self._data_folder)
 
-        self.components.append(SpinsolveControl("nmr-control", self))
+        self.peak_analysis = PeakAnalysis("peak-analysis", self)
+        self.components.extend([SpinsolveControl("nmr-control", self), self.peak_analysis])
 
     async def connection_listener(self):
-        """Listen for replies and puts them in the queue."""
+        """Listen for messages, dispatch replies to the pending requests and queue notifications."""
         logger.debug("Spinsolve connection listener started!")
-        parser = etree.XMLParser()
+        stream_parser = MessageStreamParser()
         while True:
-            raw_tree = await self._io_reader.readuntil(b"</Message>")
-            logger.debug(f"Read reply {raw_tree!r}")
+            data = await self._io_reader.read(2**16)
+            if not data:
+                logger.error("Connection closed by Spinsolve!")
+                break
 
-            # Try parsing reply and skip if not valid
-            try:
-                parsed_tree = etree.fromstring(raw_tree, parser)
-            except etree.XMLSyntaxError:
-                warnings.warn(f"Cannot parse response XML {raw_tree!r}")
-                continue
+            for raw_tree, parsed_tree in stream_parser.feed(data):
+                logger.debug(f"Read reply {raw_tree!r}")
+                self._validate_in_background(raw_tree)
+
+                if len(parsed_tree) == 0:
+                    warnings.warn(f"Empty message received {raw_tree!r}")
+                    continue
+
+                # Notifications are not solicited, all the other messages are replies to a pending request
+                if parsed_tree[0].tag == "StatusNotification":
+                    self._notifications.put_nowait(parsed_tree)
+                else:
+                    self._correlator.resolve(parsed_tree)
 
-            # Validate reply if schema was provided
-            if self.schema:
-                try:
-                    self.schema.validate(parsed_tree)
-                except etree.XMLSyntaxError as syntax_error:
-                    warnings.warn(
-                        f"Invalid XML received! [Validation error: {syntax_error}]",
-                    )
+    def _validate(self, raw_tree: bytes):
+        """Validate a message against the XML schema (runs in a worker thread)."""
+        try:
+            self.schema.assertValid(etree.fromstring(raw_tree))
+        except (etree.XMLSyntaxError, etree.DocumentInvalid) as validation_error:
+            warnings.warn(
+                f"Invalid XML received! [Validation error: {validation_error}]",
+            )
+
+    def _validate_in_background(self, raw_tree: bytes):
+        """Submit one message every `schema_validation_interval` for validation, if a schema was provided."""
+        self._messages_received += 1
+        if not self.schema or self._schema_validation_interval < 1:
+            return
+        if self._messages_received % self._schema_validation_interval == 0:
+            self._validation_executor.submit(self._validate, raw_tree)
 
-            # Add to reply queue of the given tag-type
-            await self._replies_by_type[parsed_tree[0].tag].put(parsed_tree) # type: ignore
+    async def _request(
+        self,
+        message: etree._Element,
+        response_tag: str,
+        content_tag: str | None = None,
+    ) -> etree._Element:
+        """Send a request and return its reply, identified by type and content tag.
+
+        Raises TimeoutError if no reply is received within `reply_timeout` seconds.
+        """
+        reply = self._correlator.expect(response_tag, content_tag)
+        try:
+            await self.send_message(message)
+            return await asyncio.wait_for(reply, self.reply_timeout)
+        except asyncio.TimeoutError as timeout_error:
+            raise TimeoutError(
+                f"No {response_tag} received from Spinsolve within {self.reply_timeout} s!"
+            ) from timeout_error
+        finally:
+            self._correlator.discard(reply)
 
     async def get_solvent(self) -> str:
         """Get current solvent."""
-        await self.send_message(get_request("Solvent"))
-        reply = await self._replies_by_type["GetResponse"].get()
+        reply = await self._request(get_request("Solvent"), "GetResponse", "Solvent")
         return reply.find(".//Solvent").text
 
     async def set_solvent(self, solvent: str):
@@ -188,8 +267,7 @@ class Spinsolve(FlowchemDevice):
 
     async def get_sample(self) -> str:
         """Get current sample."""
-        await self.send_message(get_request("Sample"))
-        reply = await self._replies_by_type["GetResponse"].get()
+        reply = await self._request(get_request("Sample"), "GetResponse", "Sample")
         return reply.find(".//Sample").text
 
     async def set_sample(self, sample: str):
@@ -204,8 +282,7 @@ class Spinsolve(FlowchemDevice):
 
     async def get_user_data(self) -> dict:
         """Get user data. These will appear in `acqu.par`."""
-        await self.send_message(get_request("UserData"))
-        reply = await self._replies_by_type["GetResponse"].get()
+        reply = await self._request(get_request("UserData"), "GetResponse", "UserData")
         return {
             data_item.get("key"): data_item.get("value")
             for data_item in reply.findall(".//Data")
@@ -244,13 +321,14 @@ class Spinsolve(FlowchemDevice):
 
     async def hw_request(self):
         """Send an HW request to the spectrometer, receive the reply and returns it."""
-        await self.send_message(create_message("HardwareRequest"))
-        return await self._replies_by_type["HardwareResponse"].get()
+        return await self._request(create_message("HardwareRequest"), "HardwareResponse")
 
     async def load_protocols(self):
         """Get a list of available protocol on the current spectrometer."""
-        await self.send_message(create_message("AvailableProtocolOptionsRequest"))
-        reply = await self._replies_by_type["AvailableProtocolOptionsResponse"].get()
+        reply = await self._request(
+            create_message("AvailableProtocolOptionsRequest"),
+            "AvailableProtocolOptionsResponse",
+        )
 
         # Parse reply and construct the dict with protocols available
         for element in reply.findall(".//Protocol"):
@@ -270,6 +348,21 @@ class Spinsolve(FlowchemDevice):
 
         Return the ID of the protocol (needed to get results via `get_result_folder`). -1 for errors.
         """
+        if self._is_queue_active():
+            warnings.warn("Cannot run a protocol while the protocol queue is running! Add it to the queue instead.")
+            return -1
+
+        if not await self._start_protocol(name, options):
+            return -1
+
+        # Rest of protocol as bg task to avoid timeout on API reply
+        # See https://fastapi.tiangolo.com/tutorial/background-tasks/
+        background_tasks.add_task(self._check_notifications)
+
+        return len(self._result_folders)
+
+    async def _start_protocol(self, name: str, options: dict | None) -> bool:
+        """Validate the protocol requested and start it. Return False if the protocol is not available."""
         # All protocol names are UPPERCASE, so force upper here to avoid case issues
         name = name.upper()
         if name not in self.protocols:
@@ -277,60 +370,194 @@ class Spinsolve(FlowchemDevice):
                 f"The protocol requested '{name}' is not available on the spectrometer!\n"
                 f"Valid options are: {pp.pformat(sorted(self.protocols.keys()))}",
             )
-            return -1
+            return False
 
         # Validate protocol options (check values and remove invalid ones, with warning)
         options_validated = self._validate_protocol_request(name, options)
 
         # Flush all previous StatusNotification replies from queue.
         # This is needed as sometimes FINISHED is received before other notification that remain unconsumed
-        for _ in range(self._replies_by_type["StatusNotification"].qsize()):
-            self._replies_by_type["StatusNotification"].get_nowait()
+        for _ in range(self._notifications.qsize()):
+            self._notifications.get_nowait()
 
         # Start protocol
         await self.send_message(create_protocol_message(name, options_validated))
+        return True
 
-        # Rest of protocol as bg task to avoid timeout on API reply
-        # See https://fastapi.tiangolo.com/tutorial/background-tasks/
-        background_tasks.add_task(self._check_notifications)
+    async def queue_protocols(self, protocols: list[ProtocolRequest]) -> list[int]:
+        """Add protocols to the queue, they are run back-to-back in order.
 
-        return len(self._result_folders)
+        Return the position of each protocol in the queue (see `get_queue`), -1 for protocols not available.
+        """
+        positions = []
+        for request in protocols:
+            if request.protocol.upper() not in self.protocols:
+                warnings.warn(f"The protocol requested '{request.protocol}' is not available -- not queued!")
+                positions.append(-1)
+                continue
+            self._queue.append(QueuedProtocol(**request.model_dump()))
+            positions.append(len(self._queue) - 1)
 
-    async def _check_notifications(self):
-        """Read all the StatusNotification and returns the dataFolder."""
-        self._protocol_running = True
-        remote_folder = Path()
-        while True:
-            # Get all StatusNotification
-            status_update = await self._replies_by_type["StatusNotification"].get()
+        if not self._is_queue_active():
+            self._queue_worker = asyncio.create_task(self._run_queue(), name="Spinsolve protocol queue")
+        return positions
 
-            # Parse them
-            status, folder = parse_status_notification(status_update)
-            logger.debug(f"Status update: Status is {status} and data folder={folder}")
+    def _is_queue_active(self) -> bool:
+        return self._queue_worker is not None and not self._queue_worker.done()
 
-            # When I get a finishing response end protocol and return the data folder!
-            if status is StatusNotification.FINISHING:
-                remote_folder = Path(folder)
+    async def _run_queue(self):
+        """Run the queued protocols until none is left."""
+        while True:
+            pending = [entry for entry in self._queue if entry.status == "queued"]
+            if not pending:
                 break
+            entry = pending[0]
 
-            if status is StatusNotification.ERROR:
-                # Usually device busy
-                warnings.warn("Error detected on running protocol -- aborting.")
-                await self.abort()  # Abort running experiment
-                break
+            # A protocol started via `run_protocol` before the queue was may still be running
+            async def spectrometer_idle() -> bool:
+                return not self._protocol_running
 
-        logger.info(f"Protocol over - remote data folder is {remote_folder}")
-        # Add result folder to self._result_folders
-        if self._folder_mapper is not None:
-            self._result_folders.append(self._folder_mapper(remote_folder))
-        else:
-            self._result_folders.append(remote_folder)
+            # A failing entry does not stop the queue: it is marked as failed and the next one is run
+            try:
+                await wait_until(spectrometer_idle, max_interval=2)
+
+                if entry.sample_name is not None:
+                    await self.set_sample(entry.sample_name)
+                if entry.status == "cancelled":  # While waiting for the spectrometer
+                    continue
+                entry.status = "running"
+                if not await self._start_protocol(entry.protocol, entry.options):
+                    entry.status = "failed"
+                    continue
+
+                final_status = await self._check_notifications()
+            except Exception as error:
+                logger.error(f"Queued protocol {entry.protocol} failed: {error}")
+                if entry.status != "cancelled":
+                    entry.status = "failed"
+                continue
 
-        self._protocol_running = False
+            entry.result_id = len(self._result_folders) - 1
+            if entry.status == "running":  # i.e. not cancelled in the meantime
+                entry.status = "completed" if final_status is StatusNotification.FINISHING else "failed"
+            logger.info(f"Queued protocol {entry.protocol} {entry.status}, result ID {entry.result_id}")
+
+    async def get_queue(self) -> list[QueuedProtocol]:
+        """Return all the protocols queued so far, with their status."""
+        return self._queue
+
+    async def cancel_queue(self) -> int:
+        """Cancel the queued protocols not yet started and abort the running one. Return the number cancelled."""
+        cancelled = 0
+        for entry in self._queue:
+            if entry.status in ("queued", "running"):
+                if entry.status == "running":
+                    await self.abort()
+                entry.status = "cancelled"
+                cancelled += 1
+        return cancelled
+
+    async def _check_notifications(self) -> StatusNotification:
+        """Read all the StatusNotification until the end of the protocol, store the data folder and return the status.
+
+        If the data folder is reachable, the protocol is considered running until its data are saved, so that the next
+        one does not start before.
+        """
+        self._protocol_running = True
+        try:
+            remote_folder = Path()
+            while True:
+                # Get all StatusNotification
+                status_update = await self._notifications.get()
+
+                # Parse them
+                status, folder = parse_status_notification(status_update)
+                logger.debug(f"Status update: Status is {status} and data folder={folder}")
+
+                # When I get a finishing response end protocol and return the data folder!
+                if status is StatusNotification.FINISHING:
+                    remote_folder = Path(folder)
+                    break
+
+                if status is StatusNotification.ERROR:
+                    # Usually device busy
+                    warnings.warn("Error detected on running protocol -- aborting.")
+                    await self.abort()  # Abort running experiment
+                    break
+
+            logger.info(f"Protocol over - remote data folder is {remote_folder}")
+            # Add result folder to self._result_folders
+            if self._folder_mapper is not None:
+                self._result_folders.append(self._folder_mapper(remote_folder))
+            else:
+                self._result_folders.append(remote_folder)
+
+            # FINISHING is notified at the end of the acquisition, the data are saved shortly afterward.
+            saved = status is StatusNotification.FINISHING and await self._wait_for_fid(self._result_folders[-1])
+        finally:
+            self._protocol_running = False
+
+        # Process the FID now that it is saved, so that the spectrum is ready when requested
+        if saved:
+            result_id = len(self._result_folders) - 1
+            task = asyncio.create_task(self._ingest_result(result_id, new_result=True))
+            self._ingestion_tasks.add(task)
+            task.add_done_callback(self._ingestion_tasks.discard)
+        return status
+
+    async def _wait_for_fid(self, folder: Path) -> bool:
+        """Wait until the FID is saved in `folder`. False if not saved within the ingestion timeout.
+
+        Nothing is waited for if the folder is not reachable, e.g. on a remote spectrometer w/o folder mapping.
+        """
+        if not await asyncio.to_thread(folder.parent.is_dir):
+            logger.debug(f"Result folder {folder} not reachable, the FID is not processed")
+            return False
+
+        async def fid_saved() -> bool:
+            # The result folder may be on a network drive, so the check is not done on the event loop
+            return await asyncio.to_thread((folder / FID_FILE).exists)
+
+        try:
+            await wait_until(fid_saved, timeout=self._ingestion_timeout, max_interval=2)
+        except TimeoutError:
+            logger.warning(f"No FID saved in {folder} within {self._ingestion_timeout} s!")
+            return False
+        return True
+
+    async def _ingest_result(self, result_id: int, new_result: bool = False) -> ProcessedSpectrum | None:
+        """Process the FID of the result with the given ID and cache the spectrum. None if not possible."""
+        folder = self._result_folders[result_id]
+        if not await asyncio.to_thread((folder / FID_FILE).exists):
+            return None
+
+        try:
+            spectrum = await asyncio.to_thread(load_spectrum, folder, self._processing)
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning(f"Cannot process the FID in {folder}: {error}")
+            return None
+
+        self._spectra[result_id] = spectrum
+        logger.debug(f"Spectrum of result {result_id} processed ({spectrum.spectrum.size} points)")
+        # Only the results just acquired are new spectra for the peak analysis (not those processed on request)
+        if new_result and self.peak_analysis is not None:
+            await self.peak_analysis.add_spectrum(result_id, spectrum.axis, spectrum.spectrum.real)
+        return spectrum
+
+    async def get_spectrum(self, result_id: int | None = None) -> ProcessedSpectrum | None:
+        """Get the processed spectrum of the result with the given ID (last if None). None if not available."""
+        if result_id is None:
+            result_id = len(self._result_folders) - 1
+        if not 0 <= result_id < len(self._result_folders):
+            return None
+        if result_id in self._spectra:
+            return self._spectra[result_id]
+        # Not processed yet, e.g. results acquired before a restart or still being saved
+        return await self._ingest_result(result_id)
 
     async def is_protocol_running(self) -> bool:
-        """Return True if a protocol is running, otherwise False."""
-        return self._protocol_running
+        """Return True if a protocol is running (or queued protocols are left), otherwise False."""
+        return self._protocol_running or self._is_queue_active()
 
     async def get_result_folder(self, result_id: int | None = None) -> str:
         """Get the result folder with the given ID or the last one if no ID is specified. Empty str if not existing."""
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from fastapi import BackgroundTasks
+from fastapi import BackgroundTasks, Response
 
 from flowchem.components.analytics.nmr import NMRControl
 
@@ -36,6 +36,11 @@ class SpinsolveControl(NMRControl):
             self.hw_device.get_result_folder,
             methods=["GET"],
         )
+        self.add_api_route("/spectrum", self.get_spectrum, methods=["GET"])
+        # Protocol queue
+        self.add_api_route("/queue", self.hw_device.queue_protocols, methods=["PUT"])
+        self.add_api_route("/queue", self.hw_device.get_queue, methods=["GET"])
+        self.add_api_route("/queue/cancel", self.hw_device.cancel_queue, methods=["PUT"])
         self.add_api_route(
             "/is-busy",
             self.hw_device.is_protocol_running,
@@ -58,5 +63,20 @@ class SpinsolveControl(NMRControl):
             options=options,
         )
 
+    async def get_spectrum(self, result_id: int | None = None) -> Response:
+        """Get the processed spectrum of an acquisition (the last one if no ID is given).
+
+        The spectrum is returned as binary .npy array with three rows: axis, real and imaginary part.
+        The unit of the axis (ppm or Hz) is in the `X-Axis-Unit` header. 404 if the spectrum is not available.
+        """
+        spectrum = await self.hw_device.get_spectrum(result_id)
+        if spectrum is None:
+            return Response(status_code=404)
+        return Response(
+            content=spectrum.to_bytes(),
+            media_type="application/octet-stream",
+            headers={"X-Axis-Unit": spectrum.axis_unit},
+        )
+
     async def stop(self):
         return await self.hw_device.abort()
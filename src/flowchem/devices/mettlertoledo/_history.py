@@ -0,0 +1,146 @@
+"""Rolling history of the IR spectra acquired, stored as a 2D array with a shared wavenumber axis."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from flowchem.components.analytics.ir import IRSpectrum
+
+
+class SpectrumHistorySlice(BaseModel):
+    """A range of spectra from the history: one row of `intensity` per sample."""
+
+    wavenumber: list[float]
+    sample: list[int]
+    timestamp: list[datetime.datetime]
+    intensity: list[list[float]]
+
+
+def _save_spectra(file: Path, wavenumber: np.ndarray, sample: tuple, time: tuple, intensity: np.ndarray):
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(file, wavenumber=wavenumber, sample=sample, time=time, intensity=intensity)
+    except OSError as error:
+        logger.error(f"Cannot save the spectra evicted from the history to {file}: {error}")
+        return
+    logger.debug(f"{len(sample)} spectra saved to {file}")
+
+
+class SpectrumHistory:
+    """Fixed-capacity ring buffer of spectra sharing the same wavenumber axis.
+
+    When full, the oldest spectra are overwritten. If a `spill_folder` is given, overwritten spectra are saved there
+    first, in .npz files of `spill_chunk` spectra each, by a worker thread if the event loop is running. A change of the
+    wavenumber axis (e.g. new resolution) restarts the history.
+    """
+
+    def __init__(self, capacity: int = 1000, spill_folder: str | Path | None = None, spill_chunk: int = 100) -> None:
+        self.capacity = capacity
+        self.spill_folder = Path(spill_folder) if spill_folder is not None else None
+        self.spill_chunk = spill_chunk
+
+        self.wavenumber: np.ndarray | None = None
+        self._intensity = np.empty((0, 0), dtype=np.float32)
+        self._sample = np.zeros(capacity, dtype=np.int64)
+        self._time = np.zeros(capacity, dtype=np.float64)  # POSIX timestamps
+        self._next = 0  # Row to be written next
+        self._size = 0
+        self._to_spill: list[tuple[int, float, np.ndarray]] = []
+        self._spill_tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, sample: int, spectrum: IRSpectrum, timestamp: float | None = None):
+        """Add a spectrum, acquired at `timestamp` (now if None)."""
+        if not spectrum.intensity:
+            return
+        wavenumber = np.asarray(spectrum.wavenumber, dtype=np.float64)
+        if self.wavenumber is None or not np.array_equal(wavenumber, self.wavenumber):
+            self._restart(wavenumber)
+
+        if self._size == self.capacity:
+            self._evict(self._next)
+        else:
+            self._size += 1
+        self._intensity[self._next] = spectrum.intensity
+        self._sample[self._next] = sample
+        self._time[self._next] = timestamp if timestamp is not None else datetime.datetime.now().timestamp()
+        self._next = (self._next + 1) % self.capacity
+
+    def _restart(self, wavenumber: np.ndarray):
+        if self._size:
+            logger.info("Wavenumber axis changed, the spectrum history is restarted.")
+            for row in self._chronological_rows():
+                self._evict(row)
+            self._spill()
+        self.wavenumber = wavenumber
+        self._intensity = np.zeros((self.capacity, wavenumber.size), dtype=np.float32)
+        self._next = self._size = 0
+
+    def _evict(self, row: int):
+        if self.spill_folder is None:
+            return
+        self._to_spill.append((int(self._sample[row]), float(self._time[row]), self._intensity[row].copy()))
+        if len(self._to_spill) >= self.spill_chunk:
+            self._spill()
+
+    def _spill(self):
+        """Save the spectra evicted from the history and not yet saved, without blocking the event loop."""
+        if self.spill_folder is None or not self._to_spill or self.wavenumber is None:
+            return
+        samples, times, intensities = zip(*self._to_spill)
+        self._to_spill = []
+        file = self.spill_folder / f"spectra_{samples[0]}-{samples[-1]}.npz"
+        # The evicted rows were copied and vstack copies them again, so the ring can be overwritten while saving
+        args = (file, self.wavenumber, samples, times, np.vstack(intensities))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # Not called from the event loop
+            _save_spectra(*args)
+            return
+        task = loop.create_task(asyncio.to_thread(_save_spectra, *args))
+        self._spill_tasks.add(task)
+        task.add_done_callback(self._spill_tasks.discard)
+
+    async def flush(self):
+        """Save the spectra evicted from the history and not yet saved to the spill folder, waiting for all saves."""
+        self._spill()
+        if self._spill_tasks:
+            await asyncio.gather(*self._spill_tasks)
+
+    def _chronological_rows(self) -> np.ndarray:
+        """Indices of the rows in use, from the oldest to the newest."""
+        return (np.arange(self._size) + self._next - self._size) % self.capacity
+
+    def _slice(self, mask_of: Callable[[np.ndarray], np.ndarray]) -> SpectrumHistorySlice:
+        rows = self._chronological_rows()
+        rows = rows[mask_of(rows)]
+        return SpectrumHistorySlice(
+            wavenumber=self.wavenumber.tolist() if self.wavenumber is not None else [],
+            sample=self._sample[rows].tolist(),
+            timestamp=[datetime.datetime.fromtimestamp(t) for t in self._time[rows]],
+            intensity=self._intensity[rows].tolist() if rows.size else [],
+        )
+
+    def by_sample(self, first: int | None = None, last: int | None = None) -> SpectrumHistorySlice:
+        """Return the spectra with sample number between `first` and `last` (included)."""
+        first = first if first is not None else np.iinfo(np.int64).min
+        last = last if last is not None else np.iinfo(np.int64).max
+        return self._slice(lambda rows: (self._sample[rows] >= first) & (self._sample[rows] <= last))
+
+    def by_time(
+        self,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> SpectrumHistorySlice:
+        """Return the spectra acquired between `start` and `end` (included)."""
+        start_ts = start.timestamp() if start is not None else -np.inf
+        end_ts = end.timestamp() if end is not None else np.inf
+        return self._slice(lambda rows: (self._time[rows] >= start_ts) & (self._time[rows] <= end_ts))
@@ -0,0 +1,96 @@
+"""Buffer of the spectra pushed by iCIR via OPC UA subscription."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from flowchem.components.analytics.ir import IRSpectrum
+
+
+@dataclass
+class BufferedSpectrum:
+    """A spectrum with the iCIR sample count it belongs to."""
+
+    sample_count: int
+    treated: IRSpectrum
+    raw: IRSpectrum | None = None
+
+
+class SpectrumBuffer:
+    """Keep the last spectra received, and wake up the clients waiting for a new one.
+
+    iCIR updates the sample count and the spectra nodes separately, and their data change notifications can arrive in
+    any order. A spectrum is added to the buffer once both a new sample count and a new treated spectrum are received.
+    The raw spectrum, if received in the meantime, is stored with it.
+    """
+
+    def __init__(self, size: int = 100) -> None:
+        self._spectra: deque[BufferedSpectrum] = deque(maxlen=size)
+        self._new_spectrum = asyncio.Condition()
+        self._pending_count: int | None = None
+        self._pending_treated: IRSpectrum | None = None
+        self._pending_raw: IRSpectrum | None = None
+        self._listeners: list[Callable[[BufferedSpectrum], Awaitable[None] | None]] = []
+
+    def add_listener(self, listener: Callable[[BufferedSpectrum], Awaitable[None] | None]):
+        """Call (or await, if a coroutine function) `listener` with each new spectrum added to the buffer."""
+        self._listeners.append(listener)
+
+    async def update_count(self, sample_count: int):
+        """Record a new sample count."""
+        if self._spectra and self._spectra[-1].sample_count == sample_count:
+            return
+        self._pending_count = sample_count
+        await self._commit()
+
+    async def update_treated(self, spectrum: IRSpectrum):
+        """Record a new treated spectrum."""
+        self._pending_treated = spectrum
+        await self._commit()
+
+    async def update_raw(self, spectrum: IRSpectrum):
+        """Record a new raw spectrum."""
+        self._pending_raw = spectrum
+
+    async def _commit(self):
+        if self._pending_count is None or self._pending_treated is None:
+            return
+        spectrum = BufferedSpectrum(self._pending_count, self._pending_treated, self._pending_raw)
+        async with self._new_spectrum:
+            self._spectra.append(spectrum)
+            self._pending_count = self._pending_treated = self._pending_raw = None
+            self._new_spectrum.notify_all()
+        for listener in self._listeners:
+            result = listener(spectrum)
+            if inspect.isawaitable(result):
+                await result
+
+    def clear(self):
+        """Remove all the spectra, e.g. when a new experiment restarts the sample count."""
+        self._spectra.clear()
+        self._pending_count = self._pending_treated = self._pending_raw = None
+
+    def latest(self) -> BufferedSpectrum | None:
+        """Return the last spectrum received, None if the buffer is empty."""
+        return self._spectra[-1] if self._spectra else None
+
+    def _first_after(self, sample_count: int) -> BufferedSpectrum | None:
+        return next((spectrum for spectrum in self._spectra if spectrum.sample_count > sample_count), None)
+
+    async def next_after(self, sample_count: int, timeout: float | None = None) -> BufferedSpectrum | None:
+        """Return the first spectrum with a sample count higher than the one given, waiting for it if needed.
+
+        None if no such spectrum is received within `timeout` seconds.
+        """
+        async with self._new_spectrum:
+            try:
+                await asyncio.wait_for(
+                    self._new_spectrum.wait_for(lambda: self._first_after(sample_count) is not None),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return None
+        return self._first_after(sample_count)
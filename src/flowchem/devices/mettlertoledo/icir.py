@@ -1,6 +1,7 @@
 """Async implementation of FlowIR."""
 import asyncio
 import datetime
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 
 from asyncua import Client, ua
@@ -9,11 +10,14 @@ from loguru import logger
 from pydantic import BaseModel
 
 from flowchem.components.analytics.ir import IRSpectrum
+from flowchem.components.analytics.peak_analysis import PeakAnalysis
 from flowchem.components.device_info import DeviceInfo
 from flowchem.devices.flowchem_device import FlowchemDevice
+from flowchem.devices.mettlertoledo._spectrum_buffer import BufferedSpectrum, SpectrumBuffer
 from flowchem.devices.mettlertoledo.icir_control import IcIRControl
 from flowchem.utils.exceptions import DeviceError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.wait import wait_until
 
 
 class ProbeInfo(BaseModel):
@@ -32,6 +36,16 @@ class ProbeInfo(BaseModel):
     gain: int
 
 
+class LastScan(BaseModel):
+    """Results of the latest scan, read at once."""
+
+    sample_count: int | None
+    last_sample_time: datetime.datetime | None
+    treated: IRSpectrum
+    raw: IRSpectrum
+    background: IRSpectrum
+
+
 class IcIR(FlowchemDevice):
     """Object to interact with the iCIR software controlling the FlowIR and ReactIR."""
 
@@ -49,10 +63,19 @@ class IcIR(FlowchemDevice):
     START_EXPERIMENT = "ns=2;s=Local.iCIR.Probe1.Methods.Start Experiment"
     STOP_EXPERIMENT = "ns=2;s=Local.iCIR.Probe1.Methods.Stop"
     METHODS = "ns=2;s=Local.iCIR.Probe1.Methods"
+    SUBSCRIPTION_PERIOD = 250  # ms, publishing interval of the subscription to new spectra
 
     counter = 0
 
-    def __init__(self, template="", url="", name="") -> None:
+    def __init__(
+        self,
+        template="",
+        url="",
+        name="",
+        spectra_buffer_size: int = 100,
+        history_size: int = 1000,
+        history_spill_folder: str | None = None,
+    ) -> None:
         """Initiate connection with OPC UA server."""
         super().__init__(name)
         self.device_info = DeviceInfo(
@@ -72,6 +95,17 @@ class IcIR(FlowchemDevice):
 
         self._template = template
 
+        # New spectra are pushed by the OPC UA server to the buffer (see `subscribe_to_spectra`)
+        self._spectra = SpectrumBuffer(spectra_buffer_size)
+        self._subscription = None
+        self._subscribed_nodes: dict[ua.NodeId, str] = {}
+        # Spectra history settings, used by IcIRControl
+        self.history_size = history_size
+        self.history_spill_folder = history_spill_folder
+
+        # Wavenumber axes of the spectra nodes, only change with the probe configuration (e.g. resolution)
+        self._wavenumbers: dict[str, list[float]] = {}
+
     async def initialize(self):
         """Initialize, check connection and start acquisition."""
         try:
@@ -97,9 +131,20 @@ class IcIR(FlowchemDevice):
         probe = await self.probe_info()
         self.device_info.additional_info = probe.model_dump()
 
+        await self.subscribe_to_spectra()
+
         # Set IRSpectrometer component
         self.components.append(IcIRControl("ir-control", self))
 
+        # Peaks in the treated spectra are integrated as soon as received
+        peak_analysis = PeakAnalysis("peak-analysis", self)
+        self.add_spectrum_listener(
+            lambda spectrum: peak_analysis.add_spectrum(
+                spectrum.sample_count, spectrum.treated.wavenumber, spectrum.treated.intensity
+            )
+        )
+        self.components.append(peak_analysis)
+
     def is_local(self):
         """Return true if the server is on the same machine running the python code."""
         return any(
@@ -139,8 +184,68 @@ class IcIR(FlowchemDevice):
 
     async def sample_count(self) -> int | None:
         """Sample count (integer autoincrement) watch for changes to ensure latest spectrum is recent."""
+        if self._subscription is not None and (latest := self._spectra.latest()) is not None:
+            return latest.sample_count
         return await self.opcua.get_node(self.SAMPLE_COUNT).get_value()
 
+    async def subscribe_to_spectra(self):
+        """Subscribe to changes of sample count and spectra, so that new spectra are buffered as soon as available.
+
+        If the subscription fails, new spectra are detected by polling the sample count instead.
+        """
+        self._subscribed_nodes = {
+            self.opcua.get_node(node_id).nodeid: node_id
+            for node_id in (self.SAMPLE_COUNT, self.SPECTRA_TREATED, self.SPECTRA_RAW)
+        }
+        try:
+            self._subscription = await self.opcua.create_subscription(self.SUBSCRIPTION_PERIOD, self)
+            await self._subscription.subscribe_data_change(
+                [self.opcua.get_node(node_id) for node_id in self._subscribed_nodes],
+            )
+        except (ua.UaError, asyncio.TimeoutError) as error:
+            logger.warning(f"Cannot subscribe to iCIR spectra, polling will be used instead! [{error}]")
+            self._subscription = None
+
+    async def datachange_notification(self, node, val, data):
+        """Handle the data change notifications of the subscription to new spectra (asyncua handler interface)."""
+        if val is None:  # e.g. no spectrum available yet
+            return
+        match self._subscribed_nodes.get(node.nodeid):
+            case self.SAMPLE_COUNT:
+                await self._spectra.update_count(val)
+            case self.SPECTRA_TREATED:
+                await self._spectra.update_treated(await self._to_spectrum(self.SPECTRA_TREATED, val))
+            case self.SPECTRA_RAW:
+                await self._spectra.update_raw(await self._to_spectrum(self.SPECTRA_RAW, val))
+
+    async def next_spectrum(self, after: int, timeout: float | None = None) -> BufferedSpectrum | None:
+        """Return the first spectrum with a sample count higher than `after`, waiting up to `timeout` seconds for it.
+
+        None if no such spectrum is acquired in time.
+        """
+        if self._subscription is not None:
+            return await self._spectra.next_after(after, timeout)
+
+        # No subscription: poll the sample count
+        async def new_sample() -> bool:
+            count = await self.opcua.get_node(self.SAMPLE_COUNT).get_value()
+            return count is not None and count > after
+
+        try:
+            await wait_until(new_sample, timeout=timeout, min_interval=0.2)
+        except TimeoutError:
+            return None
+        scan = await self.last_scan()
+        # Buffered as if pushed by the server, so that the spectrum listeners get it as well
+        await self._spectra.update_raw(scan.raw)
+        await self._spectra.update_count(scan.sample_count)
+        await self._spectra.update_treated(scan.treated)
+        return BufferedSpectrum(sample_count=scan.sample_count, treated=scan.treated, raw=scan.raw)
+
+    def add_spectrum_listener(self, listener: Callable[[BufferedSpectrum], Awaitable[None] | None]):
+        """Call (or await, if a coroutine function) `listener` with each new spectrum received."""
+        self._spectra.add_listener(listener)
+
     @staticmethod
     def _normalize_template_name(template_name) -> str:
         """Add `.iCIRTemplate` extension to string if not already present."""
@@ -231,19 +336,70 @@ class IcIR(FlowchemDevice):
         except BadOutOfService:
             return IRSpectrum(wavenumber=[], intensity=[])
 
+    async def _wavenumber(self, node_id: str, size: int) -> list[float]:
+        """Wavenumber axis of a spectrum node, cached until the next experiment is started."""
+        wavenumber = self._wavenumbers.get(node_id)
+        # A different number of points means the probe configuration changed in the meantime
+        if wavenumber is None or len(wavenumber) != size:
+            wavenumber = await IcIR._wavenumber_from_spectrum_node(self.opcua.get_node(node_id))
+            self._wavenumbers[node_id] = wavenumber
+        return wavenumber
+
+    async def _to_spectrum(self, node_id: str, intensity: list[float] | None) -> IRSpectrum:
+        """Combine the intensity read from a spectrum node with its (cached) wavenumber axis."""
+        if not intensity:  # Spectrum not available, e.g. out of service
+            return IRSpectrum(wavenumber=[], intensity=[])
+        return IRSpectrum(wavenumber=await self._wavenumber(node_id, len(intensity)), intensity=intensity)
+
+    async def _read_values(self, *node_ids: str) -> list:
+        """Read the value of several nodes in a single request. None for the nodes that could not be read."""
+        try:
+            data_values = await self.opcua.read_attributes([self.opcua.get_node(node_id) for node_id in node_ids])
+        except BadOutOfService:
+            return [None] * len(node_ids)
+
+        # Each node has its own status, e.g. a spectrum out of service does not affect the sample count
+        values = []
+        for node_id, data_value in zip(node_ids, data_values):
+            if data_value.StatusCode.is_good() and data_value.Value is not None:
+                values.append(data_value.Value.Value)
+            else:
+                logger.debug(f"Cannot read {node_id}: {data_value.StatusCode.name}")
+                values.append(None)
+        return values
+
+    async def _read_spectrum(self, node_id: str) -> IRSpectrum:
+        (intensity,) = await self._read_values(node_id)
+        return await self._to_spectrum(node_id, intensity)
+
+    async def last_scan(self) -> LastScan:
+        """Return sample count, time and all the spectra of the latest scan, read in a single request."""
+        count, sample_time, treated, raw, background = await self._read_values(
+            self.SAMPLE_COUNT,
+            self.LAST_SAMPLE_TIME,
+            self.SPECTRA_TREATED,
+            self.SPECTRA_RAW,
+            self.SPECTRA_BACKGROUND,
+        )
+        return LastScan(
+            sample_count=count,
+            last_sample_time=sample_time,
+            treated=await self._to_spectrum(self.SPECTRA_TREATED, treated),
+            raw=await self._to_spectrum(self.SPECTRA_RAW, raw),
+            background=await self._to_spectrum(self.SPECTRA_BACKGROUND, background),
+        )
+
     async def last_spectrum_treated(self) -> IRSpectrum:
         """Return an IRSpectrum element for the last acquisition."""
-        return await IcIR.spectrum_from_node(self.opcua.get_node(self.SPECTRA_TREATED))
+        return await self._read_spectrum(self.SPECTRA_TREATED)
 
     async def last_spectrum_raw(self) -> IRSpectrum:
         """RAW result latest scan."""
-        return await IcIR.spectrum_from_node(self.opcua.get_node(self.SPECTRA_RAW))
+        return await self._read_spectrum(self.SPECTRA_RAW)
 
     async def last_spectrum_background(self) -> IRSpectrum:
         """RAW result latest scan."""
-        return await IcIR.spectrum_from_node(
-            self.opcua.get_node(self.SPECTRA_BACKGROUND),
-        )
+        return await self._read_spectrum(self.SPECTRA_BACKGROUND)
 
     async def start_experiment(
         self,
@@ -259,6 +415,9 @@ class IcIR(FlowchemDevice):
             name: experiment name.
         """
         template = self._normalize_template_name(template)
+        # The sample count restarts with the new experiment, whose template may change the wavenumber axis
+        self._spectra.clear()
+        self._wavenumbers.clear()
         if self.is_local() and self.is_template_name_valid(template) is False:
             raise DeviceError(
                 f"Cannot start template {template}: name not valid! Check if is in: "
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import datetime
 from typing import TYPE_CHECKING
 from loguru import logger
 
 from flowchem.components.analytics.ir import IRControl, IRSpectrum
+from flowchem.devices.mettlertoledo._history import SpectrumHistory, SpectrumHistorySlice
 
 if TYPE_CHECKING:
     from .icir import IcIR
@@ -28,6 +30,15 @@ class IcIRControl(IRControl):
         """
         super().__init__(name, hw_device)
         self.add_api_route("/spectrum-count", self.spectrum_count, methods=["GET"])
+        self.add_api_route("/next-spectrum", self.next_spectrum, methods=["GET"])
+        self.add_api_route("/history/samples", self.history_by_sample, methods=["GET"])
+        self.add_api_route("/history/time", self.history_by_time, methods=["GET"])
+
+        # Treated spectra received are kept in a rolling history
+        self.history = SpectrumHistory(hw_device.history_size, hw_device.history_spill_folder)
+        hw_device.add_spectrum_listener(
+            lambda spectrum: self.history.add(spectrum.sample_count, spectrum.treated)
+        )
 
     async def acquire_spectrum(self, treated: bool = True) -> IRSpectrum:
         """
@@ -71,6 +82,61 @@ class IcIRControl(IRControl):
             logger.warning("The spectrum count return a 'None' value! This reply was replaced to the int -1.")
             return -1
 
+    async def next_spectrum(self, after: int | None = None, treated: bool = True, timeout: float = 60) -> IRSpectrum:
+        """
+        Wait for a new IR spectrum and return it.
+
+        New spectra are pushed by iCIR as soon as acquired, so no polling of the spectrum count is needed.
+
+        Args:
+            after (int | None): The spectrum returned is the first one with a spectrum count higher than this.
+                                If None, the next spectrum to be acquired is returned.
+            treated (bool): If True, return the treated spectrum, otherwise the raw one.
+            timeout (float): Maximum time to wait for the spectrum, in seconds.
+
+        Returns:
+            IRSpectrum: The spectrum, empty if none was acquired within the timeout.
+        """
+        if after is None:
+            after = await self.spectrum_count()
+        spectrum = await self.hw_device.next_spectrum(after, timeout)
+        if spectrum is None:
+            logger.warning(f"No new spectrum acquired within {timeout} s!")
+            return IRSpectrum(wavenumber=[], intensity=[])
+        if treated:
+            return spectrum.treated
+        return spectrum.raw if spectrum.raw is not None else await self.hw_device.last_spectrum_raw()
+
+    async def history_by_sample(self, first: int | None = None, last: int | None = None) -> SpectrumHistorySlice:
+        """
+        Get the treated spectra from the history, by spectrum count.
+
+        Args:
+            first (int | None): Count of the first spectrum returned (oldest in history if None).
+            last (int | None): Count of the last spectrum returned (newest in history if None).
+
+        Returns:
+            SpectrumHistorySlice: Spectrum counts, timestamps and intensities, sharing one wavenumber axis.
+        """
+        return self.history.by_sample(first, last)
+
+    async def history_by_time(
+        self,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> SpectrumHistorySlice:
+        """
+        Get the treated spectra from the history, by acquisition time.
+
+        Args:
+            start (datetime | None): Time of the first spectrum returned (oldest in history if None).
+            end (datetime | None): Time of the last spectrum returned (newest in history if None).
+
+        Returns:
+            SpectrumHistorySlice: Spectrum counts, timestamps and intensities, sharing one wavenumber axis.
+        """
+        return self.history.by_time(start, end)
+
     async def stop(self):
         """
         Stop the ongoing IR experiment.
@@ -0,0 +1,80 @@
+"""Buffers of the samples pushed by the Phidget22 change handlers."""
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import numpy as np
+from pydantic import BaseModel
+
+# The last sample is used as reading if received within this number of data intervals, otherwise the sensor is queried
+MAX_SAMPLE_AGE = 3
+
+
+class SignalEdge(BaseModel):
+    """A crossing of the detection threshold: "rising" (e.g. bubble leaving) or "falling" (e.g. bubble entering)."""
+
+    timestamp: float  # POSIX timestamp
+    direction: str
+    value: float
+
+
+class SampleBuffer:
+    """Timestamped samples, the oldest being dropped once `size` is reached.
+
+    `add()` is called by the Phidget22 event thread and the readers run in the event loop: appending to a bounded
+    deque and copying it are atomic in CPython, so no lock is needed.
+    """
+
+    def __init__(self, size: int = 10000) -> None:
+        self._samples: deque[tuple[float, float]] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float, timestamp: float | None = None):
+        """Store a sample acquired at `timestamp` (now if None)."""
+        self._samples.append((timestamp if timestamp is not None else time.time(), value))
+
+    def latest(self, max_age: float | None = None) -> float | None:
+        """Return the last sample, None if none or older than `max_age` seconds."""
+        try:
+            timestamp, value = self._samples[-1]
+        except IndexError:
+            return None
+        if max_age is not None and time.time() - timestamp > max_age:
+            return None
+        return value
+
+    def average(self, seconds: float) -> float | None:
+        """Return the mean of the samples acquired in the last `seconds`, None if there are none."""
+        samples = np.array(self._samples, dtype=np.float64).reshape(-1, 2)
+        recent = samples[samples[:, 0] >= time.time() - seconds, 1]
+        return float(recent.mean()) if recent.size else None
+
+
+class EdgeDetector:
+    """Record the crossings of `threshold` by the samples, with `hysteresis` to ignore the noise around it."""
+
+    def __init__(self, threshold: float, hysteresis: float = 0.0, size: int = 1000) -> None:
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self._above: bool | None = None
+        self._edges: deque[SignalEdge] = deque(maxlen=size)
+
+    def add(self, value: float, timestamp: float | None = None):
+        """Process a sample acquired at `timestamp` (now if None)."""
+        if value > self.threshold + self.hysteresis:
+            above = True
+        elif value < self.threshold - self.hysteresis:
+            above = False
+        else:
+            return
+        if self._above is not None and above != self._above:
+            timestamp = timestamp if timestamp is not None else time.time()
+            self._edges.append(SignalEdge(timestamp=timestamp, direction="rising" if above else "falling", value=value))
+        self._above = above
+
+    def edges(self, since: float | None = None) -> list[SignalEdge]:
+        """Return the edges detected after the POSIX timestamp `since` (all of them if None)."""
+        return [edge for edge in list(self._edges) if since is None or edge.timestamp > since]
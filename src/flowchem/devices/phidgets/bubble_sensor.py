@@ -4,16 +4,19 @@ PhidgetBubbleSensor_power control the power of the bubble sensor
 PhidgetBubbleSensor measure the signal of the bubble sensor
 
 """
+import asyncio
 import time
 
 from loguru import logger
 
 from flowchem.components.device_info import DeviceInfo
 from flowchem.devices.flowchem_device import FlowchemDevice
+from flowchem.devices.phidgets._sample_buffer import MAX_SAMPLE_AGE, EdgeDetector, SampleBuffer, SignalEdge
 from flowchem.devices.phidgets.bubble_sensor_component import (
     PhidgetBubbleSensorComponent,
     PhidgetBubbleSensorPowerComponent,
 )
+from flowchem.utils.bus_executor import BusExecutor
 from flowchem.utils.people import dario, jakob, wei_hsin
 
 try:
@@ -87,6 +90,8 @@ class PhidgetPowerSource5V(FlowchemDevice):
             model="VINT",
             serial_number=vint_serial_number,
         )
+        # Phidget22 calls block until the hub replies: they run in the worker thread of the hub
+        self.bus = BusExecutor.for_bus(f"phidget:{vint_serial_number}")
 
     async def initialize(self):
         self.components.append(PhidgetBubbleSensorPowerComponent("5V", self))
@@ -125,6 +130,9 @@ class PhidgetBubbleSensor(FlowchemDevice):
         vint_channel: int = -1,
         phidget_is_remote: bool = False,
         data_interval: int = 250,  # ms
+        buffer_size: int = 10000,
+        bubble_threshold: float = 50,  # intensity, %
+        bubble_hysteresis: float = 5,  # intensity, %
         name: str = "",
     ) -> None:
         """Initialize BubbleSensor with the given voltage range (sensor-specific!)."""
@@ -142,6 +150,11 @@ class PhidgetBubbleSensor(FlowchemDevice):
         # Voltage meter by Versatile input Phidget DAQ1400_0
         self.phidget = VoltageInput()
 
+        # Every sample is pushed by the Phidget at `data_interval`, and the crossings of the threshold are recorded
+        self.samples = SampleBuffer(buffer_size)
+        self.bubble_edges = EdgeDetector(bubble_threshold, bubble_hysteresis)
+        self.phidget.setOnVoltageChangeHandler(self._on_voltage_change)
+
         # Ensure connection with the right sensor (ideally these are from config)
         if vint_serial_number > -1:
             self.phidget.setDeviceSerialNumber(vint_serial_number)
@@ -172,6 +185,8 @@ class PhidgetBubbleSensor(FlowchemDevice):
             f"default tube sensor is turn off, default data interval is {data_interval} ms!"
         )
         self.phidget.setDataInterval(data_interval)
+        self._data_interval = data_interval / 1000  # s
+        self.phidget.setVoltageChangeTrigger(0)  # Report every sample, not only changes
 
         self.device_info = DeviceInfo(
             authors=[dario, jakob, wei_hsin],
@@ -179,6 +194,8 @@ class PhidgetBubbleSensor(FlowchemDevice):
             model="VINT",
             serial_number=vint_serial_number,
         )
+        # Phidget22 calls block until the hub replies: they run in the worker thread of the hub
+        self.bus = BusExecutor.for_bus(f"phidget:{vint_serial_number}")
 
     async def initialize(self):
         self.components.append(PhidgetBubbleSensorComponent("bubble-sensor", self))
@@ -208,16 +225,21 @@ class PhidgetBubbleSensor(FlowchemDevice):
     def set_dataInterval(self, datainterval: int) -> None:
         """Set Data Interval: 20-6000 ms."""
         self.phidget.setDataInterval(datainterval)
+        self._data_interval = datainterval / 1000
         logger.debug(f"change data interval to {datainterval}!")
 
     def _voltage_to_intensity(self, voltage_in_volt: float) -> float:
         """Convert current reading into percentage."""
-        intensity_reading = voltage_in_volt * 20
-        logger.debug(f"Read intensity {intensity_reading}!")
-        return intensity_reading
+        return voltage_in_volt * 20
 
-    def read_voltage(self) -> float:  # type: ignore
-        """Read intensity from the sensor and returns it as float."""
+    def _on_voltage_change(self, _phidget, voltage: float):
+        """Handler called by Phidget22, in its own thread, with each new sample."""
+        timestamp = time.time()
+        self.samples.add(voltage, timestamp)
+        self.bubble_edges.add(self._voltage_to_intensity(voltage), timestamp)
+
+    def _get_voltage(self) -> float:
+        """Query the voltage from the sensor (blocking)."""
         try:
             voltage = self.phidget.getVoltage()
             logger.debug(f"Actual voltage: {voltage}")
@@ -226,10 +248,28 @@ class PhidgetBubbleSensor(FlowchemDevice):
             logger.error("Cannot read intensity!")
             return 0
 
-    def read_intensity(self) -> float:  # type: ignore
+    async def read_voltage(self) -> float:
+        """Read voltage from the last sample received or, if none is recent, from the sensor."""
+        voltage = self.samples.latest(max_age=MAX_SAMPLE_AGE * self._data_interval)
+        if voltage is not None:
+            return voltage
+        # No sample received in the last data intervals
+        return await self.bus.run(self._get_voltage)
+
+    async def read_intensity(self) -> float:
         """Read intensity from voltage."""
-        voltage = self.read_voltage()
-        return self._voltage_to_intensity(voltage)
+        intensity_reading = self._voltage_to_intensity(await self.read_voltage())
+        logger.debug(f"Read intensity {intensity_reading}!")
+        return intensity_reading
+
+    def average_intensity(self, seconds: float) -> float | None:
+        """Mean intensity over the last `seconds`, None if no sample was received in that time."""
+        voltage = self.samples.average(seconds)
+        return self._voltage_to_intensity(voltage) if voltage is not None else None
+
+    def get_bubble_edges(self, since: float | None = None) -> list[SignalEdge]:
+        """Crossings of the bubble threshold after the POSIX timestamp `since` (all the ones recorded if None)."""
+        return self.bubble_edges.edges(since)
 
     # def getMaxVoltage(self):
     # https: // www.phidgets.com /?view = api
@@ -251,5 +291,5 @@ if __name__ == "__main__":
     )
 
     while True:
-        print(BubbleSensor_1.read_intensity())
+        print(asyncio.run(BubbleSensor_1.read_intensity()))
         time.sleep(0.1)
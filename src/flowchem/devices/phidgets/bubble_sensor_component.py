@@ -6,6 +6,7 @@ from flowchem.components.technical.power import PowerSwitch
 from flowchem.devices.flowchem_device import FlowchemDevice
 
 if TYPE_CHECKING:
+    from ._sample_buffer import SignalEdge
     from .bubble_sensor import PhidgetBubbleSensor, PhidgetPowerSource5V
 
 from flowchem.components.sensors.sensor import Sensor
@@ -19,26 +20,36 @@ class PhidgetBubbleSensorComponent(Sensor):
         # self.add_api_route("/set-data-Interval", self.set_dataInterval, methods=["PUT"])
         self.add_api_route("/read-voltage", self.read_voltage, methods=["GET"])
         self.add_api_route("/acquire-signal", self.acquire_signal, methods=["GET"])
+        self.add_api_route("/average-signal", self.average_signal, methods=["GET"])
+        self.add_api_route("/bubble-edges", self.bubble_edges, methods=["GET"])
 
     async def power_on(self) -> bool:
-        self.hw_device.power_on()
+        await self.hw_device.bus.run(self.hw_device.power_on)
         return True
 
     async def power_off(self) -> bool:
-        self.hw_device.power_off()
+        await self.hw_device.bus.run(self.hw_device.power_off)
         return True
 
     async def read_voltage(self) -> float:
-        """Read from sensor in Volt."""
-        return self.hw_device.read_voltage()
+        """Read from sensor in Volt (last sample received)."""
+        return await self.hw_device.read_voltage()
 
     async def acquire_signal(self) -> float:
         """Transform the voltage from sensor to be expressed in percentage(%)."""
-        return self.hw_device.read_intensity()
+        return await self.hw_device.read_intensity()
+
+    async def average_signal(self, seconds: float = 1.0) -> float | None:
+        """Mean signal in percentage (%) over the last `seconds`, None if no sample was received in that time."""
+        return self.hw_device.average_intensity(seconds)
+
+    async def bubble_edges(self, since: float | None = None) -> list[SignalEdge]:
+        """Crossings of the bubble threshold after the POSIX timestamp `since`, to catch bubbles between requests."""
+        return self.hw_device.get_bubble_edges(since)
 
     async def set_dataInterval(self, datainterval: int) -> bool:
         """Set data interval at the range 20-60000 ms (default unit: ms)."""
-        self.hw_device.set_dataInterval(datainterval)
+        await self.hw_device.bus.run(self.hw_device.set_dataInterval, datainterval)
         return True
 
 
@@ -46,9 +57,9 @@ class PhidgetBubbleSensorPowerComponent(PowerSwitch):
     hw_device: PhidgetPowerSource5V  # just for typing
 
     async def power_on(self) -> bool:
-        self.hw_device.power_on()
+        await self.hw_device.bus.run(self.hw_device.power_on)
         return True
 
     async def power_off(self) -> bool:
-        self.hw_device.power_off()
+        await self.hw_device.bus.run(self.hw_device.power_off)
         return True
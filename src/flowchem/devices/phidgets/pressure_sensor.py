@@ -1,4 +1,5 @@
 """Use Phidgets to control lab devices. So far, only 4..20mA interface for Swagelock Pressure-sensor."""
+import asyncio
 import time
 
 import pint
@@ -6,9 +7,11 @@ from loguru import logger
 
 from flowchem.components.device_info import DeviceInfo
 from flowchem.devices.flowchem_device import FlowchemDevice
+from flowchem.devices.phidgets._sample_buffer import MAX_SAMPLE_AGE, SampleBuffer
 from flowchem.devices.phidgets.pressure_sensor_component import (
     PhidgetPressureSensorComponent,
 )
+from flowchem.utils.bus_executor import BusExecutor
 from flowchem.utils.people import dario, jakob, wei_hsin
 
 try:
@@ -33,6 +36,8 @@ class PhidgetPressureSensor(FlowchemDevice):
         vint_serial_number: int = -1,
         vint_channel: int = -1,
         phidget_is_remote: bool = False,
+        data_interval: int = 200,  # ms
+        buffer_size: int = 10000,
         name: str = "",
     ) -> None:
         """Initialize PressureSensor with the given pressure range (sensor-specific!)."""
@@ -48,6 +53,9 @@ class PhidgetPressureSensor(FlowchemDevice):
         self._max_pressure = ureg.Quantity(sensor_max)
         # current meter
         self.phidget = CurrentInput()
+        # Every sample is pushed by the Phidget at `data_interval`
+        self.samples = SampleBuffer(buffer_size)
+        self.phidget.setOnCurrentChangeHandler(self._on_current_change)
 
         # Ensure connection with the right sensor (ideally these are from config)
         if vint_serial_number > -1:
@@ -73,7 +81,9 @@ class PhidgetPressureSensor(FlowchemDevice):
 
         # Set power supply to 24V
         self.phidget.setPowerSupply(PowerSupply.POWER_SUPPLY_24V)
-        self.phidget.setDataInterval(200)  # 200ms
+        self.phidget.setDataInterval(data_interval)
+        self._data_interval = data_interval / 1000  # s
+        self.phidget.setCurrentChangeTrigger(0)  # Report every sample, not only changes
 
         self.device_info = DeviceInfo(
             authors=[dario, jakob, wei_hsin],
@@ -81,6 +91,8 @@ class PhidgetPressureSensor(FlowchemDevice):
             model="VINT",
             serial_number=vint_serial_number,
         )
+        # Phidget22 calls block until the hub replies: they run in the worker thread of the hub
+        self.bus = BusExecutor.for_bus(f"phidget:{vint_serial_number}")
 
     async def initialize(self):
 
@@ -104,7 +116,26 @@ class PhidgetPressureSensor(FlowchemDevice):
         logger.debug(f"Read pressure {pressure_reading}!")
         return pressure_reading
 
-    def read_pressure(self) -> pint.Quantity:  # type: ignore
+    def _on_current_change(self, _phidget, current: float):
+        """Handler called by Phidget22, in its own thread, with each new sample."""
+        self.samples.add(current)
+
+    def average_pressure(self, seconds: float) -> pint.Quantity | None:
+        """Mean pressure over the last `seconds`, None if no sample was received in that time."""
+        current = self.samples.average(seconds)
+        return self._current_to_pressure(current) if current is not None else None
+
+    def _get_current(self) -> float | None:
+        """Query the current from the sensor (blocking), None if it cannot be read."""
+        try:
+            current = self.phidget.getCurrent()
+            logger.debug(f"Actual current: {current}")
+            return current
+        except PhidgetException:
+            logger.error("Cannot read pressure!")
+            return None
+
+    async def read_pressure(self) -> pint.Quantity:  # type: ignore
         """Read pressure from the sensor and returns it as pint.Quantity.
 
         This is the main class method, and it never fails, but rather return None. Why?
@@ -117,14 +148,13 @@ class PhidgetPressureSensor(FlowchemDevice):
         If not we can live with it, returning None and letting the caller decide what
         to do with that.
         """
-        try:
-            current = self.phidget.getCurrent()
-            logger.debug(f"Actual current: {current}")
-        except PhidgetException:
-            logger.error("Cannot read pressure!")
+        current = self.samples.latest(max_age=MAX_SAMPLE_AGE * self._data_interval)
+        if current is None:
+            # No sample received in the last data intervals
+            current = await self.bus.run(self._get_current)
+        if current is None:
             return 0 * ureg.bar
-        else:
-            return self._current_to_pressure(current)
+        return self._current_to_pressure(current)
 
 
 if __name__ == "__main__":
@@ -134,5 +164,5 @@ if __name__ == "__main__":
         vint_channel=0,
     )
     while True:
-        print(test.read_pressure())
+        print(asyncio.run(test.read_pressure()))
         time.sleep(1)
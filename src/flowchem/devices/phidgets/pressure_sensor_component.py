@@ -21,6 +21,7 @@ class PhidgetPressureSensorComponent(PressureSensor):
             hw_device (FlowchemDevice): The hardware device associated with this sensor.
         """
         super().__init__(name, hw_device)
+        self.add_api_route("/average-pressure", self.average_pressure, methods=["GET"])
 
     async def read_pressure(self, units: str = "bar"):
         """
@@ -32,4 +33,18 @@ class PhidgetPressureSensorComponent(PressureSensor):
         Returns:
             float: The pressure reading expressed in the specified units.
         """
-        return self.hw_device.read_pressure().m_as(units)
+        return (await self.hw_device.read_pressure()).m_as(units)
+
+    async def average_pressure(self, seconds: float = 1.0, units: str = "bar") -> float | None:
+        """
+        Return the mean pressure over the last `seconds`, in the specified units.
+
+        Args:
+            seconds (float): Averaging window in seconds. Default is 1 s.
+            units (str): The units to express the pressure in. Default is "bar".
+
+        Returns:
+            float | None: The mean pressure, None if no sample was received in the window.
+        """
+        pressure = self.hw_device.average_pressure(seconds)
+        return pressure.m_as(units) if pressure is not None else None
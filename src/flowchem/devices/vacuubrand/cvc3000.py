@@ -11,6 +11,7 @@ from flowchem.devices.vacuubrand.cvc3000_pressure_control import CVC3000Pressure
 from flowchem.devices.vacuubrand.constants import ProcessStatus
 from flowchem.utils.exceptions import InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.rate_limit import RateLimiter
 
 
 class CVC3000(FlowchemDevice):
@@ -25,10 +26,14 @@ class CVC3000(FlowchemDevice):
     -----------
     DEFAULT_CONFIG : dict
         Default configuration parameters for the serial connection.
+    RATE_LIMIT : dict
+        Maximum command rate (commands/s) and burst accepted by the device.
     _serial : aioserial.AioSerial
         The serial interface used to communicate with the device.
     _device_sn : int
         The serial number of the device (initialized as None).
+    rate_limiter : RateLimiter
+        Delays the commands exceeding RATE_LIMIT, with throttling statistics.
     device_info : DeviceInfo
         Metadata and configuration details about the device.
 
@@ -59,6 +64,7 @@ class CVC3000(FlowchemDevice):
         "stopbits": aioserial.STOPBITS_ONE,
         "bytesize": aioserial.EIGHTBITS,
     }
+    RATE_LIMIT = {"rate": 10, "burst": 1}  # Max rate 10 commands/s as per manual
 
     def __init__(
         self,
@@ -78,6 +84,7 @@ class CVC3000(FlowchemDevice):
         super().__init__(name)
         self._serial = aio
         self._device_sn: int = None  # type: ignore
+        self.rate_limiter = RateLimiter(**self.RATE_LIMIT, name=f"CVC3000 {name}")
 
         self.device_info = DeviceInfo(
             authors=[dario, jakob, wei_hsin],
@@ -174,6 +181,7 @@ class CVC3000(FlowchemDevice):
         ------
         If no reply is received within the timeout period, an error is logged.
         """
+        await self.rate_limiter.acquire()
         await self._serial.write_async(command.encode("ascii") + b"\r\n")
         logger.debug(f"Command `{command}` sent!")
 
@@ -184,8 +192,6 @@ class CVC3000(FlowchemDevice):
             logger.error("No reply received! Unsupported command?")
             return ""
 
-        await asyncio.sleep(0.1)  # Max rate 10 commands/s as per manual
-
         logger.debug(f"Reply received: {reply}")
         return reply.decode("ascii")
 
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 from flowchem.components.technical.pressure import PressureControl
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.devices.vacuubrand.constants import ProcessStatus, PumpState
+from flowchem.utils.rate_limit import RateLimitStats
 
 if TYPE_CHECKING:
     from flowchem.devices.vacuubrand.cvc3000 import CVC3000
@@ -35,6 +36,8 @@ class CVC3000PressureControl(PressureControl):
         Turn on the pressure control.
     power_off() -> bool:
         Turn off the pressure control.
+    get_rate_limit_stats() -> RateLimitStats:
+        Retrieve the commands sent and how many of them were delayed by the rate limit.
     """
 
     hw_device: CVC3000  # for typing's sake
@@ -58,6 +61,7 @@ class CVC3000PressureControl(PressureControl):
             response_model=ProcessStatus,
             methods=["PUT"],
         )
+        self.add_api_route("/rate-limit-stats", self.get_rate_limit_stats, methods=["GET"])
 
     async def set_pressure(self, pressure: str):
         """
@@ -121,3 +125,14 @@ class CVC3000PressureControl(PressureControl):
             Returns binary string if the command to stop the pressure control was successful.
         """
         return await self.hw_device._send_command_and_read_reply("STOP")
+
+    async def get_rate_limit_stats(self) -> RateLimitStats:
+        """
+        Retrieve the commands sent to the CVC3000 and how many of them were delayed by the rate limit.
+
+        Returns:
+        --------
+        RateLimitStats
+            Commands sent, commands delayed and total delay in seconds.
+        """
+        return self.hw_device.rate_limiter.stats
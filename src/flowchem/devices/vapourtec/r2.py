@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from asyncio import Lock
 from collections import namedtuple
 from collections.abc import Iterable
+from dataclasses import dataclass
 
 import aioserial
 import pint
@@ -13,7 +15,7 @@ from loguru import logger
 from flowchem import ureg
 from flowchem.components.device_info import DeviceInfo
 from flowchem.components.technical.temperature import TempRange
-from flowchem.devices.flowchem_device import FlowchemDevice
+from flowchem.devices.flowchem_device import FlowchemDevice, RepeatedTaskInfo
 from flowchem.devices.vapourtec.r2_components_control import (
     R2GeneralPressureSensor,
     R2GeneralSensor,
@@ -25,8 +27,9 @@ from flowchem.devices.vapourtec.r2_components_control import (
     R4Reactor,
     UV150PhotoReactor,
 )
-from flowchem.utils.exceptions import InvalidConfigurationError
+from flowchem.utils.exceptions import DeviceError, InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.retry import RetryError, RetryPolicy, RetryStats
 
 try:
     # noinspection PyUnresolvedReferences
@@ -37,6 +40,44 @@ except ImportError:
     HAS_VAPOURTEC_COMMANDS = False
 
 
+def parse_temperature_history(reply: str) -> list[float]:
+    """Return the temperatures (in Celsius) of the 4 channels from the latest temperature history point."""
+    # 0: time, 1..8: cooling, heating, or ...  / temp (alternating per channel)
+    _, *temps = reply.split("&")[0].split(",")
+    return [float(temps[channel * 2 + 1]) / 10 for channel in range(4)]
+
+
+def parse_pressure_history(reply: str) -> tuple[int, int, int]:
+    """Return the pressures (in mbar) of pump A, pump B and system from the latest pressure history point."""
+    # Each pressure data point consists of four values: time and three pressures, e.g. 45853,94,193,142
+    _, *pressures = reply.split("&")[0].split(",")
+    # Converts to mbar
+    p_in_mbar = [int(x) * 10 for x in pressures]
+    return p_in_mbar[1], p_in_mbar[2], p_in_mbar[0]  # pumpA, pumpB, system
+
+
+def parse_flow_history(reply: str) -> dict[str, float]:
+    """Return the flow rates (in ul/min) of pump A and B from the latest flow history point."""
+    # 0: time, 1: pump A, 2: pump B
+    _, flow_a, flow_b = reply.split("&")[0].split(",")
+    return {"A": float(flow_a), "B": float(flow_b)}
+
+
+@dataclass
+class R2Snapshot:
+    """State of all the R2 channels, from a single read of status and history streams."""
+
+    timestamp: float  # time.monotonic() at acquisition of the oldest reading
+    status: tuple  # R2.AllComponentStatus
+    temperatures: list[float]  # Celsius, per R4 channel
+    pressures: tuple[int, int, int]  # mbar, pump A, pump B and system
+    flows: dict[str, float]  # ul/min, per pump
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
 class R2(FlowchemDevice):
     """R2 reactor module class."""
 
@@ -48,6 +89,11 @@ class R2(FlowchemDevice):
         "bytesize": aioserial.EIGHTBITS,
     }
 
+    # A command without reply is sent again, up to 4 times
+    REPLY_RETRY = RetryPolicy(max_attempts=4, initial_delay=0.2, retry_on=())
+    # A query acknowledged with "OK" instead of the data is sent again, up to 3 times
+    QUERY_RETRY = RetryPolicy(max_attempts=3, initial_delay=0.05, retry_on=())
+
     AllComponentStatus = namedtuple(
         "AllComponentStatus",
         [
@@ -78,6 +124,8 @@ class R2(FlowchemDevice):
         max_temp: float | list[float] = 80,
         min_pressure: float = 1000,
         max_pressure: float = 50000,
+        snapshot_max_age: float = 1.0,
+        snapshot_interval: float = 0,
         **config,
     ) -> None:
         super().__init__(name)
@@ -122,6 +170,22 @@ class R2(FlowchemDevice):
             model="R2 reactor module",
         )
         self._serial_lock = Lock()
+        self.retry_stats = RetryStats()
+
+        # The status and each history stream (temperatures, pressures, flows) are read for all the channels at once
+        # and shared by all the components. Each reading is only read again when older than `snapshot_max_age` seconds
+        # (or any command changed the settings), and, if `snapshot_interval` > 0, all of them are refreshed
+        # periodically in the background (see `repeated_task()`).
+        self.snapshot_max_age = snapshot_max_age
+        self.snapshot_interval = snapshot_interval
+        self._query_parsers = {
+            self.cmd.GET_STATUS: lambda reply: R2.AllComponentStatus._make(reply.split(" ")),
+            self.cmd.HISTORY_TEMPERATURE: parse_temperature_history,
+            self.cmd.HISTORY_PRESSURE: parse_pressure_history,
+            self.cmd.HISTORY_FLOW: parse_flow_history,
+        }
+        self._readings: dict[str, tuple[float, object]] = {}  # Query -> time.monotonic() and parsed reply
+        self._reading_locks = {command: Lock() for command in self._query_parsers}
 
     async def initialize(self):
         """Ensure connection."""
@@ -198,28 +262,24 @@ class R2(FlowchemDevice):
 
     async def write_and_read_reply(self, command: str) -> str:
         """Send a command to the pump, read the replies and return it, optionally parsed."""
-        self._serial.reset_input_buffer()  # Clear input buffer, discarding all that is in the buffer.
-        async with self._serial_lock:
+        if command not in self._query_parsers:
+            # The settings may change, so the readings are not reliable anymore
+            self._readings.clear()
+
+        async def send() -> str:
+            self._serial.reset_input_buffer()  # Clear input buffer, discarding all that is in the buffer.
             await self._write(command)
-            logger.debug(f"Command {command} sent to R2!")
-
-            failure = 0
-            while True:
-                response = await self._read_reply()
-                if not response:
-                    failure += 1
-                    logger.warning(f"{failure} time of failure!")
-                    logger.error(f"Command {command} is not working")
-                    await asyncio.sleep(0.2)
-                    self._serial.reset_input_buffer()
-                    await self._write(command)
-                    # Allows 4 failures...
-                    if failure > 3:
-                        raise InvalidConfigurationError(
-                            "No response received from R2 module!"
-                        )
-                else:
-                    break
+            return await self._read_reply()
+
+        # Retries are counted per command, not per value sent (e.g. each flow rate set)
+        name = f"R2 {command.split(' ', 1)[0]} (no reply)"
+        async with self._serial_lock:
+            try:
+                response = await self.REPLY_RETRY.run(
+                    send, retry_if=lambda reply: not reply, name=name, stats=self.retry_stats
+                )
+            except RetryError as error:
+                raise InvalidConfigurationError("No response received from R2 module!") from error
 
         logger.debug(f"Reply received: {response}")
         return response.rstrip()
@@ -235,12 +295,9 @@ class R2(FlowchemDevice):
         return await self.write_and_read_reply(self.cmd.GET_SYSTEM_TYPE)
 
     async def get_status(self) -> AllComponentStatus:
-        """Get all status from R2."""
-        raw_status = await self.write_and_read_reply(self.cmd.GET_STATUS)
-        if raw_status == "OK":
-            logger.warning("ValueError:the reply of get status command is OK..")
-            return await self.get_status()
-        return R2.AllComponentStatus._make(raw_status.split(" "))
+        """Get all status from R2, shared with the other readings (see `snapshot()`)."""
+        _, status = await self._reading(self.cmd.GET_STATUS)
+        return status
 
     # Get specific state of individual component
     async def get_state(self) -> str:
@@ -376,34 +433,72 @@ class R2(FlowchemDevice):
         """Turn off both devices, R2 and R4."""
         await self.write_and_read_reply(self.cmd.POWER_OFF)
 
+    async def _query(self, command: str) -> str:
+        """Send a query and return the reply, sending it again (see QUERY_RETRY) if only acknowledged with OK."""
+        try:
+            return await self.QUERY_RETRY.run(
+                lambda: self.write_and_read_reply(command),
+                retry_if=lambda reply: reply == "OK",
+                name=f"R2 {command}",
+                stats=self.retry_stats,
+            )
+        except RetryError as error:
+            raise DeviceError(f"No valid reply from R2 to {command}!") from error
+
+    async def _reading(self, command: str, max_age: float | None = None) -> tuple[float, object]:
+        """Return the time and the parsed reply of the query `command`, sent again only if older than `max_age`.
+
+        Concurrent requests share the same read.
+        """
+        max_age = self.snapshot_max_age if max_age is None else max_age
+        async with self._reading_locks[command]:
+            reading = self._readings.get(command)
+            if reading is None or time.monotonic() - reading[0] > max_age:
+                reply = await self._query(command)
+                reading = (time.monotonic(), self._query_parsers[command](reply))
+                self._readings[command] = reading
+            return reading
+
+    async def snapshot(self, max_age: float | None = None) -> R2Snapshot:
+        """Return the state of all the channels, each reading sent again only if older than `max_age` (default
+        snapshot_max_age).
+        """
+        readings = [
+            await self._reading(command, max_age)
+            for command in (
+                self.cmd.GET_STATUS,
+                self.cmd.HISTORY_TEMPERATURE,
+                self.cmd.HISTORY_PRESSURE,
+                self.cmd.HISTORY_FLOW,
+            )
+        ]
+        (status, temperatures, pressures, flows) = (value for _, value in readings)
+        return R2Snapshot(min(timestamp for timestamp, _ in readings), status, temperatures, pressures, flows)
+
+    def repeated_task(self) -> RepeatedTaskInfo | None:
+        """Refresh all the readings every `snapshot_interval` seconds, if set."""
+        if self.snapshot_interval <= 0:
+            return None
+
+        async def refresh_snapshot():
+            try:
+                await self.snapshot(max_age=self.snapshot_interval / 2)
+            except (DeviceError, InvalidConfigurationError) as error:
+                logger.error(f"Cannot refresh R2 snapshot: {error}")
+
+        return RepeatedTaskInfo(seconds_every=self.snapshot_interval, task=refresh_snapshot)
+
     async def get_current_temperature(self, channel) -> float:
         """Get temperature (in Celsius) from channel3."""
-        temp_history = await self.write_and_read_reply(self.cmd.HISTORY_TEMPERATURE)
-        if temp_history == "OK":
-            logger.warning("ValueError:the reply of get temperature command is OK..")
-            return await self.get_current_temperature(channel)
-
-        # 0: time, 1..8: cooling, heating, or ...  / temp (alternating per channel)
-        temp_time, *temps = temp_history.split(",")
-        return float(temps[channel * 2 + 1]) / 10
+        _, temperatures = await self._reading(self.cmd.HISTORY_TEMPERATURE)
+        return temperatures[channel]
 
     async def get_pressure_history(
         self,
     ) -> tuple[int, int, int]:
         """Get pressure history and returns it as (in mbar)."""
-        # Get a `&` separated list of pressures for all sensors every second
-        pressure_history = await self.write_and_read_reply(self.cmd.HISTORY_PRESSURE)
-        if pressure_history == "OK":
-            logger.warning("ValueError:the reply for get pressure command is OK....")
-            # This may give an infinite loop
-            return await self.get_pressure_history()
-        # Each pressure data point consists of four values: time and three pressures
-        _, *pressures = pressure_history.split("&")[0].split(
-            ",",
-        )  # e.g. 45853,94,193,142
-        # Converts to mbar
-        p_in_mbar = [int(x) * 10 for x in pressures]
-        return p_in_mbar[1], p_in_mbar[2], p_in_mbar[0]  # pumpA, pumpB, system
+        _, pressures = await self._reading(self.cmd.HISTORY_PRESSURE)
+        return pressures
 
     async def get_current_pressure(self, pump_code: int = 2) -> pint.Quantity:
         """Get current pressure (in mbar)."""
@@ -413,32 +508,23 @@ class R2(FlowchemDevice):
 
     async def get_current_flow(self, pump_code: str) -> float:
         """Get current flow rate (in ul/min)."""
-        state = await self.write_and_read_reply(self.cmd.HISTORY_FLOW)
-        if state == "OK":
-            logger.warning("ValueError:the reply of get flow command is OK....")
-            return await self.get_current_flow(pump_code)
-
-        pump_flow = {}
-        # _: time, A: pump A, B: pump B
-        _, pump_flow["A"], pump_flow["B"] = state.split("&")[0].split(",")
-        # 0: time, 1: pump A, 2: pump B
-        return float(pump_flow[pump_code])
+        _, flows = await self._reading(self.cmd.HISTORY_FLOW)
+        return flows[pump_code]
 
     async def pooling(self) -> dict:
         """Extract all reaction parameters."""
-        AllState = {}
-        while True:
-            state = await self.get_status()
-            AllState["RunState_code"] = state.run_state
-            AllState["allValve"] = f"{int(state.LEDs_bitmap):05b}"
-            (
-                AllState["pumpA_P"],
-                AllState["pumpB_P"],
-                AllState["sysP (mbar)"],
-            ) = await self.get_pressure_history()
-
-            # AllState["Temp"] = await self.get_current_temperature()
-            return AllState
+        snapshot = await self.snapshot()
+        AllState = {
+            "RunState_code": snapshot.status.run_state,
+            "allValve": f"{int(snapshot.status.LEDs_bitmap):05b}",
+        }
+        (
+            AllState["pumpA_P"],
+            AllState["pumpB_P"],
+            AllState["sysP (mbar)"],
+        ) = snapshot.pressures
+        AllState["Temp"] = snapshot.temperatures
+        return AllState
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ from flowchem.components.technical.power import PowerSwitch
 from flowchem.components.technical.temperature import TemperatureControl, TempRange
 from flowchem.components.valves.distribution_valves import TwoPortDistributionValve
 from flowchem.components.valves.injection_valves import SixPortTwoPositionValve
+from flowchem.utils.retry import RetryStats
 
 if TYPE_CHECKING:
     from .r2 import R2
@@ -41,6 +42,7 @@ class R2GeneralSensor(Sensor):
             self.set_sys_pressure_limit,
             methods=["PUT"],
         )
+        self.add_api_route("/retry-stats", self.get_retry_stats, methods=["GET"])
 
     async def monitor_sys(self) -> dict:
         """Monitor system performance."""
@@ -56,6 +58,10 @@ class R2GeneralSensor(Sensor):
         await self.hw_device.set_pressure_limit(pressure)
         return True
 
+    async def get_retry_stats(self) -> RetryStats:
+        """Get the attempts made for each R2 command, and how many of them were retried."""
+        return self.hw_device.retry_stats
+
 
 class R4Reactor(TemperatureControl):
     """R4 reactor heater channel controlled via the R2."""
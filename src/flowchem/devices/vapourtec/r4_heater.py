@@ -1,8 +1,11 @@
 """Control module for the Vapourtec R4 heater."""
 from __future__ import annotations
 
+import asyncio
+import time
 from collections import namedtuple
 from collections.abc import Iterable
+from dataclasses import dataclass
 
 import aioserial
 import pint
@@ -12,9 +15,11 @@ from flowchem import ureg
 from flowchem.components.device_info import DeviceInfo
 from flowchem.components.technical.temperature import TempRange
 from flowchem.devices.flowchem_device import FlowchemDevice
-from flowchem.devices.vapourtec.r4_heater_channel_control import R4HeaterChannelControl
+from flowchem.devices.vapourtec.r4_heater_channel_control import R4HeaterChannelControl, R4HeaterMonitor
 from flowchem.utils.exceptions import InvalidConfigurationError
 from flowchem.utils.people import dario, jakob, wei_hsin
+from flowchem.utils.retry import RetryPolicy
+from flowchem.utils.wait import wait_until
 
 try:
     # noinspection PyUnresolvedReferences
@@ -25,6 +30,18 @@ except ImportError:
     HAS_VAPOURTEC_COMMANDS = False
 
 
+@dataclass
+class R4Snapshot:
+    """State and temperature of all the R4 channels, read in one polling cycle."""
+
+    timestamp: float  # time.monotonic() at acquisition
+    channels: list  # R4Heater.ChannelStatus, per channel
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
 class R4Heater(FlowchemDevice):
     """R4 reactor heater control class."""
 
@@ -38,11 +55,15 @@ class R4Heater(FlowchemDevice):
 
     ChannelStatus = namedtuple("ChannelStatus", "state, temperature")
 
+    # The status command is a bit fragile for unknown reasons: allows 3 failures cause the R4 is choosy at times...
+    STATUS_RETRY = RetryPolicy(max_attempts=4, initial_delay=0.05, retry_on=(InvalidConfigurationError,))
+
     def __init__(
         self,
         name: str = "",
         min_temp: float | list[float] = -100,
         max_temp: float | list[float] = 250,
+        snapshot_max_age: float = 1.0,
         **config,
     ) -> None:
         super().__init__(name)
@@ -82,6 +103,14 @@ class R4Heater(FlowchemDevice):
             manufacturer="Vapourtec",
             model="R4 reactor module",
         )
+        self._serial_lock = asyncio.Lock()
+
+        # The status of all the channels is read in one cycle and shared by all the components. It is read again when
+        # older than `snapshot_max_age` seconds or after any command changing the settings.
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot: R4Snapshot | None = None
+        self._snapshot_lock = asyncio.Lock()
+        self._status_commands = {self.cmd.GET_STATUS.format(channel=channel) for channel in range(4)}
 
     async def initialize(self):
         """Ensure connection."""
@@ -99,6 +128,7 @@ class R4Heater(FlowchemDevice):
             for n in range(4)
         ]
         self.components.extend(reactor_positions)
+        self.components.append(R4HeaterMonitor("monitor", self))
 
     async def _write(self, command: str):
         """Write a command to the pump."""
@@ -114,10 +144,14 @@ class R4Heater(FlowchemDevice):
 
     async def write_and_read_reply(self, command: str) -> str:
         """Send a command to the pump, read the replies and return it, optionally parsed."""
-        self._serial.reset_input_buffer()
-        await self._write(command)
-        logger.debug(f"Command {command} sent to R4!")
-        response = await self._read_reply()
+        if command not in self._status_commands:
+            # The settings may change, so the snapshot is not reliable anymore
+            self._snapshot = None
+        async with self._serial_lock:
+            self._serial.reset_input_buffer()
+            await self._write(command)
+            logger.debug(f"Command {command} sent to R4!")
+            response = await self._read_reply()
 
         if not response:
             msg = "No response received from heating module!"
@@ -140,29 +174,34 @@ class R4Heater(FlowchemDevice):
         # Set temperature implies channel on
         await self.power_on(channel)
         # Verify it is not unplugged
-        status = await self.get_status(channel)
+        status = await self._read_status(channel)
         if status.state == "U":
             logger.error(
                 f"TARGET CHANNEL {channel} UNPLUGGED! (Note: numbering starts at 0)",
             )
 
+    async def _read_status(self, channel) -> ChannelStatus:
+        raw_status = await self.STATUS_RETRY.run(
+            lambda: self.write_and_read_reply(self.cmd.GET_STATUS.format(channel=channel)),
+            name=f"R4 status of channel {channel}",
+        )
+        return R4Heater.ChannelStatus(raw_status[:1], raw_status[1:])
+
+    async def snapshot(self, max_age: float | None = None) -> R4Snapshot:
+        """Return the status of all the channels, read again only if older than `max_age` (default snapshot_max_age).
+
+        Concurrent requests share the same read.
+        """
+        max_age = self.snapshot_max_age if max_age is None else max_age
+        async with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.age > max_age:
+                channels = [await self._read_status(channel) for channel in range(4)]
+                self._snapshot = R4Snapshot(time.monotonic(), channels)
+            return self._snapshot
+
     async def get_status(self, channel) -> ChannelStatus:
         """Get status from channel."""
-        # This command is a bit fragile for unknown reasons.
-        failure = 0
-        while True:
-            try:
-                raw_status = await self.write_and_read_reply(
-                    self.cmd.GET_STATUS.format(channel=channel),
-                )
-                return R4Heater.ChannelStatus(raw_status[:1], raw_status[1:])
-            except InvalidConfigurationError as ex:
-                failure += 1
-                # Allows 3 failures cause the R4 is choosy at times...
-                if failure > 3:
-                    raise ex
-                else:
-                    continue
+        return (await self.snapshot()).channels[channel]
 
     async def get_temperature(self, channel):
         """Get temperature (in Celsius) from channel."""
@@ -177,6 +216,26 @@ class R4Heater(FlowchemDevice):
         """Turn off channel."""
         await self.write_and_read_reply(self.cmd.POWER_OFF.format(channel=channel))
 
+    async def wait_until_stable(
+        self,
+        channels: list[int] | None = None,
+        timeout: float | None = None,
+        interval: float | None = None,
+    ) -> bool:
+        """Wait until all the `channels` (all if None) are stable at their target temperature.
+
+        The status of the channels is read once per `interval` seconds (default snapshot_max_age), whatever the number
+        of channels waited for. Raises TimeoutError if the channels are not stable after `timeout` seconds.
+        """
+        channels = list(range(4)) if channels is None else channels
+        interval = self.snapshot_max_age if interval is None else interval
+
+        async def all_stable() -> bool:
+            snapshot = await self.snapshot(max_age=interval)
+            return all(snapshot.channels[channel].state == "S" for channel in channels)
+
+        return await wait_until(all_stable, timeout=timeout, min_interval=interval, max_interval=interval)
+
 
 if __name__ == "__main__":
     import asyncio
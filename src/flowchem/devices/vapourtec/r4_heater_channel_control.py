@@ -3,6 +3,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from pydantic import BaseModel
+
+from flowchem.components.flowchem_component import FlowchemComponent
 from flowchem.components.technical.temperature import TemperatureControl, TempRange
 
 if TYPE_CHECKING:
@@ -82,3 +85,53 @@ class R4HeaterChannelControl(TemperatureControl):
             Awaitable: Result of the power off operation from the hardware device.
         """
         return await self.hw_device.power_off(self.channel)
+
+
+class R4ChannelState(BaseModel):
+    """State code (e.g. "S" for stable at target, "U" for unplugged) and temperature (Celsius) of an R4 channel."""
+
+    channel: int
+    state: str
+    temperature: str
+
+
+class R4HeaterMonitor(FlowchemComponent):
+    """Status of all the channels of the R4 heater, read in a single polling cycle."""
+
+    hw_device: R4Heater  # for typing's sake
+
+    def __init__(self, name: str, hw_device: R4Heater) -> None:
+        super().__init__(name, hw_device)
+        self.add_api_route("/status", self.get_status, methods=["GET"])
+        self.add_api_route("/wait-until-stable", self.wait_until_stable, methods=["GET"])
+        self.component_info.type = "R4 Monitor"
+
+    async def get_status(self) -> list[R4ChannelState]:
+        """
+        Return the state and the temperature of all the channels.
+
+        Returns:
+            list[R4ChannelState]: one entry per channel, numbered from 0.
+        """
+        snapshot = await self.hw_device.snapshot()
+        return [
+            R4ChannelState(channel=channel, state=status.state, temperature=status.temperature)
+            for channel, status in enumerate(snapshot.channels)
+        ]
+
+    async def wait_until_stable(self, channels: str = "0,1,2,3", timeout: float = 600) -> bool:
+        """
+        Wait until all the selected channels are stable at their target temperature.
+
+        Args:
+            channels (str): comma-separated channel numbers, starting from 0 (e.g. '0,2').
+            timeout (float): maximum wait in seconds.
+
+        Returns:
+            bool: True if all the channels are stable, False if the timeout expired.
+        """
+        selected = [int(channel) for channel in channels.split(",") if channel.strip()]
+        try:
+            return await self.hw_device.wait_until_stable(selected, timeout=timeout)
+        except TimeoutError:
+            return False
@@ -0,0 +1,166 @@
+"""Background conversion of the Waters .raw data to mzML with ProteoWizard's msconvert."""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from shutil import which
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+class ConversionJob(BaseModel):
+    """Conversion of the data of a sample.
+
+    The `state` goes from "acquiring" (waiting for the .raw data to be complete) to "queued" (waiting for a free
+    worker), "converting" and finally "done" or "failed".
+    """
+
+    sample_name: str
+    raw_path: str
+    output_dir: str
+    state: str = "acquiring"
+    mzml_path: str | None = None
+    error: str | None = None
+    submitted: float  # POSIX timestamps
+    converted: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+
+def folder_signature(path: Path) -> tuple[int, int, float] | None:
+    """Number of files, total size and last modification time of a folder (or file), None if missing. Blocking."""
+    if not path.exists():
+        return None
+    if path.is_file():
+        stat = path.stat()
+        return 1, stat.st_size, stat.st_mtime
+    count, size, mtime = 0, 0, path.stat().st_mtime
+    for root, _, files in os.walk(path):
+        for file in files:
+            stat = (Path(root) / file).stat()
+            count, size, mtime = count + 1, size + stat.st_size, max(mtime, stat.st_mtime)
+    return count, size, mtime
+
+
+class ConversionPipeline:
+    """Watch the raw data folder for the runs submitted and convert each one as soon as its acquisition is complete.
+
+    A .raw folder is considered complete when it exists after the expected end of the run and has not changed for
+    `settle_time` seconds. At most `max_workers` msconvert processes run at the same time.
+    """
+
+    def __init__(
+        self,
+        raw_data_dir: str | Path,
+        msconvert_dir: str | Path = "",
+        max_workers: int = 2,
+        watch_interval: float = 5,
+        settle_time: float = 30,
+        acquisition_timeout: float = 3600,
+    ) -> None:
+        self.raw_data_dir = Path(raw_data_dir)
+        local_executable = Path(msconvert_dir) / "msconvert.exe"
+        self.msconvert = str(local_executable) if local_executable.is_file() else which("msconvert") or "msconvert"
+        self.watch_interval = watch_interval
+        self.settle_time = settle_time
+        self.acquisition_timeout = acquisition_timeout
+        self.jobs: dict[str, ConversionJob] = {}
+        self._max_workers = max_workers
+        self._workers: asyncio.Semaphore | None = None
+        self._expected_end: dict[str, float] = {}
+        self._last_change: dict[str, tuple[tuple | None, float]] = {}
+        self._finished: dict[str, asyncio.Event] = {}
+        self._watcher: asyncio.Task | None = None
+        self._conversions: set[asyncio.Task] = set()
+
+    def submit(self, sample_name: str, output_dir: str | Path, run_duration: float = 0) -> ConversionJob:
+        """Convert the data of `sample_name` once acquired, the acquisition taking about `run_duration` seconds."""
+        raw_name = sample_name if sample_name.endswith(".raw") else f"{sample_name}.raw"
+        job = ConversionJob(
+            sample_name=sample_name,
+            raw_path=str(self.raw_data_dir / raw_name),
+            output_dir=str(output_dir),
+            submitted=time.time(),
+        )
+        self.jobs[sample_name] = job
+        self._expected_end[sample_name] = time.monotonic() + run_duration
+        self._last_change.pop(sample_name, None)
+        self._finished[sample_name] = asyncio.Event()
+        if self._workers is None:
+            self._workers = asyncio.Semaphore(self._max_workers)
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+        return job
+
+    async def wait(self, sample_name: str, timeout: float | None = None) -> ConversionJob | None:
+        """Wait until the conversion of `sample_name` is finished, up to `timeout` seconds. None if unknown sample."""
+        if sample_name not in self.jobs:
+            return None
+        try:
+            await asyncio.wait_for(self._finished[sample_name].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.jobs[sample_name]
+
+    async def _watch(self):
+        while acquiring := [job for job in self.jobs.values() if job.state == "acquiring"]:
+            for job in acquiring:
+                try:
+                    await self._check_acquisition(job)
+                except OSError as error:
+                    logger.warning(f"Cannot check the raw data of {job.sample_name}: {error}")
+            await asyncio.sleep(self.watch_interval)
+
+    async def _check_acquisition(self, job: ConversionJob):
+        now = time.monotonic()
+        if now < self._expected_end[job.sample_name]:
+            return
+        signature = await asyncio.to_thread(folder_signature, Path(job.raw_path))
+        previous, since = self._last_change.get(job.sample_name, (None, now))
+        if signature != previous:
+            self._last_change[job.sample_name] = signature, now
+        elif signature is not None and now - since >= self.settle_time:
+            job.state = "queued"
+            task = asyncio.create_task(self._convert(job))
+            self._conversions.add(task)
+            task.add_done_callback(self._conversions.discard)
+            return
+        if now - self._expected_end[job.sample_name] > self.acquisition_timeout:
+            self._finish(job, "failed", error=f"No complete raw data found at {job.raw_path}")
+
+    async def _convert(self, job: ConversionJob):
+        async with self._workers:
+            job.state = "converting"
+            Path(job.output_dir).mkdir(parents=True, exist_ok=True)
+            logger.info(f"Converting {job.raw_path} to mzML")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self.msconvert,
+                    job.raw_path,
+                    "-o",
+                    job.output_dir,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+            except OSError as error:
+                self._finish(job, "failed", error=str(error))
+                return
+
+        mzml = Path(job.output_dir) / f"{Path(job.raw_path).stem}.mzML"
+        if process.returncode == 0 and mzml.exists():
+            job.mzml_path = str(mzml)
+            self._finish(job, "done")
+        else:
+            self._finish(job, "failed", error=stderr.decode(errors="replace").strip() or f"exit {process.returncode}")
+
+    def _finish(self, job: ConversionJob, state: str, error: str | None = None):
+        job.state, job.error, job.converted = state, error, time.time()
+        if error:
+            logger.error(f"Conversion of {job.sample_name} failed: {error}")
+        self._finished[job.sample_name].set()
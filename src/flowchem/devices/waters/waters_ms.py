@@ -6,12 +6,14 @@ The Aim of this code is to supply a class that deals with creating the file with
 dropping it to the right folder.
 https://www.waters.com/webassets/cms/support/docs/71500123505ra.pdf
 """
+import asyncio
 import subprocess
 from pathlib import Path
 
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.utils.people import jakob, miguel
 
+from ._conversion import ConversionJob, ConversionPipeline
 from .waters_ms_component import WatersMSControl
 
 
@@ -29,6 +31,10 @@ class WatersMS(FlowchemDevice):
         ms_exp_file (str): Name of the MS experiment method file.
         tune_file (str): Name of the tune method file.
         inlet_method (str): Name of the inlet method file.
+        raw_data_dir (str): Folder where the MS saves the `.raw` data.
+        msconvert_dir (str): Path to the folder containing `msconvert.exe`.
+        max_conversions (int): Maximum number of conversions running at the same time.
+        settle_time (float): Seconds without change after which the `.raw` data of a run is considered complete.
     """
     def __init__(self,
                  name: str = "Waters_MS",
@@ -36,6 +42,10 @@ class WatersMS(FlowchemDevice):
                  ms_exp_file: str = "",
                  tune_file: str = "",
                  inlet_method: str = "inlet_method",
+                 raw_data_dir: str = r"PATH/TO/Data",
+                 msconvert_dir: str = r"PATH/TO/ProteoWizard 64-bit",
+                 max_conversions: int = 2,
+                 settle_time: float = 30,
                  ) -> None:
 
         super().__init__(name=name)
@@ -48,6 +58,7 @@ class WatersMS(FlowchemDevice):
         self.rows = f"\t{ms_exp_file}\t{tune_file}\t{inlet_method}\t66\t1"
         self.queue_path = Path(path_to_AutoLynxQ)
         self.run_duration = None
+        self.conversions = ConversionPipeline(raw_data_dir, msconvert_dir, max_conversions, settle_time=settle_time)
 
     async def initialize(self):
         """Assign components."""
@@ -62,24 +73,30 @@ class WatersMS(FlowchemDevice):
         """
         Create and drop a queue file for AutoLynx to initiate MS acquisition.
 
+        The conversion, if requested, runs in the background once the acquisition is complete: its progress can be
+        followed with `get_conversion()` or `wait_for_conversion()`.
+
         Args:
             sample_name (str): Base name for the output MS data file.
             run_duration (int): Estimated duration of the MS acquisition (in seconds).
             queue_name (str): Name of the AutoLynx queue file to write.
-            do_conversion (bool): If True, automatically convert raw data to mzML format after delay.
+            do_conversion (bool): If True, automatically convert raw data to mzML format once acquired.
             output_dir (str): Directory to store converted `.mzML` files.
         """
         # Autolynx behaves weirdly, it expects a .txt file and that the fields are separated by tabs. A csv file
         # separated w commas however does not work... Autolynx has to be set to look for csv files
         file_path = self.queue_path/Path(queue_name)
-        with open(file_path,'w') as f:
-            f.write(self.fields)
-            f.write(f"\n{sample_name}{self.rows}")
+        await asyncio.to_thread(file_path.write_text, f"{self.fields}\n{sample_name}{self.rows}")
         if do_conversion:
-            c = Converter(output_dir=output_dir)
-            # get filename
-            # get run duration
-            c.convert_masspec(str(sample_name), run_delay=run_duration+60)
+            self.conversions.submit(str(sample_name), output_dir=output_dir, run_duration=run_duration)
+
+    async def get_conversion(self, sample_name: str) -> ConversionJob | None:
+        """State of the conversion of a sample, None if no conversion was requested for it."""
+        return self.conversions.jobs.get(sample_name)
+
+    async def wait_for_conversion(self, sample_name: str, timeout: float | None = None) -> ConversionJob | None:
+        """Wait until the conversion of a sample is finished, up to `timeout` seconds, and return its state."""
+        return await self.conversions.wait(sample_name, timeout)
 
 
 # convert to mzml 64-bit
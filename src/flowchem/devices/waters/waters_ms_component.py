@@ -10,6 +10,8 @@ from typing import TYPE_CHECKING
 
 from flowchem.components.analytics.ms import MSControl
 
+from ._conversion import ConversionJob
+
 if TYPE_CHECKING:
     from flowchem.devices import WatersMS
 
@@ -29,6 +31,8 @@ class WatersMSControl(MSControl):
     def __init__(self, name: str, hw_device: WatersMS) -> None:
         """Device-specific initialization."""
         super().__init__(name, hw_device)
+        self.add_api_route("/conversion", self.get_conversion, methods=["GET"])
+        self.add_api_route("/conversion/wait", self.wait_for_conversion, methods=["GET"])
 
     async def run_sample(self,
                          sample_name: str,
@@ -53,4 +57,29 @@ class WatersMSControl(MSControl):
                                                run_duration=run_duration,
                                                queue_name=queue_name,
                                                do_conversion=do_conversion,
-                                               output_dir=output_dir)
\ No newline at end of file
+                                               output_dir=output_dir)
+
+    async def get_conversion(self, sample_name: str) -> ConversionJob | None:
+        """
+        Return the state of the mzML conversion of a sample.
+
+        Args:
+            sample_name (str): Name of the sample, as given to run_sample.
+
+        Returns:
+            ConversionJob | None: state and, once done, path of the mzML file. None if no conversion was requested.
+        """
+        return await self.hw_device.get_conversion(sample_name)
+
+    async def wait_for_conversion(self, sample_name: str, timeout: float = 60) -> ConversionJob | None:
+        """
+        Wait until the mzML conversion of a sample is finished, up to `timeout` seconds.
+
+        Args:
+            sample_name (str): Name of the sample, as given to run_sample.
+            timeout (float): Maximum wait in seconds.
+
+        Returns:
+            ConversionJob | None: state of the conversion, None if no conversion was requested.
+        """
+        return await self.hw_device.wait_for_conversion(sample_name, timeout)
@@ -8,6 +8,7 @@ from typing import Any
 
 from loguru import logger
 
+from flowchem.components.valves.fluidic_graph import FluidicNetwork
 from flowchem.devices.flowchem_device import FlowchemDevice
 from flowchem.server.configuration_parser import (
     instantiate_device_from_config,
@@ -94,6 +95,10 @@ class Flowchem:
             await self.mdns.add_device(name=device.name)
             # Add device API to HTTP server
             self.http.add_device(device)
+
+        # Route liquid across the valves of all devices, given the tubing between their ports
+        if "fluidics" in self.config:
+            self.http.add_fluidic_network(FluidicNetwork.from_devices(self.devices, **self.config["fluidics"]))
         logger.info("Server component(s) loaded successfully!")
 
 
@@ -67,6 +67,8 @@ class FastAPIServer:
 
         # Add repeated tasks for device if any
         if tasks := device.repeated_task():
+            if isinstance(tasks, RepeatedTaskInfo):
+                tasks = [tasks]
             self.add_background_tasks(tasks)
 
         # add device components
@@ -74,3 +76,8 @@ class FastAPIServer:
         for component in device.components:
             self.app.include_router(component.router, tags=component.router.tags)
             logger.debug(f"Router <{component.router.prefix}> added to app!")
+
+    def add_fluidic_network(self, network):
+        """Add the fluidic network (routing across the valves of all devices) to server."""
+        self.app.include_router(network.router)
+        logger.debug(f"Fluidic network of {len(network.valves)} valves added to app!")
@@ -0,0 +1,58 @@
+"""Run the blocking calls of vendor SDKs (e.g. propar, Phidget22) without blocking the event loop.
+
+Each physical bus (a serial port, a Phidget hub...) gets its own small thread pool, shared by all the devices on that
+bus. Calls to the same bus are executed in order and, with the default single worker, one at a time, as most SDKs are
+not safe for concurrent use of one connection. A slow bus only delays the calls queued for it, while the event loop
+keeps serving the other devices and the HTTP requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, TypeVar
+
+T = TypeVar("T")
+
+
+class BusExecutor:
+    """Bounded thread pool for the blocking calls to one bus. Use `BusExecutor.for_bus()` to get the shared one."""
+
+    _buses: ClassVar[dict[str, BusExecutor]] = {}
+
+    def __init__(self, bus: str, max_workers: int = 1, max_pending: int = 32) -> None:
+        self.bus = bus
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"bus-{bus}")
+        # Callers beyond `max_pending` wait in the event loop instead of piling up in the pool queue. The executors are
+        # shared by the whole process, while a semaphore only works within one event loop: one semaphore per loop.
+        self._pending: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def for_bus(cls, bus: str, max_workers: int = 1) -> BusExecutor:
+        """Return the executor of `bus` (e.g. the serial port name), creating it on first use."""
+        if bus not in cls._buses:
+            cls._buses[bus] = cls(bus, max_workers)
+        elif cls._buses[bus].max_workers != max_workers:
+            raise ValueError(
+                f"Bus {bus} already has {cls._buses[bus].max_workers} worker(s), cannot use it with {max_workers}"
+            )
+        return cls._buses[bus]
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run `func(*args, **kwargs)` in the bus worker thread and return its result."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._pending:
+            self._pending[loop] = asyncio.Semaphore(self.max_pending)
+        async with self._pending[loop]:
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop the worker threads once the queued calls are done."""
+        self._pool.shutdown(wait=True)
+        BusExecutor._buses.pop(self.bus, None)
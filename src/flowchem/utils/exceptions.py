@@ -1,7 +1,7 @@
 """Exceptions used in the flowchem module."""
 
 
-class DeviceError(BaseException):
+class DeviceError(Exception):
     """Generic DeviceError."""
 
 
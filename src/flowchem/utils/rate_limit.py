@@ -0,0 +1,68 @@
+"""Rate limiting of the commands sent to instruments that only accept a given number of commands per second.
+
+A `RateLimiter` is a token bucket: it holds up to `burst` tokens, refilled at `rate` tokens per second, and each command
+takes one. A command is only delayed when the bucket is empty, so commands sent seconds apart pay no penalty while a
+burst of commands is spread out to stay within the instrument specification. The delays are counted in
+`RateLimiter.stats`.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+
+
+@dataclass
+class RateLimitStats:
+    """Commands sent (`calls`), how many of them were delayed (`throttled`) and the total delay in seconds."""
+
+    calls: int = 0
+    throttled: int = 0
+    waited: float = 0.0
+
+
+class RateLimiter:
+    """Token bucket limiting the commands of a device to `rate` per second, allowing up to `burst` at once.
+
+    With `burst=1`, consecutive commands are at least 1/`rate` seconds apart. Use as `async with limiter:` (or await
+    `acquire()`) before sending each command. Waiting commands are served in order of arrival.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, name: str = "") -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid rate limit: {rate} commands/s with burst {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self.stats = RateLimitStats()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Take a token, waiting for the bucket to refill if empty."""
+        async with self._lock:
+            self.stats.calls += 1
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                self.stats.throttled += 1
+                self.stats.waited += delay
+                logger.debug(f"{self.name or 'Rate limit'}: command delayed by {delay:.3f} s")
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens = max(self._tokens - 1, 0)
+
+    async def __aenter__(self) -> RateLimiter:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
@@ -0,0 +1,148 @@
+"""Bounded retries of device IO.
+
+A `RetryPolicy` retries an operation that raised a retryable exception or returned a retryable result, sleeping
+between attempts with an exponentially increasing, jittered delay. The retries are bounded both by a number of attempts
+and by a deadline, so a stuck instrument ends up with an error instead of a busy loop. The attempts can be counted in
+a `RetryStats`, for each operation.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from loguru import logger
+
+from flowchem.utils.exceptions import DeviceError
+
+T = TypeVar("T")
+
+
+class RetryError(DeviceError):
+    """The retries of an operation are exhausted without success."""
+
+    def __init__(self, message: str, attempts: int, last_result: Any = None) -> None:
+        super().__init__(message)
+        self.attempts = attempts
+        self.last_result = last_result
+
+
+@dataclass
+class RetryCount:
+    """Attempts made for an operation: `calls` (first attempts), `retries` and `failures` (retries exhausted)."""
+
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+
+
+@dataclass
+class RetryStats:
+    """Retry counts per operation, e.g. to find out which command of a device needs retrying most often."""
+
+    operations: dict[str, RetryCount] = field(default_factory=dict)
+
+    def __getitem__(self, operation: str) -> RetryCount:
+        return self.operations.setdefault(operation, RetryCount())
+
+    @property
+    def retries(self) -> int:
+        return sum(count.retries for count in self.operations.values())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How to retry an operation.
+
+    Args:
+    ----
+        max_attempts: maximum number of attempts (including the first one), unbounded if None.
+        deadline: maximum time in seconds from the first attempt after which no new attempt is started, unbounded if
+            None. At least one of `max_attempts` and `deadline` should be set.
+        initial_delay: delay in seconds before the first retry.
+        max_delay: upper bound for the delay between attempts, in seconds.
+        backoff: multiplicative factor applied to the delay after each retry.
+        jitter: relative random variation of each delay (0.1 is +/- 10%), so that several clients sharing a bus do not
+            retry in lockstep.
+        retry_on: exceptions that trigger a retry, any other one is raised immediately.
+    """
+
+    max_attempts: int | None = 3
+    deadline: float | None = None
+    initial_delay: float = 0.1
+    max_delay: float = 2.0
+    backoff: float = 2.0
+    jitter: float = 0.1
+    retry_on: tuple[type[BaseException], ...] = (OSError, asyncio.TimeoutError)
+
+    def delay(self, retry: int) -> float:
+        """Delay in seconds before the n-th `retry` (starting from 1)."""
+        delay = min(self.initial_delay * self.backoff ** (retry - 1), self.max_delay)
+        return max(delay * (1 + random.uniform(-self.jitter, self.jitter)), 0)
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        retry_if: Callable[[T], bool] | None = None,
+        name: str = "",
+        stats: RetryStats | None = None,
+    ) -> T:
+        """Await `operation()` until it succeeds, retrying as long as the policy allows it.
+
+        Args:
+        ----
+            operation: coroutine function to await at each attempt.
+            retry_if: predicate on the result of an attempt, True if the attempt needs to be retried.
+            name: description of the operation, for logging and for `stats`.
+            stats: where to count the attempts made.
+
+        Returns:
+        -------
+            The result of the first successful attempt.
+
+        Raises:
+        ------
+            The exception of the last attempt, if a retryable one, or RetryError if the last result was not valid.
+        """
+        name = name or getattr(operation, "__qualname__", "operation")
+        count = stats[name] if stats is not None else RetryCount()
+        count.calls += 1
+        end = time.monotonic() + self.deadline if self.deadline is not None else None
+        attempt = 0
+
+        while True:
+            attempt += 1
+            error: BaseException | None = None
+            try:
+                result = await operation()
+            except self.retry_on as exc:
+                error = exc
+            else:
+                if retry_if is None or not retry_if(result):
+                    return result
+
+            attempts_left = self.max_attempts is None or attempt < self.max_attempts
+            delay = self.delay(attempt)
+            if not attempts_left or (end is not None and time.monotonic() + delay > end):
+                count.failures += 1
+                logger.error(f"{name} failed after {attempt} attempt(s)")
+                if error is not None:
+                    raise error
+                raise RetryError(f"{name} failed after {attempt} attempt(s)", attempt, result)
+
+            count.retries += 1
+            reason = repr(error) if error is not None else f"invalid result {result!r}"
+            logger.warning(f"{name} attempt {attempt} failed ({reason}), retrying in {delay:.2f} s")
+            await asyncio.sleep(delay)
+
+    def __call__(self, func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """Use the policy as decorator of a coroutine function, retried on the exceptions in `retry_on`."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await self.run(lambda: func(*args, **kwargs), name=func.__qualname__)
+
+        return wrapper
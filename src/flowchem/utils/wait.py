@@ -0,0 +1,81 @@
+"""Adaptive waiting for device-side conditions (e.g. end of a pump movement).
+
+Polling a device at a fixed rate for the whole duration of a long operation keeps shared serial buses busy for no
+reason. `wait_until()` sleeps through the part of the operation whose duration is known in advance and only then
+polls the device, with an exponentially increasing interval.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+
+
+async def _sleep_or_cancel(delay: float, cancel_event: asyncio.Event | None) -> bool:
+    """Sleep for `delay` seconds, return True if `cancel_event` was set in the meantime."""
+    if cancel_event is None:
+        await asyncio.sleep(delay)
+        return False
+    try:
+        await asyncio.wait_for(cancel_event.wait(), delay)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def wait_until(
+    condition: Callable[[], Awaitable[bool]],
+    expected_duration: float | None = None,
+    timeout: float | None = None,
+    cancel_event: asyncio.Event | None = None,
+    lead_time: float = 0.5,
+    min_interval: float = 0.05,
+    max_interval: float = 1.0,
+    backoff: float = 2.0,
+) -> bool:
+    """Wait until the awaitable `condition` returns True.
+
+    Args:
+    ----
+        condition: coroutine function returning True once the wait is over, e.g. `pump.is_idle`.
+        expected_duration: predicted time to completion in seconds, if known. No polling happens until `lead_time`
+            seconds before the predicted completion.
+        timeout: maximum wait in seconds, a TimeoutError is raised once exceeded.
+        cancel_event: optional event that aborts the wait when set.
+        lead_time: seconds before the predicted completion at which polling starts.
+        min_interval: first polling interval in seconds.
+        max_interval: upper bound for the polling interval in seconds.
+        backoff: multiplicative factor applied to the polling interval after each unsuccessful poll.
+
+    Returns:
+    -------
+        True if the condition was met, False if the wait was cancelled via `cancel_event`.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def _bounded(delay: float) -> float:
+        if deadline is None:
+            return delay
+        return max(min(delay, deadline - time.monotonic()), 0)
+
+    if expected_duration is not None and expected_duration > lead_time:
+        logger.debug(f"Waiting {expected_duration - lead_time:.2f} s before polling")
+        if await _sleep_or_cancel(_bounded(expected_duration - lead_time), cancel_event):
+            return False
+
+    interval = min_interval
+    polls = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        polls += 1
+        if await condition():
+            logger.debug(f"Condition met after {polls} polls")
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"Condition not met within {timeout} s ({polls} polls)")
+        if await _sleep_or_cancel(_bounded(interval), cancel_event):
+            return False
+        interval = min(interval * backoff, max_interval)
@@ -0,0 +1,108 @@
+"""Test the routing across several valves. Does not require any device."""
+import asyncio
+import time
+
+import pytest
+
+from flowchem.components.valves.fluidic_graph import FluidicNetwork, parse_port
+from flowchem.components.valves.valve import Valve
+from flowchem.utils.exceptions import DeviceError, InvalidConfigurationError
+
+
+class FakeValveDevice:
+    """Moves the valve in 0.1 s."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.position = 0
+        self.components: list[Valve] = []
+
+    async def set_raw_position(self, position):
+        await asyncio.sleep(0.1)
+        self.position = position
+
+
+class FakeDistributionValve(Valve):
+    def __init__(self, name: str, hw_device: FakeValveDevice) -> None:
+        super().__init__(name, hw_device,
+                         stator_ports=[(1, 2, 3, 4, 5, 6), (0,)],
+                         rotor_ports=[(7, None, None, None, None, None), (7,)])
+
+    def _change_connections(self, raw_position, reverse: bool = False):
+        return raw_position
+
+
+class FakeInjectionValve(FakeDistributionValve):
+    def __init__(self, name: str, hw_device: FakeValveDevice) -> None:
+        Valve.__init__(self, name, hw_device,
+                       stator_ports=[(1, 2, 3, 4, 5, 6), ()],
+                       rotor_ports=[(7, 7, 8, 8, 9, 9), ()])
+
+
+@pytest.fixture
+def network() -> FluidicNetwork:
+    """Selector valve in front of an injection valve, whose port 2 goes to an autosampler valve."""
+    devices = []
+    for device_name, valve_type in (("pump", FakeDistributionValve), ("hplc", FakeInjectionValve),
+                                    ("sampler", FakeDistributionValve)):
+        device = FakeValveDevice(device_name)
+        device.components.append(valve_type("valve", device))
+        devices.append(device)
+    tubing = [
+        ["pump/valve:2", "hplc/valve:1"],
+        ["pump/valve:4", "hplc/valve:3"],
+        ["hplc/valve:2", "sampler/valve:0"],
+    ]
+    return FluidicNetwork.from_devices(devices, tubing=tubing)
+
+
+def test_parse_port():
+    assert parse_port("my-device/valve:12") == ("my-device/valve", 12)
+    with pytest.raises(InvalidConfigurationError):
+        parse_port("my-device/valve")
+
+
+async def test_route(network):
+    route = await network.find_route("pump/valve:0", "sampler/valve:3")
+    assert route.path == ["pump/valve:0", "pump/valve:2", "hplc/valve:1", "hplc/valve:2", "sampler/valve:0",
+                          "sampler/valve:3"]
+    assert route.connections["pump/valve"] == [(2, 0)]
+    assert route.connections["hplc/valve"] == [(1, 2), (3, 4), (5, 6)]
+    assert route.connections["sampler/valve"] == [(3, 0)]
+
+
+async def test_route_avoid(network):
+    # Going through port 4 of the selector needs the other position of the injection valve
+    route = await network.find_route("pump/valve:0", "hplc/valve:2", avoid="pump/valve:2")
+    assert route.path == ["pump/valve:0", "pump/valve:4", "hplc/valve:3", "hplc/valve:2"]
+    assert route.positions["hplc/valve"] == 1
+
+    # The sampler is connected by tubing to the sink: no way to avoid it
+    with pytest.raises(DeviceError):
+        await network.find_route("pump/valve:0", "hplc/valve:2", avoid="sampler/valve:0")
+    with pytest.raises(DeviceError):
+        await network.find_route("pump/valve:0", "hplc/valve:5")
+    with pytest.raises(DeviceError):
+        await network.find_route("pump/valve:0", "nowhere/valve:1")
+
+
+async def test_connect(network):
+    start = time.monotonic()
+    route = await network.connect("pump/valve:0", "sampler/valve:3")
+    # The three valves are moved at the same time
+    assert time.monotonic() - start < 0.25
+    for name, position in route.positions.items():
+        assert network.valves[name].hw_device.position == position
+
+
+def test_invalid_tubing(network):
+    with pytest.raises(InvalidConfigurationError):
+        FluidicNetwork(network.valves, tubing=[["pump/valve:2", "hplc/valve:7"]])
+    with pytest.raises(InvalidConfigurationError):
+        FluidicNetwork(network.valves, tubing=[["pump/valve:2"]])
+
+
+def test_info(network):
+    info = network.info()
+    assert set(info.valves) == {"pump/valve", "hplc/valve", "sampler/valve"}
+    assert ("hplc/valve:2", "sampler/valve:0") in info.tubing
@@ -0,0 +1,77 @@
+"""Test the peak integration and steady-state detection. Does not require any device."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from flowchem.components.analytics.peak_analysis import (
+    IntegrationWindow,
+    PeakAnalysis,
+    PeakIntegrator,
+    SteadyStateCriterion,
+)
+from flowchem.devices.flowchem_device import FlowchemDevice
+
+WINDOWS = [IntegrationWindow(name="sm", start=1755, end=1690), IntegrationWindow(name="product", start=1755, end=1830)]
+
+
+def test_integration_matches_trapezoid():
+    axis = np.linspace(2000, 1600, 401)  # Decreasing, as IR wavenumbers
+    intensity = np.exp(-((axis - 1720) ** 2) / 200) + 2 * np.exp(-((axis - 1790) ** 2) / 200)
+    areas = PeakIntegrator(WINDOWS).integrate(axis, intensity)
+
+    for window in WINDOWS:
+        mask = (axis >= min(window.start, window.end)) & (axis <= max(window.start, window.end))
+        x, y = axis[mask], intensity[mask]
+        expected = np.sum(np.abs(np.diff(x)) * (y[:-1] + y[1:]) / 2)
+        assert areas[window.name] == pytest.approx(expected)
+    assert areas["product"] == pytest.approx(2 * areas["sm"], rel=0.01)
+
+    # Flat spectrum: the area is the window width
+    flat = PeakIntegrator(WINDOWS).integrate(axis, np.ones_like(axis))
+    assert flat == pytest.approx({"sm": 65, "product": 75})
+
+
+async def test_wait_until_stable():
+    analysis = PeakAnalysis("peak-analysis", FlowchemDevice("ir"))
+    await analysis.set_windows(WINDOWS)
+    await analysis.set_criterion(SteadyStateCriterion(tolerance=0.01, consecutive=3))
+    axis = np.linspace(1600, 2000, 401)
+
+    async def acquire(product_fractions):
+        for sample, fraction in enumerate(product_fractions):
+            intensity = np.where(axis > 1755, fraction, 1 - fraction)
+            await analysis.add_spectrum(sample, axis, intensity)
+            await asyncio.sleep(0.01)
+
+    waiter = asyncio.create_task(analysis.wait_until_stable(timeout=5))
+    await asyncio.sleep(0)
+    await acquire([0.1, 0.3, 0.5, 0.6, 0.601, 0.602, 0.9])
+
+    result = await waiter
+    assert result.stable
+    assert result.sample == 5  # 0.6, 0.601, 0.602 within tolerance
+    assert (await analysis.get_peak_areas()).sample == 6
+
+
+async def test_wait_until_stable_burst():
+    analysis = PeakAnalysis("peak-analysis", FlowchemDevice("ir"))
+    await analysis.set_windows(WINDOWS)
+    await analysis.set_criterion(SteadyStateCriterion(tolerance=0.01, consecutive=3))
+    axis = np.linspace(1600, 2000, 401)
+
+    waiter = asyncio.create_task(analysis.wait_until_stable(timeout=5))
+    await asyncio.sleep(0)
+    # Spectra integrated one after the other, before the waiting task resumes
+    for sample, fraction in enumerate([0.6, 0.601, 0.602, 0.9]):
+        await analysis.add_spectrum(sample, axis, np.where(axis > 1755, fraction, 1 - fraction))
+
+    result = await waiter
+    assert result.stable
+    assert result.sample == 2
+    assert not (await analysis.get_peak_areas()).stable
+
+
+async def test_wait_until_stable_timeout():
+    analysis = PeakAnalysis("peak-analysis", FlowchemDevice("ir"))
+    assert await analysis.wait_until_stable(timeout=0.05) is None
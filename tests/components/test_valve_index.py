@@ -0,0 +1,66 @@
+"""Test the port index used by valves to resolve connections to positions. Does not require any device."""
+import pytest
+
+from flowchem.components.valves.valve import PortIndex, Valve
+from flowchem.utils.exceptions import DeviceError
+
+SIX_PORT_TWO_POSITION = ([(1, 2, 3, 4, 5, 6), ()], [(7, 7, 8, 8, 9, 9), ()])
+SIX_PORT_DISTRIBUTION = ([(1, 2, 3, 4, 5, 6), (0,)], [(7, None, None, None, None, None), (7,)])
+# Hamilton dual pump valve, connecting three ports at once
+THREE_PORT_FOUR_POSITION = ([(None, 1, 2, 3), (0,)], [(4, 4, 5, 5), (4,)])
+
+
+class FakeDevice:
+    name = "fake"
+
+
+def make_valve(geometry) -> Valve:
+    stator, rotor = geometry
+    return Valve("valve", FakeDevice(), stator_ports=stator, rotor_ports=rotor)
+
+
+def test_positions():
+    index = PortIndex.for_geometry(*SIX_PORT_TWO_POSITION)
+    assert dict(index.positions) == {0: ((1, 2), (3, 4), (5, 6)), 1: ((1, 6), (2, 3), (4, 5))}
+    index = PortIndex.for_geometry(*SIX_PORT_DISTRIBUTION)
+    assert len(index.positions) == 6
+    assert index.positions[2] == ((3, 0),)
+
+
+def test_index_shared_and_immutable():
+    index = PortIndex.for_geometry(*SIX_PORT_DISTRIBUTION)
+    # Lists and tuples describing the same geometry share the same index
+    assert PortIndex.for_geometry([list(p) for p in SIX_PORT_DISTRIBUTION[0]], SIX_PORT_DISTRIBUTION[1]) is index
+    assert make_valve(SIX_PORT_DISTRIBUTION)._positions is make_valve(SIX_PORT_DISTRIBUTION)._positions
+    with pytest.raises(TypeError):
+        index.positions[0] = ((1, 0),)
+
+
+def test_resolve():
+    index = PortIndex.for_geometry(*THREE_PORT_FOUR_POSITION)
+    assert index.resolve(((0, 2),)) == 0b110
+    # Excluding the connection to port 3 leaves one position
+    assert index.resolve(((0, 2),), ((0, 3),)) == 0b010
+    assert index.resolve(((1, 2, 0),)) == index.resolve(((1, 2), (2, 0))) == 0b010
+    assert index.resolve(((1, 42),)) == 0
+    assert index.resolve(None) == 0b1111
+
+
+def test_connect_positions():
+    valve = make_valve(SIX_PORT_TWO_POSITION)
+    assert valve._connect_positions(((1, 2),)) == 0
+    assert valve._connect_positions(((2, 3), (5, 4))) == 1
+    with pytest.raises(DeviceError):
+        valve._connect_positions(((1, 2), (2, 3)))
+
+    valve = make_valve(THREE_PORT_FOUR_POSITION)
+    # The lowest position is chosen when several are suitable, if allowed
+    assert valve._connect_positions(((0, 2),)) == 1
+    with pytest.raises(DeviceError):
+        valve._connect_positions(((0, 2),), arbitrary_switching=False)
+    assert valve._connect_positions(((0, 2),), ((0, 1),), arbitrary_switching=False) == 2
+
+
+def test_connections():
+    info = make_valve(SIX_PORT_TWO_POSITION).connections()
+    assert info.positions[1] == ((1, 6), (2, 3), (4, 5))
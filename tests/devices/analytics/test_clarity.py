@@ -0,0 +1,65 @@
+"""Test the Clarity command runner, with the Python interpreter standing in for claritychrom.exe."""
+import asyncio
+import sys
+
+from flowchem.devices.dataapex._command_runner import CommandRunner, split_arguments
+from flowchem.devices.dataapex.clarity import Clarity
+
+
+def test_split_arguments():
+    assert split_arguments(r'i=1 cfg=C:\clarity\my.cfg set_sample_name="a sample"') == [
+        "i=1",
+        r"cfg=C:\clarity\my.cfg",
+        "set_sample_name=a sample",
+    ]
+
+
+async def test_commands_serialized_with_status_and_timing(tmp_path):
+    log = tmp_path / "log.txt"
+    runner = CommandRunner(sys.executable, timeout=5)
+    script = "import sys, time; open(sys.argv[1], 'a').write(sys.argv[2] + '+'); time.sleep(0.1); " \
+             "open(sys.argv[1], 'a').write(sys.argv[2] + '-'); sys.exit(int(sys.argv[2]))"
+
+    results = await asyncio.gather(*(runner.run(["-c", script, str(log), str(n)]) for n in range(3)))
+    # No overlapping launches, in order of submission
+    assert log.read_text() == "0+0-1+1-2+2-"
+    assert [result.returncode for result in results] == [0, 1, 2]
+    assert all(result.duration >= 0.1 for result in results)
+    assert results[2].queued > results[0].queued
+    assert len(runner.history) == 3
+    runner.stop()
+
+
+async def test_timeout_does_not_block_queue(tmp_path):
+    runner = CommandRunner(sys.executable, timeout=0.2)
+    script = "import sys, time; time.sleep(0.5); open(sys.argv[1], 'w').write('done')"
+    killed, detached, fast = await asyncio.gather(
+        runner.run(["-c", script, str(tmp_path / "killed")]),
+        runner.run(["-c", script, str(tmp_path / "detached")], kill_on_timeout=False),
+        runner.run(["-c", "pass"], timeout=5),
+    )
+    assert not killed.completed and not detached.completed
+    assert fast.returncode == 0
+    # The command timed out is killed, the one left running completes in the background
+    await asyncio.gather(*runner._detached)
+    assert not (tmp_path / "killed").exists()
+    assert (tmp_path / "detached").read_text() == "done"
+    runner.stop()
+
+
+async def test_startup_already_running(mocker):
+    clarity = Clarity(name="hplc", executable=sys.executable, startup_time=30)
+    mocker.patch("flowchem.devices.dataapex.clarity.split_arguments", return_value=["-c", "pass"])
+    sleep = mocker.patch("flowchem.devices.dataapex.clarity.asyncio.sleep")
+    # The startup command completes when passed to a running ClarityChrom: no wait for the startup
+    await clarity.initialize()
+    sleep.assert_not_called()
+    assert len(clarity.components) == 1
+
+
+async def test_execute_command():
+    clarity = Clarity(name="hplc", executable=sys.executable, cmd_timeout=5)
+    assert await clarity.execute_command('-c "import sys; sys.exit(3)"', without_instrument_num=True)
+    history = await clarity.command_history()
+    assert history[-1].returncode == 3
+    assert history[-1].command == "-c import sys; sys.exit(3)"
@@ -0,0 +1,61 @@
+"""Test the caching of the iCIR wavenumber axis. Does not require a connection to iCIR."""
+import datetime
+
+from asyncua import ua
+
+from flowchem.devices.mettlertoledo.icir import IcIR
+
+
+def data_values(*values) -> list[ua.DataValue]:
+    """DataValues as read from the OPC UA server, BadOutOfService for the values None."""
+    return [
+        ua.DataValue(ua.Variant(value)) if value is not None
+        else ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadOutOfService))
+        for value in values
+    ]
+
+
+async def test_wavenumber_read_once_per_experiment(mocker):
+    ir = IcIR(template="template")
+    read = mocker.patch.object(ir.opcua, "read_attributes", return_value=data_values([0.1, 0.2, 0.3]))
+    read_axis = mocker.patch.object(IcIR, "_wavenumber_from_spectrum_node", return_value=[1000, 1500, 2000])
+
+    for _ in range(3):
+        spectrum = await ir.last_spectrum_treated()
+    assert spectrum.wavenumber == [1000, 1500, 2000]
+    assert read.call_count == 3
+    assert read_axis.call_count == 1
+
+    # Different number of points: the probe configuration changed
+    read.return_value = data_values([0.1, 0.2])
+    read_axis.return_value = [1000, 2000]
+    assert (await ir.last_spectrum_treated()).wavenumber == [1000, 2000]
+    assert read_axis.call_count == 2
+
+
+async def test_last_scan_single_request(mocker):
+    ir = IcIR(template="template")
+    read = mocker.patch.object(ir.opcua, "read_attributes", return_value=data_values(7, None, [1.0], [2.0], [3.0]))
+    mocker.patch.object(IcIR, "_wavenumber_from_spectrum_node", return_value=[1000])
+
+    scan = await ir.last_scan()
+    assert read.call_count == 1
+    assert scan.sample_count == 7
+    assert scan.treated.intensity == [1.0]
+    assert scan.raw.intensity == [2.0]
+    assert scan.background.intensity == [3.0]
+
+
+async def test_last_scan_partially_out_of_service(mocker):
+    ir = IcIR(template="template")
+    sample_time = datetime.datetime(2024, 1, 1, 12, 0)
+    mocker.patch.object(ir.opcua, "read_attributes", return_value=data_values(7, sample_time, [1.0], None, None))
+    mocker.patch.object(IcIR, "_wavenumber_from_spectrum_node", return_value=[1000])
+
+    # Only the spectra out of service are missing
+    scan = await ir.last_scan()
+    assert scan.sample_count == 7
+    assert scan.last_sample_time == sample_time
+    assert scan.treated.intensity == [1.0]
+    assert scan.raw.intensity == []
+    assert scan.background.intensity == []
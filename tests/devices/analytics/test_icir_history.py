@@ -0,0 +1,68 @@
+"""Test the rolling history of IR spectra. Does not require a connection to iCIR."""
+import asyncio
+import datetime
+
+import numpy as np
+
+from flowchem.components.analytics.ir import IRSpectrum
+from flowchem.devices.mettlertoledo._history import SpectrumHistory
+
+
+def spectrum(value: float, wavenumber=(1000, 1500, 2000)) -> IRSpectrum:
+    return IRSpectrum(wavenumber=list(wavenumber), intensity=[value] * len(wavenumber))
+
+
+def test_ring_buffer_keeps_latest():
+    history = SpectrumHistory(capacity=3)
+    for sample in range(5):
+        history.add(sample, spectrum(sample), timestamp=1000 + sample)
+
+    assert len(history) == 3
+    everything = history.by_sample()
+    assert everything.sample == [2, 3, 4]
+    assert everything.intensity == [[2] * 3, [3] * 3, [4] * 3]
+    assert everything.wavenumber == [1000, 1500, 2000]
+
+
+def test_range_queries():
+    history = SpectrumHistory(capacity=10)
+    for sample in range(6):
+        history.add(sample, spectrum(sample), timestamp=1000 + 60 * sample)
+
+    assert history.by_sample(first=2, last=3).sample == [2, 3]
+    selection = history.by_time(
+        start=datetime.datetime.fromtimestamp(1100),
+        end=datetime.datetime.fromtimestamp(1240),
+    )
+    assert selection.sample == [2, 3, 4]
+    assert history.by_sample(first=100).intensity == []
+
+
+def test_spill_to_disk(tmp_path):
+    history = SpectrumHistory(capacity=2, spill_folder=tmp_path, spill_chunk=2)
+    for sample in range(4):
+        history.add(sample, spectrum(sample))
+
+    spilled = np.load(tmp_path / "spectra_0-1.npz")
+    assert spilled["sample"].tolist() == [0, 1]
+    assert spilled["intensity"].shape == (2, 3)
+
+    # A new wavenumber axis restarts the history, saving what is left
+    history.add(4, spectrum(4, wavenumber=(1000, 2000)))
+    assert history.by_sample().sample == [4]
+    assert (tmp_path / "spectra_2-3.npz").exists()
+
+
+async def test_spill_in_worker_thread(tmp_path, mocker):
+    history = SpectrumHistory(capacity=2, spill_folder=tmp_path, spill_chunk=2)
+    to_thread = mocker.spy(asyncio, "to_thread")
+    for sample in range(5):
+        history.add(sample, spectrum(sample))
+    # The ring is overwritten while the first chunk is being saved
+    assert to_thread.call_count == 1
+
+    await history.flush()
+    assert to_thread.call_count == 2
+    assert np.load(tmp_path / "spectra_0-1.npz")["intensity"].tolist() == [[0] * 3, [1] * 3]
+    assert np.load(tmp_path / "spectra_2-2.npz")["sample"].tolist() == [2]
+    assert history.by_sample().sample == [3, 4]
@@ -0,0 +1,58 @@
+"""Test the buffer of the spectra pushed by iCIR. Does not require a connection to iCIR."""
+import asyncio
+
+from flowchem.components.analytics.ir import IRSpectrum
+from flowchem.devices.mettlertoledo._spectrum_buffer import SpectrumBuffer
+
+
+def spectrum(value: float) -> IRSpectrum:
+    return IRSpectrum(wavenumber=[1000, 2000], intensity=[value, value])
+
+
+async def test_count_and_spectrum_in_any_order():
+    buffer = SpectrumBuffer()
+    await buffer.update_count(1)
+    assert buffer.latest() is None  # Spectrum not received yet
+    await buffer.update_treated(spectrum(1))
+    assert buffer.latest().sample_count == 1
+
+    await buffer.update_raw(spectrum(-2))
+    await buffer.update_treated(spectrum(2))
+    await buffer.update_count(2)
+    assert buffer.latest().treated == spectrum(2)
+    assert buffer.latest().raw == spectrum(-2)
+
+    # Repeated notification of the same count does not create a new entry
+    await buffer.update_count(2)
+    await buffer.update_treated(spectrum(3))
+    assert buffer.latest().treated == spectrum(2)
+
+
+async def test_next_after_waits_for_new_spectrum():
+    buffer = SpectrumBuffer()
+    await buffer.update_count(5)
+    await buffer.update_treated(spectrum(5))
+
+    # Already buffered
+    assert (await buffer.next_after(4)).sample_count == 5
+
+    waiter = asyncio.create_task(buffer.next_after(5, timeout=1))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+    await buffer.update_count(6)
+    await buffer.update_treated(spectrum(6))
+    assert (await waiter).sample_count == 6
+
+
+async def test_next_after_timeout():
+    buffer = SpectrumBuffer(size=2)
+    assert await buffer.next_after(0, timeout=0.05) is None
+
+
+async def test_listener_called_on_new_spectrum():
+    buffer = SpectrumBuffer()
+    received = []
+    buffer.add_listener(received.append)
+    await buffer.update_count(1)
+    await buffer.update_treated(spectrum(1))
+    assert [s.sample_count for s in received] == [1]
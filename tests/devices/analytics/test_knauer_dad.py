@@ -0,0 +1,65 @@
+"""Test the Knauer DAD acquisition. Does not require a connection to the device."""
+import asyncio
+import time
+
+import pytest
+
+from flowchem.devices.knauer._dad_acquisition import ChannelBuffer, parse_signal_reply
+from flowchem.utils.exceptions import DeviceError
+
+
+class FakeCommands:
+    SIGNAL = "SIG{channel}:{signal}"
+
+
+@pytest.fixture
+async def dad(mocker):
+    """A KnauerDAD connected to a fake stream, the proprietary command set being replaced by a fake one."""
+    mocker.patch("flowchem.devices.knauer.dad.HAS_DAD_COMMANDS", True)
+    mocker.patch("flowchem.devices.knauer.dad.KnauerDADCommands", FakeCommands, create=True)
+    from flowchem.devices.knauer.dad import KnauerDAD
+
+    device = KnauerDAD(ip_address="127.0.0.1", max_retries=2, reply_timeout=0.1)
+    device._reader = asyncio.StreamReader()
+    device._writer = mocker.MagicMock()
+    device._writer.drain = mocker.AsyncMock()
+    return device
+
+
+def test_parse_signal_reply():
+    assert parse_signal_reply("SIG2:113545") == (2, 11.3545)
+    assert parse_signal_reply("SIG1:113545,") == (1, 11.3545)
+    assert parse_signal_reply("SIG1:OK") is None
+    assert parse_signal_reply("LAMP_D2:1") is None
+
+
+def test_channel_buffer_history():
+    buffer = ChannelBuffer(size=3)
+    now = time.time()
+    for n in range(5):
+        buffer.add(1, n, timestamp=now - 10 * (4 - n))
+    assert buffer.history(1).signal == [2, 3, 4]
+    assert buffer.history(1, seconds=15).signal == [3, 4]
+    assert buffer.latest(1) == 4
+    assert buffer.latest(2) is None
+
+
+async def test_all_channels_read_in_one_request(dad):
+    dad._reader.feed_data(b"SIG1:10000\rSIG2:20000\rSIG3:30000\rSIG4:40000\r")
+    assert await dad.read_signals([1, 2, 3, 4]) == {1: 1, 2: 2, 3: 3, 4: 4}
+    assert dad._writer.write.call_count == 1
+    assert dad.signals.latest(3) == 3
+
+
+async def test_unexpected_replies_are_retried(dad):
+    # The reply to channel 2 is replaced by an OK: only channel 2 is requested again
+    replies = iter([b"SIG1:10000\rSIG2:OK\r", b"SIG2:20000\r"])
+    dad._writer.write.side_effect = lambda _: dad._reader.feed_data(next(replies))
+    assert await dad.read_signals([1, 2]) == {1: 1, 2: 2}
+    assert dad._writer.write.call_args.args[0].startswith(b"SIG2:?")
+
+
+async def test_retries_are_bounded(dad):
+    with pytest.raises(DeviceError):
+        await dad.read_signal(1)
+    assert dad._writer.write.call_count == 3
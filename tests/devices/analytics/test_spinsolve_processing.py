@@ -0,0 +1,60 @@
+"""Test the processing of Spinsolve FIDs. Does not require a connection to Spinsolve."""
+import io
+
+import numpy as np
+import pytest
+
+from flowchem.devices.magritek._processing import (
+    ProcessingParameters,
+    load_spectrum,
+    process_fid,
+)
+
+
+def write_result_folder(folder, fid, dwell_time_ms, b1_freq=43.0, lowest_frequency=-2500, bandwidth_khz=5):
+    """Write a result folder as saved by Spinsolve, with `data.1d` and `acqu.par`."""
+    header = np.zeros(8, dtype="<i4")
+    header[4] = fid.size  # x dimension
+    time_axis = (np.arange(fid.size) * dwell_time_ms).astype("<f4")
+    with open(folder / "data.1d", "wb") as f:
+        f.write(header.tobytes() + time_axis.tobytes() + fid.astype("<c8").tobytes())
+    (folder / "acqu.par").write_text(
+        f"b1Freq = {b1_freq}\n"
+        f"bandwidth = {bandwidth_khz}\n"
+        f"dwellTime = {dwell_time_ms}\n"
+        f"lowestFrequency = {lowest_frequency}\n"
+        'Sample = "test"\n'
+    )
+
+
+def test_peak_position(tmp_path):
+    dwell_time = 0.2e-3
+    offset = 500  # Hz from the carrier, i.e. (-2500 + 2500 + 500) / 43 ppm
+    t = np.arange(4096) * dwell_time
+    fid = np.exp(2j * np.pi * offset * t) * np.exp(-t / 0.1) * np.exp(1j * 0.7)
+    write_result_folder(tmp_path, fid, dwell_time * 1000)
+
+    processed = load_spectrum(tmp_path, ProcessingParameters(zero_filling=2))
+
+    assert processed.axis_unit == "ppm"
+    assert processed.spectrum.size == 8192
+    assert processed.axis[0] > processed.axis[-1]  # decreasing ppm
+    peak = np.argmax(processed.spectrum.real)
+    assert processed.axis[peak] == pytest.approx(500 / 43, abs=0.01)
+    # The automatic zero-order phase removes the phase of the first point: the peak is absorptive
+    assert abs(processed.spectrum[peak].imag) < 0.1 * processed.spectrum[peak].real
+
+
+def test_serialization(tmp_path):
+    write_result_folder(tmp_path, np.ones(128, dtype=complex), 0.2)
+    processed = load_spectrum(tmp_path, ProcessingParameters())
+
+    array = np.load(io.BytesIO(processed.to_bytes()))
+    assert array.shape == (3, 256)
+
+
+def test_manual_phase():
+    fid = np.ones(64, dtype=complex)
+    spectrum = process_fid(fid, 1e-3, ProcessingParameters(line_broadening=0, phase0=90))
+    assert spectrum.size == 128
+    assert spectrum[64].imag == pytest.approx(64)  # zero frequency, after fftshift
@@ -0,0 +1,146 @@
+"""Test the Spinsolve protocol queue. Does not require a connection to Spinsolve."""
+import asyncio
+
+import pytest
+from lxml import etree
+
+from flowchem.devices.magritek.spinsolve import ProtocolRequest, Spinsolve
+
+
+def notification(child: str) -> etree._Element:
+    return etree.fromstring(f"<Message><StatusNotification>{child}</StatusNotification></Message>")
+
+
+def fake_spectrometer(mocker, nmr: Spinsolve, sent: list):
+    """Reply to each protocol started with the notifications of a completed acquisition."""
+
+    async def send_message(root: etree._Element):
+        sent.append(root)
+        if root.find(".//Start") is not None:
+            nmr._notifications.put_nowait(notification('<State status="Running" />'))
+            nmr._notifications.put_nowait(
+                notification(f'<State status="Ready" dataFolder="/data/{len(sent)}" />')
+            )
+
+    mocker.patch.object(nmr, "send_message", side_effect=send_message)
+
+
+async def test_queue_runs_protocols_back_to_back(mocker):
+    nmr = Spinsolve(xml_schema=False, ingestion_timeout=0.1)
+    nmr.protocols = {"1D PROTON": {}}
+    sent: list = []
+    fake_spectrometer(mocker, nmr, sent)
+
+    with pytest.warns(UserWarning, match="not available"):
+        positions = await nmr.queue_protocols([
+            ProtocolRequest(protocol="1D PROTON", sample_name="first"),
+            ProtocolRequest(protocol="1D PLUTONIUM"),
+            ProtocolRequest(protocol="1d proton", sample_name="second"),
+        ])
+    assert positions == [0, -1, 1]
+    await nmr._queue_worker
+
+    queue = await nmr.get_queue()
+    assert [entry.status for entry in queue] == ["completed", "completed"]
+    assert [entry.result_id for entry in queue] == [0, 1]
+    assert len(nmr._result_folders) == 2
+    # Sample name set before each protocol
+    assert [root.find(".//Sample").text for root in sent if root.find(".//Sample") is not None] == ["first", "second"]
+    assert not await nmr.is_protocol_running()
+
+
+async def test_cancel_queue(mocker):
+    nmr = Spinsolve(xml_schema=False, ingestion_timeout=0.1)
+    nmr.protocols = {"1D PROTON": {}}
+    # The spectrometer never completes the protocol
+    send_message = mocker.patch.object(nmr, "send_message")
+
+    await nmr.queue_protocols([ProtocolRequest(protocol="1D PROTON")] * 3)
+    await asyncio.sleep(0.1)
+    assert await nmr.is_protocol_running()
+
+    assert await nmr.cancel_queue() == 3
+    # Abort notifications end the running protocol
+    nmr._notifications.put_nowait(notification('<State status="Ready" dataFolder="/data/aborted" />'))
+    await nmr._queue_worker
+
+    assert [entry.status for entry in await nmr.get_queue()] == ["cancelled"] * 3
+    assert send_message.call_args.args[0].find(".//Abort") is not None
+
+
+async def test_failed_entry_does_not_stop_queue(mocker):
+    nmr = Spinsolve(xml_schema=False, ingestion_timeout=0.1)
+    nmr.protocols = {"1D PROTON": {}}
+    sent: list = []
+    fake_spectrometer(mocker, nmr, sent)
+    reply = nmr.send_message.side_effect
+
+    async def disconnect_once(root: etree._Element):
+        if not sent:
+            sent.append(root)
+            raise ConnectionError("Spinsolve disconnected")
+        await reply(root)
+
+    nmr.send_message.side_effect = disconnect_once
+
+    await nmr.queue_protocols([ProtocolRequest(protocol="1D PROTON", sample_name="lost"),
+                               ProtocolRequest(protocol="1D PROTON")])
+    await nmr._queue_worker
+
+    assert [entry.status for entry in await nmr.get_queue()] == ["failed", "completed"]
+    assert not await nmr.is_protocol_running()
+
+
+async def test_next_protocol_after_data_saved(mocker, tmp_path):
+    nmr = Spinsolve(xml_schema=False, ingestion_timeout=2)
+    nmr.protocols = {"1D PROTON": {}}
+    saved_at_start = []
+
+    async def save_fid(folder):
+        await asyncio.sleep(0.2)
+        folder.mkdir()
+        (folder / "data.1d").write_bytes(b"")
+
+    async def send_message(root: etree._Element):
+        if root.find(".//Start") is not None:
+            saved_at_start.append([(folder / "data.1d").exists() for folder in nmr._result_folders])
+            folder = tmp_path / str(len(saved_at_start))
+            # FINISHING is notified before the data are saved
+            asyncio.create_task(save_fid(folder))
+            nmr._notifications.put_nowait(notification(f'<State status="Ready" dataFolder="{folder}" />'))
+
+    mocker.patch.object(nmr, "send_message", side_effect=send_message)
+    mocker.patch("flowchem.devices.magritek.spinsolve.load_spectrum", side_effect=ValueError("Empty FID"))
+
+    await nmr.queue_protocols([ProtocolRequest(protocol="1D PROTON")] * 2)
+    await nmr._queue_worker
+    assert saved_at_start == [[], [True]]
+
+
+async def test_remote_folder_not_waited_for(mocker):
+    nmr = Spinsolve(xml_schema=False, ingestion_timeout=60)
+    nmr.protocols = {"1D PROTON": {}}
+    fake_spectrometer(mocker, nmr, [])
+
+    await nmr.queue_protocols([ProtocolRequest(protocol="1D PROTON")] * 2)
+    # The result folders (/data/...) are not reachable from here, so their FIDs are not waited for
+    await asyncio.wait_for(nmr._queue_worker, timeout=5)
+    assert [entry.status for entry in await nmr.get_queue()] == ["completed", "completed"]
+
+
+async def test_cancelled_while_waiting_not_started(mocker):
+    nmr = Spinsolve(xml_schema=False)
+    nmr.protocols = {"1D PROTON": {}}
+    sent: list = []
+    fake_spectrometer(mocker, nmr, sent)
+    # A protocol started outside the queue is still running
+    nmr._protocol_running = True
+
+    await nmr.queue_protocols([ProtocolRequest(protocol="1D PROTON", sample_name="never")])
+    await asyncio.sleep(0.1)
+    assert await nmr.cancel_queue() == 1
+    nmr._protocol_running = False
+    await nmr._queue_worker
+
+    assert [entry.status for entry in await nmr.get_queue()] == ["cancelled"]
+    assert all(root.find(".//Start") is None for root in sent)
@@ -0,0 +1,59 @@
+"""Test the matching of Spinsolve replies to their requests. Does not require a connection to Spinsolve."""
+import asyncio
+
+import pytest
+from lxml import etree
+
+from flowchem.devices.magritek._correlator import ReplyCorrelator
+from flowchem.devices.magritek._parser import MessageStreamParser
+
+
+def get_response(tag: str, text: str) -> etree._Element:
+    return etree.fromstring(f"<Message><GetResponse><{tag}>{text}</{tag}></GetResponse></Message>")
+
+
+async def test_concurrent_requests_get_their_own_reply():
+    correlator = ReplyCorrelator()
+    solvent = correlator.expect("GetResponse", "Solvent")
+    sample = correlator.expect("GetResponse", "Sample")
+
+    # Replies arriving in a different order than the requests
+    assert correlator.resolve(get_response("Sample", "my-sample"))
+    assert correlator.resolve(get_response("Solvent", "DMSO"))
+
+    assert (await sample).find(".//Sample").text == "my-sample"
+    assert (await solvent).find(".//Solvent").text == "DMSO"
+
+
+async def test_late_reply_is_dropped():
+    correlator = ReplyCorrelator()
+    solvent = correlator.expect("GetResponse", "Solvent")
+    try:
+        await asyncio.wait_for(solvent, 0.01)
+    except asyncio.TimeoutError:
+        correlator.discard(solvent)
+
+    # The reply to the timed out request must not be returned to the next one
+    assert not correlator.resolve(get_response("Solvent", "late"))
+    assert correlator.orphaned_replies == 1
+    new_request = correlator.expect("GetResponse", "Solvent")
+    assert correlator.resolve(get_response("Solvent", "DMSO"))
+    assert (await new_request).find(".//Solvent").text == "DMSO"
+
+
+def test_stream_parser_split_messages_and_resync():
+    message = (
+        b"<?xml version='1.0' encoding='utf-8'?>\r\n"
+        b"<Message><GetResponse><Solvent>DMSO</Solvent></GetResponse></Message>\r\n"
+    )
+    invalid = b"<?xml version='1.0'?><Message><Get<<Response></Message>"
+    stream = message + invalid + message * 2
+
+    parser = MessageStreamParser()
+    parsed = []
+    with pytest.warns(UserWarning, match="Cannot parse"):
+        for start in range(0, len(stream), 7):  # Chunks do not match message boundaries
+            parsed.extend(parser.feed(stream[start:start + 7]))
+
+    assert len(parsed) == 3
+    assert all(tree.find(".//Solvent").text == "DMSO" for _, tree in parsed)
@@ -0,0 +1,62 @@
+"""Test the background mzML conversion of the Waters MS, with a fake msconvert. Does not require the MS."""
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+from flowchem.devices.waters import WatersMS
+
+FAKE_MSCONVERT = f"""#!{sys.executable}
+import sys, time
+from pathlib import Path
+raw, output = Path(sys.argv[1]), Path(sys.argv[3])
+time.sleep(0.2)
+if not (raw / "_FUNC001.DAT").exists():
+    sys.exit("Invalid raw data")
+(output / (raw.stem + ".mzML")).write_text("<mzML/>")
+"""
+
+
+@pytest.fixture
+def ms(tmp_path):
+    (tmp_path / "queue").mkdir()
+    (tmp_path / "data").mkdir()
+    (tmp_path / "pwiz").mkdir()
+    msconvert = tmp_path / "pwiz" / "msconvert.exe"
+    msconvert.write_text(FAKE_MSCONVERT)
+    msconvert.chmod(msconvert.stat().st_mode | stat.S_IEXEC)
+    device = WatersMS(
+        path_to_AutoLynxQ=str(tmp_path / "queue"),
+        raw_data_dir=str(tmp_path / "data"),
+        msconvert_dir=str(tmp_path / "pwiz"),
+        settle_time=0.1,
+    )
+    device.conversions.watch_interval = 0.05
+    return device
+
+
+def acquire(folder, valid=True):
+    folder.mkdir()
+    (folder / ("_FUNC001.DAT" if valid else "_HEADER.TXT")).write_bytes(b"0" * 100)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="The fake msconvert relies on the shebang line")
+async def test_conversions_in_background(ms, tmp_path):
+    output = tmp_path / "mzml"
+    for sample in ("s1", "s2", "bad"):
+        await ms.record_mass_spec(sample, run_duration=0, do_conversion=True, output_dir=str(output))
+    assert (tmp_path / "queue" / "next.txt").read_text().startswith("FILE_NAME\t")
+    assert (await ms.get_conversion("s1")).state == "acquiring"
+
+    acquire(tmp_path / "data" / "s1.raw")
+    acquire(tmp_path / "data" / "s2.raw")
+    acquire(tmp_path / "data" / "bad.raw", valid=False)
+    jobs = await asyncio.gather(*(ms.wait_for_conversion(sample, timeout=5) for sample in ("s1", "s2", "bad")))
+
+    assert [job.state for job in jobs] == ["done", "done", "failed"]
+    assert (output / "s1.mzML").read_text() == "<mzML/>"
+    assert jobs[0].mzml_path == str(output / "s1.mzML")
+    assert "Invalid raw data" in jobs[2].error
+    assert await ms.get_conversion("unknown") is None
@@ -1,3 +1,59 @@
+"""Test ML600 object. Does not require physical connection to the device."""
+from unittest.mock import AsyncMock
+
+import aioserial
+import pytest
+
+from flowchem import ureg
+from flowchem.devices.hamilton.ml600 import (
+    PUMP_ADDRESS,
+    ML600,
+    HamiltonPumpIO,
+    Protocol1Command,
+    Protocol1CommandBatch,
+)
+from flowchem.devices.hamilton.ml600_pump import ML600Pump
+
+
+class FakeSerial(aioserial.AioSerial):
+    """Mock AioSerial, acknowledging any command unless a reply is set in `replies`."""
+
+    # noinspection PyMissingConstructor
+    def __init__(self) -> None:
+        self._port = "FakeSerial"
+        self.commands: list[bytes] = []
+        self.replies: dict[bytes, list[bytes]] = {}
+        self._last_command = b""
+
+    def reset_input_buffer(self):
+        pass
+
+    async def write_async(self, text: bytes):
+        """Override AioSerial method."""
+        self.commands.append(text)
+        self._last_command = text
+
+    async def readline_async(self, size: int = -1) -> bytes:
+        """Override AioSerial method. Replies set for a command are consumed in order, the last one is kept."""
+        replies = self.replies.get(self._last_command)
+        if replies:
+            return replies.pop(0) if len(replies) > 1 else replies[0]
+        return b"\x06\r"
+
+    def __repr__(self) -> str:
+        return "FakeSerial"
+
+
+@pytest.fixture
+def ml600() -> ML600:
+    """Single syringe ML600 connected to FakeSerial."""
+    pump_io = HamiltonPumpIO(FakeSerial())
+    pump_io.num_pump_connected = 1
+    device = ML600(pump_io, syringe_volume="1 ml", name="ml600-test")
+    device.components.append(ML600Pump("pump", device))
+    return device
+
+
 def test_infuse():
     ...
     # test without parameters
@@ -19,3 +75,128 @@ def test_withdraw():
     # test with only volume
     # test with both
     # test with too large volume
+
+
+def test_batch_compile():
+    batch = Protocol1CommandBatch(target_pump_num=2)
+    batch.add(Protocol1Command(command="LA0", command_value="90", target_component="C"))
+    batch.add(Protocol1Command(command="M", command_value="19200", optional_parameter="S", parameter_value="60",
+                               target_component="C"))
+    assert batch.compile() == "bCLA090CM19200S60R"
+    with pytest.raises(ValueError):
+        batch.add(Protocol1Command(command="YQP", execution_command=""))
+    with pytest.raises(ValueError):
+        Protocol1CommandBatch().compile()
+
+
+async def test_infuse_single_transmission(ml600):
+    pump = ml600.components[0]
+    serial = ml600.pump_io._serial
+    ml600.motion_model(pump.pump_code).correct(is_pumping=False)
+    serial.replies[b"aYQPR\r"] = [b"\x0624000\r"]
+    assert await pump.infuse(rate="1 ml/min", volume="0.1 ml", valve_angle=90) is True
+    # The syringe position is read back (0.5 ml), then valve, speed and move (0.4 ml = 19200 steps) go together
+    assert serial.commands == [b"aYQPR\r", b"aLA090M19200S60R\r"]
+    assert ml600.motion_model(pump.pump_code).state().is_pumping
+
+
+async def test_batch_not_acknowledged(ml600):
+    serial = ml600.pump_io._serial
+    serial.replies[b"aLA090M19200S60R\r"] = [b"\x15\r"]
+    with pytest.warns(UserWarning):
+        acknowledged = await ml600.set_to_volume(ureg.Quantity("0.4 ml"), ureg.Quantity("1 ml/min"), "",
+                                                 ureg.Quantity("0.5 ml"), valve_angle=90)
+    assert acknowledged is False
+    assert not ml600.motion_model("").is_pumping()
+
+
+async def test_wait_until_ready(ml600):
+    serial = ml600.pump_io._serial
+    # Garbled and busy replies while homing, then done
+    serial.replies[b"aF\r"] = [b"\xff\r", b"\x06N\r", b"\x06Y\r"]
+    assert await ml600.pump_io.wait_until_ready(timeout=5) is True
+    assert serial.commands == [b"aF\r"] * 3
+
+    serial.replies[b"aF\r"] = [b"\x06N\r"]
+    assert await ml600.pump_io.wait_until_ready(timeout=0.3) is False
+
+
+@pytest.mark.parametrize("hw_initialization", [True, False])
+async def test_initialize_waits_for_homing(hw_initialization):
+    serial = FakeSerial()
+    serial.replies = {b"1a\r": [b"1\r"], b"aUR\r": [b"NV01\r"], b"aF\r": [b"\x06Y\r"]}
+    pump_io = HamiltonPumpIO(serial)
+    await pump_io.initialize(hw_initialization=hw_initialization)
+    assert pump_io.num_pump_connected == 1
+    # The pumps are only polled until done homing if the homing was requested
+    assert (b":XR\r" in serial.commands) is hw_initialization
+    assert (b"aF\r" in serial.commands) is hw_initialization
+
+
+@pytest.fixture
+def ml600_chain() -> list[ML600]:
+    """Two single syringe ML600 daisy-chained on the same FakeSerial, with 0.5 ml in each syringe."""
+    pump_io = HamiltonPumpIO(FakeSerial())
+    pump_io.num_pump_connected = 2
+    devices = []
+    for address in (1, 2):
+        device = ML600(pump_io, syringe_volume="1 ml", address=address, name=f"ml600-{address}")
+        device.components.append(ML600Pump("pump", device))
+        device.motion_model("").correct(is_pumping=False)
+        pump_io._serial.replies[f"{PUMP_ADDRESS[address]}YQPR\r".encode()] = [b"\x0624000\r"]
+        devices.append(device)
+    return devices
+
+
+async def test_broadcast_execute(ml600):
+    await ml600.pump_io.broadcast_execute()
+    assert ml600.pump_io._serial.commands == [b":R\r"]
+
+
+async def test_execute_loaded_moves(ml600_chain):
+    first, second = ml600_chain
+    assert await first.components[0].load_infuse(rate="1 ml/min", volume="0.1 ml") is True
+    assert await second.components[0].load_withdraw(rate="1 ml/min", volume="0.2 ml") is True
+    # Loaded moves are not executed, nor predicted, until started
+    assert not first.motion_model("").is_pumping()
+
+    await first.execute_loaded_moves()
+    assert first.pump_io._serial.commands == [b"aYQPR\r", b"aM19200S60\r", b"bYQPR\r", b"bM33600S60\r", b":R\r"]
+    assert first.motion_model("").is_pumping()
+    assert second.motion_model("").state().is_pumping
+    assert not first._loaded_moves and not second._loaded_moves
+
+
+async def test_load_stops_running_pump(ml600):
+    pump = ml600.components[0]
+    model = ml600.motion_model(pump.pump_code)
+    model.start(rate=1, volume=0.5, withdrawing=False, syringe_volume=0.6)
+
+    async def stop() -> bool:
+        model.stop()
+        return True
+
+    pump.stop = AsyncMock(side_effect=stop)
+    ml600.pump_io._serial.replies[b"aYQPR\r"] = [b"\x0624000\r"]
+    assert await pump.load_infuse(rate="1 ml/min", volume="0.1 ml") is True
+    pump.stop.assert_awaited_once()
+    # Where the syringe stopped is read back (0.5 ml), then the absolute move is loaded, not executed
+    assert ml600.pump_io._serial.commands == [b"aYQPR\r", b"aM19200S60\r"]
+
+
+async def test_loaded_moves_routes(ml600_chain):
+    first, second = ml600_chain
+    pump = first.components[0]
+    routes = {route.path: route for route in pump.router.routes}
+    for path, method in (("load-infuse", pump.load_infuse), ("load-withdraw", pump.load_withdraw),
+                         ("start-loaded", pump.start_loaded)):
+        route = routes[f"/ml600-1/pump/{path}"]
+        assert route.methods == {"PUT"}
+        assert route.endpoint == method
+
+    await routes["/ml600-1/pump/load-infuse"].endpoint(rate="1 ml/min", volume="0.1 ml")
+    await second.components[0].load_infuse(rate="1 ml/min", volume="0.1 ml")
+    assert await routes["/ml600-1/pump/start-loaded"].endpoint() is True
+    # A single broadcast starts the pumps of the whole chain
+    assert first.pump_io._serial.commands[-1] == b":R\r"
+    assert first.motion_model("").is_pumping() and second.motion_model("").is_pumping()
@@ -0,0 +1,75 @@
+"""Test the dead-reckoning pump motion model. Does not require any device."""
+import pytest
+
+from flowchem.components.pumps.motion_model import PumpMotionModel
+
+
+def test_syringe_move_prediction(mocker):
+    clock = mocker.patch("flowchem.components.pumps.motion_model.time.monotonic", return_value=100.0)
+    model = PumpMotionModel(max_age=100)
+    model.start(rate=1.0, volume=2.0, syringe_volume=5.0)  # 2 ml at 1 ml/min
+
+    clock.return_value = 160.0
+    assert model.is_pumping()
+    assert model.syringe_volume() == 4.0
+    assert model.remaining_time() == 60.0
+    assert not model.is_stale()
+
+    clock.return_value = 300.0
+    assert not model.is_pumping()
+    assert model.syringe_volume() == 3.0
+
+
+def test_readback_correction(mocker):
+    clock = mocker.patch("flowchem.components.pumps.motion_model.time.monotonic", return_value=0.0)
+    model = PumpMotionModel(max_age=10)
+    model.start(rate=1.0, volume=2.0, withdrawing=True, syringe_volume=0.0)
+
+    clock.return_value = 20.0
+    assert model.is_stale()  # No readback for longer than max_age
+    model.correct(syringe_volume=0.5)  # Slower than expected
+    assert not model.is_stale()
+    assert model.remaining_time() == 90.0
+
+    # Idle before the predicted end: the move ended at its target, not where the elapsed time puts it
+    model.correct(is_pumping=False)
+    assert not model.is_pumping()
+    assert model.syringe_volume() == 2.0
+
+
+def test_stop_invalidates_content(mocker):
+    clock = mocker.patch("flowchem.components.pumps.motion_model.time.monotonic", return_value=0.0)
+    model = PumpMotionModel()
+    model.start(rate=1.0, volume=2.0, syringe_volume=5.0)
+    clock.return_value = 30.0
+    model.stop()
+    assert not model.is_pumping()
+    assert model.is_stale()
+    assert model.syringe_volume() is None
+
+    model.stop(syringe_volume=4.6)
+    assert not model.is_stale()
+    assert model.syringe_volume() == 4.6
+
+
+def test_unknown_movement_is_stale():
+    model = PumpMotionModel()
+    assert model.is_stale()
+    model.correct(is_pumping=False)
+    assert not model.is_stale()
+    model.correct(is_pumping=True)
+    assert model.is_stale()
+    assert model.state().age is None
+
+
+async def test_elite11_move_from_volume_counter(mocker):
+    from flowchem.devices.harvardapparatus.elite11 import Elite11
+
+    pump = Elite11(mocker.MagicMock(), syringe_diameter="10 mm", syringe_volume="5 ml")
+    replies = {"irun": "", "ivolume": "1.5 ml"}
+    mocker.patch.object(pump, "_send_command_and_read_reply", side_effect=lambda command, **kwargs: replies[command])
+    pump._infuse_rate = 1.0
+    pump._target_volume = 2.0
+    # The counter is not cleared between runs: only the volume left to the target is infused
+    await pump.infuse()
+    assert pump.motion_model.remaining_time() == pytest.approx(30.0, abs=0.1)
@@ -0,0 +1,67 @@
+"""Test the shared Bronkhorst FLOW-BUS master. Does not require a connection to the devices."""
+import asyncio
+
+import propar
+import pytest
+
+
+class FakeMaster:
+    """A propar master replying to chained reads with values derived from the node address."""
+
+    response_timeout = 0.5
+
+    def __init__(self, *args) -> None:
+        self.db = propar.database()
+        self.requests = []
+        self.setpoints = {}
+
+    def read_parameters(self, parameters, callback=None):
+        node = parameters[0]["node"]
+        self.requests.append((node, [parameter["dde_nr"] for parameter in parameters]))
+        values = {1: f"ID{node}", 8: node * 1000, 9: self.setpoints.get(node, 0), 205: node * 0.5}
+        reply = [{"data": values[parameter["dde_nr"]]} for parameter in parameters]
+        if callback is None:
+            return reply
+        callback(reply)
+        return None
+
+    def write_parameters(self, parameters, command=None, callback=None):
+        self.setpoints[parameters[0]["node"]] = parameters[0]["data"]
+        return propar.PP_STATUS_OK
+
+
+@pytest.fixture
+def master(mocker):
+    """Replace the propar master with FakeMaster."""
+    from flowchem.devices.bronkhorst._propar_bus import ProparBus
+
+    mocker.patch.dict(ProparBus._buses, clear=True)
+    mocker.patch("flowchem.devices.bronkhorst._propar_bus.propar.master", FakeMaster)
+
+
+async def test_bank_polled_in_one_cycle(master):
+    from flowchem.devices.bronkhorst import MFC
+
+    bank = [MFC("COM7", address=address, max_flow=10) for address in range(1, 7)]
+    bus = bank[0].bus
+    assert all(mfc.bus is bus for mfc in bank)
+    assert bank[2].id == "ID3"
+    bus.master.requests.clear()
+
+    flows = await asyncio.gather(*(mfc.get_flow_setpoint() for mfc in bank))
+    assert flows == pytest.approx([address * 1000 / 32000 * 10 for address in range(1, 7)])
+    # One chained request (measure, setpoint, fmeasure) per instrument
+    assert len(bus.master.requests) == 6
+    assert all(dde_numbers == [8, 9, 205] for _, dde_numbers in bus.master.requests)
+
+    # Cached
+    await bank[0].get_flow_percentage()
+    assert len(bus.master.requests) == 6
+
+
+async def test_setpoint_invalidates_cache(master):
+    from flowchem.devices.bronkhorst import EPC
+
+    epc = EPC("COM8", address=2, max_pressure=10)
+    await epc.set_pressure("5 bar")
+    assert (await epc.bus.reading(2, 1)).setpoint == 16000
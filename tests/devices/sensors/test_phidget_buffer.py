@@ -0,0 +1,49 @@
+"""Test the buffers fed by the Phidget change handlers. Does not require Phidget22 nor a device."""
+import threading
+import time
+
+import pytest
+
+from flowchem.devices.phidgets._sample_buffer import EdgeDetector, SampleBuffer
+
+
+def test_latest_and_average():
+    buffer = SampleBuffer(size=100)
+    assert buffer.latest() is None
+    assert buffer.average(1) is None
+
+    now = time.time()
+    for n in range(10):
+        buffer.add(float(n), now - 9 + n)  # One sample per second
+    assert buffer.latest() == 9
+    assert buffer.average(2.5) == pytest.approx(8)  # 7, 8 and 9
+    assert buffer.latest(max_age=0.5) == 9
+
+    buffer.add(10.0, now - 5)
+    assert buffer.latest(max_age=1) is None
+
+
+def test_bounded_and_thread_fed():
+    buffer = SampleBuffer(size=1000)
+
+    def feed():
+        for n in range(5000):
+            buffer.add(float(n))
+
+    threads = [threading.Thread(target=feed) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        buffer.average(1)
+    assert len(buffer) == 1000
+
+
+def test_edges_with_hysteresis():
+    detector = EdgeDetector(threshold=50, hysteresis=5)
+    # Noise around the threshold does not trigger any edge
+    for timestamp, value in enumerate([80, 52, 48, 53, 20, 47, 54, 90, 30]):
+        detector.add(value, float(timestamp))
+
+    edges = detector.edges()
+    assert [(edge.timestamp, edge.direction) for edge in edges] == [(4, "falling"), (7, "rising"), (8, "falling")]
+    assert [edge.timestamp for edge in detector.edges(since=5)] == [7, 8]
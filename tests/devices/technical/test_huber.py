@@ -114,6 +114,27 @@ async def test_no_reply(chiller, caplog):
     assert reply == ""
 
 
+async def test_rate_limit(chiller):
+    throttled = chiller.rate_limiter.stats.throttled
+    await asyncio.sleep(1 / chiller.RATE_LIMIT["rate"] * chiller.RATE_LIMIT["burst"])
+    # The burst goes through at once, the next command waits for the bucket to refill
+    for _ in range(chiller.RATE_LIMIT["burst"]):
+        await chiller._send_command_and_read_reply("{M00****")
+    assert chiller.rate_limiter.stats.throttled == throttled
+    await chiller._send_command_and_read_reply("{M00****")
+    assert chiller.rate_limiter.stats.throttled == throttled + 1
+
+
+async def test_rate_limit_stats_route(chiller):
+    from flowchem.components.technical.temperature import TempRange
+    from flowchem.devices.huber.huber_temperature_control import HuberTemperatureControl
+
+    component = HuberTemperatureControl("temperature-control", chiller, TempRange())
+    assert any(route.path.endswith("/rate-limit-stats") for route in component.router.routes)
+    stats = await component.get_rate_limit_stats()
+    assert stats is chiller.rate_limiter.stats
+
+
 # async def test_status(chiller):
 #     chiller._serial.fixed_reply = None
 #     stat = await chiller.status()
@@ -0,0 +1,127 @@
+"""Test the Vapourtec R2 snapshot cache. Does not require a connection to the device."""
+import asyncio
+
+import pytest
+
+from flowchem.devices.vapourtec.r2 import (
+    parse_flow_history,
+    parse_pressure_history,
+    parse_temperature_history,
+)
+
+
+class FakeCommands:
+    GET_STATUS = "STATUS"
+    HISTORY_TEMPERATURE = "HIST_T"
+    HISTORY_PRESSURE = "HIST_P"
+    HISTORY_FLOW = "HIST_F"
+    KEY_PRESS = "KEY {keycode}"
+
+
+REPLIES = {
+    "STATUS": "1 1000 2000 0 0 20000 5 25 30 35 40 0 0 0 0 0",
+    "HIST_T": "100,0,251,0,302,1,353,1,404",
+    "HIST_P": "45853,94,193,142&45852,90,190,140",
+    "HIST_F": "45853,1000,2000",
+}
+
+
+@pytest.fixture
+async def r2(mocker):
+    """An R2 whose serial replies come from REPLIES, the proprietary command set being replaced by a fake one."""
+    mocker.patch("flowchem.devices.vapourtec.r2.HAS_VAPOURTEC_COMMANDS", True)
+    mocker.patch("flowchem.devices.vapourtec.r2.VapourtecR2Commands", FakeCommands, create=True)
+    mocker.patch("flowchem.devices.vapourtec.r2.aioserial.AioSerial")
+    from flowchem.devices.vapourtec.r2 import R2
+
+    device = R2(port="COM1", snapshot_max_age=10)
+    device.sent = []
+
+    async def write(command: str):
+        device.sent.append(command)
+
+    async def read_reply() -> str:
+        await asyncio.sleep(0.01)
+        return REPLIES.get(device.sent[-1], "OK")
+
+    device._write = write
+    device._read_reply = read_reply
+    return device
+
+
+def test_parse_history():
+    assert parse_temperature_history(REPLIES["HIST_T"]) == [25.1, 30.2, 35.3, 40.4]
+    assert parse_pressure_history(REPLIES["HIST_P"]) == (1930, 1420, 940)
+    assert parse_flow_history(REPLIES["HIST_F"]) == {"A": 1000, "B": 2000}
+
+
+async def test_snapshot_shared_by_all_readings(r2):
+    readings = await asyncio.gather(
+        *(r2.get_current_temperature(channel) for channel in range(4)),
+        *(r2.get_current_pressure(pump) for pump in range(3)),
+        r2.get_current_flow("A"),
+    )
+    assert readings[:4] == [25.1, 30.2, 35.3, 40.4]
+    assert readings[6].m_as("mbar") == 940
+    assert readings[7] == 1000
+    # Each history stream read once, the status is not needed
+    assert sorted(r2.sent) == ["HIST_F", "HIST_P", "HIST_T"]
+
+
+async def test_snapshot_reuses_readings(r2):
+    assert await r2.get_current_temperature(0) == 25.1
+    assert r2.sent == ["HIST_T"]
+    snapshot = await r2.snapshot()
+    assert snapshot.flows == {"A": 1000, "B": 2000}
+    assert sorted(r2.sent) == ["HIST_F", "HIST_P", "HIST_T", "STATUS"]
+
+
+async def test_repeated_refresh(r2):
+    assert r2.repeated_task() is None
+    r2.snapshot_interval = 5
+    seconds_every, refresh = r2.repeated_task()
+    assert seconds_every == 5
+    await refresh()
+    await r2.get_current_temperature(0)
+    # Readings served from the refresh
+    assert sorted(r2.sent) == ["HIST_F", "HIST_P", "HIST_T", "STATUS"]
+
+
+async def test_settings_change_invalidates_snapshot(r2):
+    await r2.get_current_flow("A")
+    await r2.trigger_key_press("1")
+    await r2.get_current_flow("A")
+    assert r2.sent.count("HIST_F") == 2
+
+
+async def test_valve_positions_share_status(r2):
+    positions = await asyncio.gather(*(r2.get_valve_position(valve) for valve in range(5)))
+    assert len(positions) == 5
+    await r2.get_state()
+    assert r2.sent == ["STATUS"]
+
+
+async def test_query_acknowledged_with_ok_is_bounded(r2, mocker):
+    from flowchem.utils.exceptions import DeviceError
+
+    mocker.patch.dict(REPLIES, {"STATUS": "OK"})
+    with pytest.raises(DeviceError):
+        await r2.get_status()
+    assert r2.sent == ["STATUS"] * 3
+    assert r2.retry_stats["R2 STATUS"].retries == 2
+
+
+async def test_retry_stats_per_command(r2, mocker):
+    from flowchem.devices.vapourtec.r2_components_control import R2GeneralSensor
+    from flowchem.utils.exceptions import InvalidConfigurationError
+    from flowchem.utils.retry import RetryPolicy
+
+    mocker.patch.dict(REPLIES, {"KEY 1": "", "KEY 2": ""})
+    mocker.patch.object(r2, "REPLY_RETRY", RetryPolicy(max_attempts=2, initial_delay=0.01, retry_on=()))
+    for keycode in ("1", "2"):
+        with pytest.raises(InvalidConfigurationError):
+            await r2.trigger_key_press(keycode)
+    # Both key presses are counted as the same command
+    stats = await R2GeneralSensor("GSensor2", r2).get_retry_stats()
+    assert stats.operations["R2 KEY (no reply)"].calls == 2
+    assert stats.operations["R2 KEY (no reply)"].failures == 2
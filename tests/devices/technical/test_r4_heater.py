@@ -0,0 +1,71 @@
+"""Test the Vapourtec R4 status snapshot. Does not require a connection to the device."""
+import asyncio
+
+import pytest
+
+
+class FakeCommands:
+    VERSION = "V"
+    GET_STATUS = "STATUS{channel}"
+    SET_TEMPERATURE = "SET{channel} {temperature_in_C}"
+    POWER_ON = "ON{channel}"
+    POWER_OFF = "OFF{channel}"
+
+
+@pytest.fixture
+async def r4(mocker):
+    """An R4 whose channels report the states in `device.states`, the proprietary command set being faked."""
+    mocker.patch("flowchem.devices.vapourtec.r4_heater.HAS_VAPOURTEC_COMMANDS", True)
+    mocker.patch("flowchem.devices.vapourtec.r4_heater.VapourtecR4Commands", FakeCommands, create=True)
+    mocker.patch("flowchem.devices.vapourtec.r4_heater.aioserial.AioSerial")
+    from flowchem.devices.vapourtec.r4_heater import R4Heater
+
+    device = R4Heater(port="COM1", snapshot_max_age=10)
+    device.sent = []
+    device.states = ["S", "S", "S", "S"]
+
+    async def write(command: str):
+        device.sent.append(command)
+
+    async def read_reply() -> str:
+        await asyncio.sleep(0.01)
+        command = device.sent[-1]
+        if command.startswith("STATUS"):
+            channel = int(command[-1])
+            return f"{device.states[channel]}{25 + channel}.0\r\n"
+        return "OK\r\n"
+
+    device._write = write
+    device._read_reply = read_reply
+    return device
+
+
+async def test_one_cycle_for_all_channels(r4):
+    statuses = await asyncio.gather(*(r4.get_status(channel) for channel in range(4)))
+    assert [status.temperature for status in statuses] == ["25.0", "26.0", "27.0", "28.0"]
+    assert r4.sent == ["STATUS0", "STATUS1", "STATUS2", "STATUS3"]
+
+    await r4.get_temperature(2)
+    assert len(r4.sent) == 4
+
+
+async def test_settings_change_invalidates_snapshot(r4):
+    await r4.get_status(0)
+    await r4.power_off(1)
+    await r4.get_status(0)
+    assert r4.sent.count("STATUS0") == 2
+
+
+async def test_wait_until_stable(r4):
+    r4.states = ["S", "H", "C", "S"]
+
+    async def stabilize():
+        await asyncio.sleep(0.1)
+        r4.states[1] = "S"
+
+    asyncio.create_task(stabilize())
+    # Channel 2 is not selected
+    assert await r4.wait_until_stable([0, 1, 3], timeout=2, interval=0.05)
+
+    with pytest.raises(TimeoutError):
+        await r4.wait_until_stable(timeout=0.2, interval=0.05)
@@ -0,0 +1,70 @@
+"""Test the executor of blocking SDK calls. Does not require any device."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from flowchem.utils.bus_executor import BusExecutor
+
+
+class BlockingInstrument:
+    """Emulates a synchronous SDK call taking a bus round trip, recording concurrent calls."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def read(self, value):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return value
+
+
+async def test_calls_on_one_bus_are_serialized():
+    instrument = BlockingInstrument()
+    bus = BusExecutor.for_bus("test-serialized")
+    assert BusExecutor.for_bus("test-serialized") is bus
+
+    results = await asyncio.gather(*(bus.run(instrument.read, n) for n in range(4)))
+    assert results == [0, 1, 2, 3]
+    assert instrument.max_active == 1
+    bus.shutdown()
+
+
+async def test_event_loop_and_other_buses_not_blocked():
+    slow, fast = BusExecutor.for_bus("test-slow"), BusExecutor.for_bus("test-fast")
+    slow_task = asyncio.gather(*(slow.run(time.sleep, 0.1) for _ in range(3)))
+
+    start = time.monotonic()
+    await asyncio.sleep(0.01)
+    assert await fast.run(lambda: "fast") == "fast"
+    assert time.monotonic() - start < 0.1
+
+    await slow_task
+    slow.shutdown()
+    fast.shutdown()
+
+
+def test_busy_bus_across_event_loops():
+    bus = BusExecutor("test-loops", max_pending=1)
+
+    async def contended():
+        return await asyncio.gather(*(bus.run(time.sleep, 0.01) for _ in range(3)))
+
+    # e.g. a server restarted in the same process: the bus is used again from a new event loop
+    for _ in range(2):
+        assert asyncio.run(contended()) == [None] * 3
+    bus.shutdown()
+
+
+def test_conflicting_workers():
+    bus = BusExecutor.for_bus("test-workers")
+    with pytest.raises(ValueError):
+        BusExecutor.for_bus("test-workers", max_workers=2)
+    bus.shutdown()
@@ -0,0 +1,51 @@
+"""Test the token-bucket rate limiter. Does not require any device."""
+import asyncio
+import time
+
+import pytest
+
+from flowchem.utils.rate_limit import RateLimiter
+
+
+async def test_sparse_commands_not_delayed():
+    limiter = RateLimiter(rate=10)
+    for _ in range(3):
+        start = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - start < 0.01
+        await asyncio.sleep(0.11)
+    assert limiter.stats.calls == 3
+    assert limiter.stats.throttled == 0
+
+
+async def test_burst_then_rate():
+    limiter = RateLimiter(rate=20, burst=3)
+    sent = []
+    start = time.monotonic()
+    for _ in range(6):
+        async with limiter:
+            sent.append(time.monotonic() - start)
+    # The first 3 commands go at once, then one every 50 ms
+    assert sent[2] < 0.01
+    assert sent[5] == pytest.approx(0.15, abs=0.03)
+    assert all(later - earlier >= 0.045 for earlier, later in zip(sent[2:], sent[3:]))
+    assert limiter.stats.throttled == 3
+    assert limiter.stats.waited == pytest.approx(0.15, abs=0.01)
+
+
+async def test_concurrent_commands_in_order():
+    limiter = RateLimiter(rate=50)
+    order = []
+
+    async def command(index: int):
+        async with limiter:
+            order.append(index)
+
+    await asyncio.gather(*[command(index) for index in range(5)])
+    assert order == list(range(5))
+    assert limiter.stats.throttled == 4
+
+
+def test_invalid_limit():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
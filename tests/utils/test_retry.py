@@ -0,0 +1,72 @@
+"""Test the retry policy. Does not require any device."""
+import time
+
+import pytest
+
+from flowchem.utils.retry import RetryError, RetryPolicy, RetryStats
+
+
+class FlakyDevice:
+    """Fails a given number of times before replying."""
+
+    def __init__(self, failures: int, error: BaseException | None = None) -> None:
+        self.failures = failures
+        self.error = error
+        self.attempts = 0
+
+    async def read(self) -> str:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            if self.error is not None:
+                raise self.error
+            return ""
+        return "reply"
+
+
+async def test_retry_on_result():
+    device = FlakyDevice(failures=2)
+    stats = RetryStats()
+    policy = RetryPolicy(max_attempts=3, initial_delay=0.01)
+    assert await policy.run(device.read, retry_if=lambda reply: not reply, name="read", stats=stats) == "reply"
+    assert stats["read"].calls == 1
+    assert stats["read"].retries == 2
+    assert stats["read"].failures == 0
+
+
+async def test_max_attempts():
+    device = FlakyDevice(failures=5)
+    stats = RetryStats()
+    with pytest.raises(RetryError) as error:
+        await RetryPolicy(max_attempts=3, initial_delay=0.01).run(
+            device.read, retry_if=lambda reply: not reply, name="read", stats=stats
+        )
+    assert error.value.attempts == device.attempts == 3
+    assert stats["read"].failures == 1
+
+
+async def test_retryable_exceptions():
+    device = FlakyDevice(failures=1, error=TimeoutError())
+    assert await RetryPolicy(initial_delay=0.01).run(device.read) == "reply"
+
+    device = FlakyDevice(failures=1, error=ValueError())
+    with pytest.raises(ValueError):
+        await RetryPolicy(initial_delay=0.01).run(device.read)
+    assert device.attempts == 1
+
+
+async def test_deadline_bounds_unlimited_attempts():
+    device = FlakyDevice(failures=1000, error=ConnectionError())
+    policy = RetryPolicy(max_attempts=None, deadline=0.3, initial_delay=0.01, max_delay=0.05)
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        await policy.run(device.read)
+    assert time.monotonic() - start < 0.5
+    # Back-off instead of busy spinning
+    assert device.attempts < 20
+
+
+def test_delay_backoff_and_jitter():
+    policy = RetryPolicy(initial_delay=0.1, backoff=2, max_delay=0.3, jitter=0.1)
+    assert 0.09 <= policy.delay(1) <= 0.11
+    assert 0.18 <= policy.delay(2) <= 0.22
+    assert 0.27 <= policy.delay(5) <= 0.33
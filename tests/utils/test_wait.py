@@ -0,0 +1,47 @@
+"""Test the adaptive wait helper. Does not require any device."""
+import asyncio
+import time
+
+import pytest
+
+from flowchem.utils.wait import wait_until
+
+
+class FakeDevice:
+    """Becomes idle after a given number of seconds, counting the status queries received."""
+
+    def __init__(self, busy_for: float) -> None:
+        self.idle_at = time.monotonic() + busy_for
+        self.polls = 0
+
+    async def is_idle(self) -> bool:
+        self.polls += 1
+        return time.monotonic() >= self.idle_at
+
+
+async def test_expected_duration_avoids_polling():
+    device = FakeDevice(busy_for=0.6)
+    assert await wait_until(device.is_idle, expected_duration=0.6, lead_time=0.1, min_interval=0.01)
+    # Fixed 10 ms polling would need ~60 queries
+    assert device.polls < 10
+
+
+async def test_backoff_without_prediction():
+    device = FakeDevice(busy_for=0.5)
+    assert await wait_until(device.is_idle, min_interval=0.01, max_interval=0.2)
+    assert device.polls < 10
+
+
+async def test_timeout():
+    device = FakeDevice(busy_for=10)
+    with pytest.raises(TimeoutError):
+        await wait_until(device.is_idle, timeout=0.2, min_interval=0.01)
+
+
+async def test_cancel_event():
+    device = FakeDevice(busy_for=10)
+    cancel = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.1, cancel.set)
+    start = time.monotonic()
+    assert await wait_until(device.is_idle, expected_duration=10, cancel_event=cancel) is False
+    assert time.monotonic() - start < 1